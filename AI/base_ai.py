@@ -1,19 +1,192 @@
 import abc
+import copy
+import time
+from concurrent.futures import Future
+from functools import lru_cache
 import numpy as np
-from typing import List, Tuple, Dict, Optional, Callable
-from Common.constants import PIECE_COLORS, AI_LEVELS, EVAL_WEIGHTS
+from typing import List, Tuple, Dict, Optional, Callable, Set
+from Common.constants import PIECE_COLORS, AI_LEVELS, EVAL_WEIGHTS, WIN_DIRECTIONS, TT_FLAGS, OPPONENT_COLORS
 from Common.config import Config
 from Common.logger import Logger
 from Common.error_handler import AIError
+from Common.jit_utils import njit
+
+# 模块级单例引用（导入时获取一次，避免每次构造AI都查找单例）
+_LOGGER = Logger.get_instance()
+_BOARD_SIZE = Config.get_instance().board_size
+
+Board = np.ndarray  # 棋盘类型（形状为(N, N)的连续uint8数组）
+
+NEIGHBOR_RADIUS = 2  # 候选落子邻域半径（距已有棋子的切比雪夫距离）
+
+def count_neighbors(board: Board, radius: int = NEIGHBOR_RADIUS) -> np.ndarray:
+    """统计每个位置(2*radius+1)方形邻域内的棋子数（方形窗口可分离：先按行求和，再按列求和）"""
+    size = board.shape[0]
+    padded = np.pad((board != PIECE_COLORS['EMPTY']).astype(np.int16), radius)
+    rows = np.zeros((size + 2 * radius, size), dtype=np.int16)
+    for d in range(2 * radius + 1):
+        rows += padded[:, d:d + size]
+    counts = np.zeros((size, size), dtype=np.int16)
+    for d in range(2 * radius + 1):
+        counts += rows[d:d + size, :]
+    return counts
+
+def to_bitboard(board: Board, color: int) -> int:
+    """将某颜色的棋子转换为位棋盘（Python整数，第x行第y列对应第x*(N+1)+y位）
+    每行宽度为N+1，多出的一列恒为0，防止横向/斜向移位时跨行
+    """
+    size = board.shape[0]
+    padded = np.zeros((size, size + 1), dtype=bool)
+    padded[:, :size] = board == color
+    return int.from_bytes(np.packbits(padded.ravel(), bitorder='little').tobytes(), 'little')
+
+def bitboard_five(bb: int, size: int) -> Tuple[int, int]:
+    """在位棋盘中查找五连（每个方向3次移位与运算）
+    Returns:
+        (五连起点掩码, 移位步长)，未找到时掩码为0
+    """
+    width = size + 1
+    # 横向、纵向、正对角线、反对角线的移位步长
+    for shift in (1, width, width + 1, width - 1):
+        h = bb & (bb >> shift)
+        h &= h >> (2 * shift)
+        h &= h >> shift
+        if h:
+            return h, shift
+    return 0, 0
+
+def update_neighbors(counts: np.ndarray, x: int, y: int, delta: int, radius: int = NEIGHBOR_RADIUS):
+    """落子(delta=1)或撤销(delta=-1)时增量更新邻域计数"""
+    counts[max(0, x - radius):x + radius + 1, max(0, y - radius):y + radius + 1] += delta
+
+@lru_cache(maxsize=None)
+def zobrist_table(board_size: int) -> np.ndarray:
+    """Zobrist键表（形状为(N, N, 2)的只读uint64数组，[x, y, 颜色-1]；固定种子，各模块计算的哈希一致）"""
+    table = np.random.SeedSequence(0xC0FFEE).generate_state(
+        board_size * board_size * 2, dtype=np.uint64
+    ).reshape(board_size, board_size, 2)
+    table.setflags(write=False)
+    return table
+
+def winning_cells(board: Board, color: int) -> np.ndarray:
+    """找出color落子即可形成五连的所有空位（整盘向量化计算，不逐个空位试落子）
+    对每个方向，用填充后的棋盘切片统计每个位置正、反两侧紧邻的连续己方棋子数（各最多4个），
+    两侧之和不少于4的空位落子即成五连
+    Returns:
+        形状为(N, N)的布尔数组
+    """
+    size = board.shape[0]
+    own = np.zeros((size + 8, size + 8), dtype=bool)
+    own[4:-4, 4:-4] = board == color
+    wins = np.zeros((size, size), dtype=bool)
+    for dx, dy in WIN_DIRECTIONS:
+        line = np.zeros((size, size), dtype=np.int8)
+        for sign in (1, -1):
+            run = np.ones((size, size), dtype=bool)
+            for k in range(1, 5):
+                ox, oy = 4 + sign * k * dx, 4 + sign * k * dy
+                run &= own[ox:ox + size, oy:oy + size]
+                line += run
+        wins |= line >= 4
+    return wins & (board == PIECE_COLORS['EMPTY'])
+
+# 置换表条目结构（键、得分、深度、条目类型、最佳落子索引）
+TT_DTYPE = np.dtype([('key', 'u8'), ('value', 'i4'), ('depth', 'i1'), ('flag', 'u1'), ('move', 'u2')])
+TT_NO_MOVE = 0xFFFF  # 无最佳落子时的占位索引
+# 置换表中必胜/必败得分的下界（存储的是距离胜负的层数，深度为int8，距离不超过127层）
+_TT_MATE_BOUND = EVAL_WEIGHTS['FIVE'] - 128
+
+def _score_to_tt(score: float, depth: int) -> float:
+    """必胜/必败得分转换为置换表存储值
+    搜索中的胜负得分为FIVE+剩余深度，剩余深度取决于根节点的迭代深度；
+    存储时减去当前剩余深度，得到只与该局面到胜负的距离有关的值，跨步、跨迭代复用时仍然正确
+    """
+    if score >= EVAL_WEIGHTS['FIVE']:
+        return score - depth
+    if score <= -EVAL_WEIGHTS['FIVE']:
+        return score + depth
+    return score
+
+def _score_from_tt(value: int, depth: int) -> int:
+    """置换表存储值还原为当前剩余深度下的得分（_score_to_tt的逆变换）"""
+    if value >= _TT_MATE_BOUND:
+        return value + depth
+    if value <= -_TT_MATE_BOUND:
+        return value - depth
+    return value
+
+def _build_score_table() -> np.ndarray:
+    """构建棋型得分查找表（下标为[己方棋子数, 左端是否为空<<1 | 右端是否为空]）"""
+    table = np.zeros((6, 4), dtype=np.int32)
+    table[5, :] = EVAL_WEIGHTS['FIVE']
+    for n, live, blocked in ((4, 'FOUR', 'BLOCKED_FOUR'), (3, 'THREE', 'BLOCKED_THREE'), (2, 'TWO', 'BLOCKED_TWO')):
+        table[n, :] = EVAL_WEIGHTS[blocked]
+        table[n, 0b11] = EVAL_WEIGHTS[live]
+    table[1, 0b11] = EVAL_WEIGHTS['ONE']
+    return table
+
+# 棋型得分表（模块级常量，JIT编译时内联）
+_SCORE_TABLE = _build_score_table()
+
+@njit(cache=True, nogil=True)
+def _pattern_score_kernel(pattern, color, empty):
+    """根据棋型获取得分（单次遍历统计己方棋子数，再按两端是否为空查表）"""
+    n = 0
+    for v in pattern:
+        n += v == color
+    if n >= _SCORE_TABLE.shape[0]:
+        return 0
+    left_open = 1 if pattern[0] == empty else 0
+    right_open = 1 if pattern[-1] == empty else 0
+    return _SCORE_TABLE[n, (left_open << 1) | right_open]
+
+_WIN_DIRECTIONS = np.array(WIN_DIRECTIONS, dtype=np.int64)  # 四个方向的步长（供JIT内核使用）
+
+_FIVE_AT_KERNELS: Dict[int, Callable] = {}  # 按棋盘尺寸缓存的五连判断内核（同尺寸的对局共用）
+
+def make_five_at_kernel(size: int) -> Callable:
+    """生成绑定固定棋盘尺寸的五连判断内核（尺寸作为闭包常量，JIT编译时常量折叠）"""
+    kernel = _FIVE_AT_KERNELS.get(size)
+    if kernel is not None:
+        return kernel
+
+    @njit(nogil=True)
+    def _five_at_kernel(board, x, y, color):
+        """判断(x,y)处color的落子是否形成五连（只沿经过该点的四条线计数）"""
+        for d in range(_WIN_DIRECTIONS.shape[0]):
+            dx = _WIN_DIRECTIONS[d, 0]
+            dy = _WIN_DIRECTIONS[d, 1]
+            count = 1
+            for sign in (1, -1):
+                nx = x + sign * dx
+                ny = y + sign * dy
+                for _ in range(4):
+                    if nx < 0 or nx >= size or ny < 0 or ny >= size or board[nx, ny] != color:
+                        break
+                    count += 1
+                    nx += sign * dx
+                    ny += sign * dy
+            if count >= 5:
+                return True
+        return False
+
+    _FIVE_AT_KERNELS[size] = _five_at_kernel
+    return _five_at_kernel
+
+class SearchTimeout(Exception):
+    """搜索超时（用于迭代加深中止当前深度的搜索）"""
+    pass
 
 class BaseAI(metaclass=abc.ABCMeta):
     """AI基础抽象类（所有AI的统一接口）"""
+    TT_SIZE_BITS = 20  # 置换表容量为2^20个条目（固定内存占用）
     def __init__(self, color: int, level: str = AI_LEVELS['HARD']):
         self.color = color  # AI棋子颜色
-        self.opponent_color = PIECE_COLORS['WHITE'] if color == PIECE_COLORS['BLACK'] else PIECE_COLORS['BLACK']
+        self.opponent_color = OPPONENT_COLORS[color]
         self.level = level  # AI难度
-        self.board_size = Config.get_instance().board_size  # 棋盘尺寸
-        self.logger = Logger.get_instance()  # 日志工具
+        self.board_size = _BOARD_SIZE  # 棋盘尺寸
+        self._five_at = make_five_at_kernel(self.board_size)  # 按棋盘尺寸特化的五连判断内核
+        self.logger = _LOGGER  # 日志工具
         
         # 思考过程回调（用于可视化）
         self.thinking_callback: Optional[Callable[[Dict], None]] = None
@@ -22,7 +195,23 @@ class BaseAI(metaclass=abc.ABCMeta):
         self.max_depth = self._get_max_depth_by_level()  # 最大搜索深度
         self.prune_threshold = 0.8  # 剪枝阈值（0-1）
         self.cache_enabled = True  # 是否启用缓存
-        self.transposition_table = {}  # 置换表（缓存棋盘状态评估结果）
+        # 置换表（固定大小的结构化数组，按Zobrist哈希低位寻址，总是替换；首次使用时才分配）
+        self._tt: Optional[np.ndarray] = None
+        self._tt_mask = (1 << self.TT_SIZE_BITS) - 1
+        self.board: Optional[np.ndarray] = None  # 规范棋盘（uint8数组，落子时惰性加载）
+        self.bb_self = 0  # AI棋子位棋盘
+        self.bb_opp = 0  # 对手棋子位棋盘
+        
+        # Zobrist哈希（每个位置、每种颜色一个64位随机数，落子/撤销时异或更新）
+        self._zobrist = zobrist_table(self.board_size)
+        self._zobrist_keys = self._zobrist.tolist()  # Python整数副本（避免热路径上的numpy标量开销）
+        self._hash = 0  # 当前棋盘的Zobrist哈希
+        self._empties: Set[Tuple[int, int]] = set()  # 规范棋盘上的空位集合（落子/撤销时增量维护）
+        self._neighbor_count = np.zeros((self.board_size, self.board_size), dtype=np.int16)  # 每个位置邻域内的棋子数
+        
+        # 迭代加深搜索状态
+        self.principal_variation: List[Tuple[int, int]] = []  # 根节点主要变例（最近完成深度的最佳路线）
+        self._search_deadline: Optional[float] = None  # 搜索截止时间（None表示不限时）
         
     def _get_max_depth_by_level(self) -> int:
         """根据难度获取最大搜索深度"""
@@ -45,6 +234,15 @@ class BaseAI(metaclass=abc.ABCMeta):
         """
         pass
     
+    def move_async(self, board: List[List[int]]) -> Future:
+        """异步计算落子（返回结果为落子坐标的Future；默认在当前线程同步计算，支持批量推理的AI会合并多个请求）"""
+        future = Future()
+        try:
+            future.set_result(self.move(board))
+        except Exception as e:
+            future.set_exception(e)
+        return future
+    
     def set_thinking_callback(self, callback: Callable[[Dict], None]):
         """设置思考过程回调"""
         self.thinking_callback = callback
@@ -54,140 +252,387 @@ class BaseAI(metaclass=abc.ABCMeta):
         if self.thinking_callback:
             self.thinking_callback(data)
     
-    def _get_empty_positions(self, board: List[List[int]]) -> List[Tuple[int, int]]:
-        """获取所有空位置"""
-        empty_pos = []
-        for i in range(self.board_size):
-            for j in range(self.board_size):
-                if board[i][j] == PIECE_COLORS['EMPTY']:
-                    empty_pos.append((i, j))
-        return empty_pos
-    
-    def _is_win(self, board: List[List[int]], color: int) -> Tuple[bool, List[Tuple[int, int]]]:
-        """判断某颜色是否获胜
+    def _to_board_array(self, board) -> np.ndarray:
+        """将棋盘转换为连续的uint8数组（已是uint8数组时不复制）"""
+        return np.ascontiguousarray(board, dtype=np.uint8)
+    
+    def _load_board(self, board) -> np.ndarray:
+        """加载当前棋盘（惰性转换为numpy数组并作为规范棋盘保存）"""
+        self.board = self._to_board_array(board)
+        self._init_bitboards(self.board)
+        self._hash = self._compute_hash(self.board)
+        self._empties = self._get_empty_set(self.board)
+        self._neighbor_count = count_neighbors(self.board)
+        return self.board
+    
+    def _get_empty_set(self, board: np.ndarray) -> Set[Tuple[int, int]]:
+        """完整扫描棋盘得到空位集合（仅在加载棋盘时调用）"""
+        return set(map(tuple, np.argwhere(board == PIECE_COLORS['EMPTY']).tolist()))
+    
+    def _compute_hash(self, board: np.ndarray) -> int:
+        """完整计算棋盘的Zobrist哈希（仅在加载棋盘时调用）"""
+        board = self._to_board_array(board)
+        occupied = board != PIECE_COLORS['EMPTY']
+        keys = self._zobrist[occupied, board[occupied].astype(np.intp) - 1]
+        return int(np.bitwise_xor.reduce(keys)) if keys.size else 0
+    
+    def _make_move(self, x: int, y: int, color: int):
+        """在规范棋盘上落子（同步更新位棋盘和Zobrist哈希）"""
+        self.board[x, y] = color
+        self._flip_bitboard(x, y, color)
+        self._hash ^= self._zobrist_keys[x][y][color - 1]
+        self._empties.discard((x, y))
+        update_neighbors(self._neighbor_count, x, y, 1)
+    
+    def _undo_move(self, x: int, y: int, color: int):
+        """撤销规范棋盘上的落子（_make_move的逆操作）"""
+        self.board[x, y] = PIECE_COLORS['EMPTY']
+        self._flip_bitboard(x, y, color)
+        self._hash ^= self._zobrist_keys[x][y][color - 1]
+        self._empties.add((x, y))
+        update_neighbors(self._neighbor_count, x, y, -1)
+    
+    def _get_empty_positions(self, board: np.ndarray) -> np.ndarray:
+        """获取所有空位置
         Returns:
-            (是否获胜, 获胜线坐标列表)
+            形状为(N, 2)的坐标数组
         """
-        # 检查横向
-        for i in range(self.board_size):
-            for j in range(self.board_size - 4):
-                if all(board[i][j + k] == color for k in range(5)):
-                    return True, [(i, j + k) for k in range(5)]
-        
-        # 检查纵向
-        for j in range(self.board_size):
-            for i in range(self.board_size - 4):
-                if all(board[i + k][j] == color for k in range(5)):
-                    return True, [(i + k, j) for k in range(5)]
-        
-        # 检查正对角线
-        for i in range(self.board_size - 4):
-            for j in range(self.board_size - 4):
-                if all(board[i + k][j + k] == color for k in range(5)):
-                    return True, [(i + k, j + k) for k in range(5)]
-        
-        # 检查反对角线
-        for i in range(self.board_size - 4):
-            for j in range(4, self.board_size):
-                if all(board[i + k][j - k] == color for k in range(5)):
-                    return True, [(i + k, j - k) for k in range(5)]
+        return np.argwhere(self._to_board_array(board) == PIECE_COLORS['EMPTY'])
+    
+    def _get_candidate_moves(self, board: np.ndarray, radius: int = NEIGHBOR_RADIUS) -> np.ndarray:
+        """获取候选落子：距离已有棋子不超过radius（切比雪夫距离）的空位置
+        远离所有棋子的空位几乎不可能是好棋，只搜索邻域可将分支数从约200降到约20
+        规范棋盘直接使用落子/撤销时增量维护的邻域计数，其他棋盘完整计算一次
+        Returns:
+            形状为(N, 2)的坐标数组；空棋盘时返回中心点
+        """
+        board = self._to_board_array(board)
+        size = self.board_size
+        empty = board == PIECE_COLORS['EMPTY']
+        if empty.all():
+            return np.array([[size // 2, size // 2]])
         
-        return False, []
+        if board is self.board and radius == NEIGHBOR_RADIUS:
+            counts = self._neighbor_count
+        else:
+            counts = count_neighbors(board, radius)
+        return np.argwhere((counts > 0) & empty)
+    
+    def _to_bitboard(self, board: np.ndarray, color: int) -> int:
+        """将某颜色的棋子转换为位棋盘（Python整数）"""
+        return to_bitboard(self._to_board_array(board), color)
+    
+    def _init_bitboards(self, board: np.ndarray):
+        """根据棋盘初始化AI与对手的位棋盘"""
+        self.bb_self = self._to_bitboard(board, self.color)
+        self.bb_opp = self._to_bitboard(board, self.opponent_color)
+    
+    def _flip_bitboard(self, x: int, y: int, color: int):
+        """落子/撤销落子时翻转位棋盘中对应的一位"""
+        bit = 1 << (x * (self.board_size + 1) + y)
+        if color == self.color:
+            self.bb_self ^= bit
+        else:
+            self.bb_opp ^= bit
+    
+    def _bitboard_five(self, bb: int) -> Tuple[int, int]:
+        """在位棋盘中查找五连
+        Returns:
+            (五连起点掩码, 移位步长)，未找到时掩码为0
+        """
+        return bitboard_five(bb, self.board_size)
+    
+    def _is_win(self, board: np.ndarray, color: int) -> Tuple[bool, List[Tuple[int, int]]]:
+        """判断某颜色是否获胜（位棋盘移位与运算）
+        Returns:
+            (是否获胜, 获胜线坐标列表)
+        """
+        mask, shift = self._bitboard_five(self._to_bitboard(board, color))
+        if not mask:
+            return False, []
+        width = self.board_size + 1
+        start = (mask & -mask).bit_length() - 1  # 最低位的五连起点
+        return True, [divmod(start + k * shift, width) for k in range(5)]
     
-    def _is_board_full(self, board: List[List[int]]) -> bool:
+    def _is_win_at(self, board: np.ndarray, x: int, y: int, color: int) -> bool:
+        """判断(x,y)处的落子是否形成五连（只检查经过该点的四条线，JIT编译的热路径）
+        新的五连只可能由最后一步落子产生，因此搜索中无需扫描整个棋盘
+        """
+        return bool(self._five_at(self._to_board_array(board), int(x), int(y), color))
+    
+    def _is_board_full(self, board: np.ndarray) -> bool:
         """判断棋盘是否下满"""
-        for i in range(self.board_size):
-            for j in range(self.board_size):
-                if board[i][j] == PIECE_COLORS['EMPTY']:
-                    return False
-        return True
+        return not (self._to_board_array(board) == PIECE_COLORS['EMPTY']).any()
     
-    def _copy_board(self, board: List[List[int]]) -> List[List[int]]:
+    def _copy_board(self, board: np.ndarray) -> np.ndarray:
         """复制棋盘（避免修改原棋盘）"""
-        return [row.copy() for row in board]
+        return np.array(board, dtype=np.uint8)
     
-    def _get_board_key(self, board: List[List[int]]) -> Tuple[tuple, int]:
-        """获取棋盘状态的唯一键（用于置换表）"""
-        return (tuple(tuple(row) for row in board), self.color)
+    def _get_board_key(self) -> Tuple[int, int]:
+        """获取当前棋盘状态的唯一键（用于置换表）
+        使用增量维护的Zobrist哈希，对应通过_make_move/_undo_move维护的规范棋盘self.board
+        """
+        return (self._hash, self.color)
     
-    def _cache_evaluation(self, board: List[List[int]], score: float, depth: int):
-        """缓存棋盘评估结果"""
+    def _cache_evaluation(
+        self,
+        board: np.ndarray,
+        score: int,
+        depth: int,
+        flag: int = TT_FLAGS['EXACT'],
+        best_move: Optional[Tuple[int, int]] = None
+    ):
+        """缓存棋盘评估结果
+        Args:
+            flag: 条目类型（精确值/下界/上界）
+            best_move: 该局面下的最佳落子（用于后续搜索的落子排序）
+        """
         if not self.cache_enabled:
             return
-        key = self._get_board_key(board)
-        self.transposition_table[key] = (score, depth)
+        # 键来自增量哈希，只对应规范棋盘
+        assert board is self.board, "置换表只能缓存规范棋盘self.board的局面"
+        key = self._get_board_key()[0]
+        self.tt[key & self._tt_mask] = (
+            key,
+            _score_to_tt(score, depth),
+            depth,
+            flag,
+            TT_NO_MOVE if best_move is None else best_move[0] * self.board_size + best_move[1]
+        )
     
-    def _get_cached_evaluation(self, board: List[List[int]], depth: int) -> Optional[float]:
-        """获取缓存的棋盘评估结果"""
+    def _probe_tt(self, board: np.ndarray) -> Optional[np.void]:
+        """读取置换表条目（校验完整哈希，防止低位冲突）"""
+        assert board is self.board, "置换表只能查询规范棋盘self.board的局面"
+        key = self._get_board_key()[0]
+        entry = self.tt[key & self._tt_mask]
+        if entry['depth'] < 0 or int(entry['key']) != key:
+            return None
+        return entry
+    
+    def _get_cached_evaluation(
+        self,
+        board: np.ndarray,
+        depth: int,
+        alpha: float = -float('inf'),
+        beta: float = float('inf')
+    ) -> Optional[int]:
+        """获取缓存的棋盘评估结果（仅在缓存值在当前窗口下可用时返回）"""
+        return self._probe_window(board, depth, alpha, beta)[0]
+    
+    def _probe_window(
+        self,
+        board: np.ndarray,
+        depth: int,
+        alpha: float,
+        beta: float
+    ) -> Tuple[Optional[int], float, float]:
+        """用置换表条目收窄搜索窗口（下界提高alpha，上界降低beta）
+        Returns:
+            (可直接返回的缓存得分或None, 收窄后的alpha, 收窄后的beta)
+        """
         if not self.cache_enabled:
+            return None, alpha, beta
+        entry = self._probe_tt(board)
+        # 只有缓存的深度大于等于当前搜索深度时才使用
+        if entry is None or entry['depth'] < depth:
+            return None, alpha, beta
+        cached_score = _score_from_tt(int(entry['value']), depth)
+        flag = entry['flag']
+        if flag == TT_FLAGS['EXACT']:
+            return cached_score, alpha, beta
+        if flag == TT_FLAGS['LOWER']:
+            alpha = max(alpha, cached_score)
+        elif flag == TT_FLAGS['UPPER']:
+            beta = min(beta, cached_score)
+        if alpha >= beta:
+            return cached_score, alpha, beta
+        return None, alpha, beta
+    
+    def _get_cached_move(self, board: np.ndarray) -> Optional[Tuple[int, int]]:
+        """获取置换表中记录的最佳落子（不要求深度）"""
+        if not self.cache_enabled:
+            return None
+        entry = self._probe_tt(board)
+        if entry is None or entry['move'] == TT_NO_MOVE:
             return None
-        key = self._get_board_key(board)
-        if key in self.transposition_table:
-            cached_score, cached_depth = self.transposition_table[key]
-            # 只有缓存的深度大于等于当前搜索深度时才使用
-            if cached_depth >= depth:
-                return cached_score
-        return None
+        return divmod(int(entry['move']), self.board_size)
+    
+    def _get_bound_flag(self, score: float, alpha: float, beta: float) -> int:
+        """根据搜索窗口判断结果类型（alpha/beta为进入节点时的原始窗口）"""
+        if score <= alpha:
+            return TT_FLAGS['UPPER']
+        if score >= beta:
+            return TT_FLAGS['LOWER']
+        return TT_FLAGS['EXACT']
+    
+    def _alphabeta(
+        self,
+        board: np.ndarray,
+        depth: int,
+        alpha: float,
+        beta: float
+    ) -> Tuple[float, Optional[Tuple[int, int]]]:
+        """根节点Alpha-Beta搜索（默认实现只看一层：逐个模拟候选落子后静态评估；搜索型AI重写为完整搜索）
+        Returns:
+            (得分, 最佳落子)
+        """
+        best_score, best_move = -float('inf'), None
+        for x, y in self._get_candidate_moves(board):
+            x, y = int(x), int(y)
+            self._check_timeout()
+            self._make_move(x, y, self.color)
+            try:
+                score = self.evaluate(board)
+            finally:
+                self._undo_move(x, y, self.color)
+            if score > best_score:
+                best_score, best_move = score, (x, y)
+            alpha = max(alpha, score)
+            if alpha >= beta:
+                break
+        return best_score, best_move
+    
+    def _check_timeout(self):
+        """检查是否超过搜索截止时间（超时抛出SearchTimeout）"""
+        if self._search_deadline is not None and time.time() > self._search_deadline:
+            raise SearchTimeout()
+    
+    def _iterative_search(
+        self,
+        board: np.ndarray,
+        time_budget: Optional[float] = None
+    ) -> Tuple[Optional[Tuple[int, int]], float, int]:
+        """迭代加深搜索：依次以深度1..max_depth调用_alphabeta
+        浅层搜索写入置换表的最佳落子会在更深一层被优先尝试，使剪枝接近最优
+        Args:
+            board: 规范棋盘（通过_load_board加载）
+            time_budget: 时间预算（秒），超时后返回最近一次完整搜索的结果
+        Returns:
+            (最佳落子, 得分, 完成的搜索深度)
+        """
+        self._search_deadline = time.time() + time_budget if time_budget else None
+        snapshot = board.copy()
+        best_move, best_score, completed_depth = None, -float('inf'), 0
+        try:
+            for depth in range(1, self.max_depth + 1):
+                score, move = self._alphabeta(board, depth, -float('inf'), float('inf'))
+                if move is not None:
+                    best_move, best_score, completed_depth = move, score, depth
+                    self.principal_variation = self._extract_pv(depth)
+                # 已找到必胜/必败路线，更深的搜索不会改变结果
+                if abs(score) >= EVAL_WEIGHTS['FIVE']:
+                    break
+        except SearchTimeout:
+            # 中止时递归中的撤销落子被跳过，恢复棋盘、位棋盘和哈希
+            self._restore_board(snapshot)
+            self.logger.info("搜索超时，使用深度 %s 的结果", completed_depth)
+        finally:
+            self._search_deadline = None
+        return best_move, best_score, completed_depth
+    
+    def _restore_board(self, snapshot: np.ndarray):
+        """原地恢复规范棋盘（同时重建位棋盘和哈希）"""
+        self.board[...] = snapshot
+        self._init_bitboards(self.board)
+        self._hash = self._compute_hash(self.board)
+        self._empties = self._get_empty_set(self.board)
+        self._neighbor_count = count_neighbors(self.board)
+    
+    def _extract_pv(self, depth: int) -> List[Tuple[int, int]]:
+        """沿置换表中的最佳落子提取主要变例"""
+        pv = []
+        color = self.color
+        for _ in range(depth):
+            move = self._get_cached_move(self.board)
+            if move is None or self.board[move] != PIECE_COLORS['EMPTY']:
+                break
+            self._make_move(move[0], move[1], color)
+            pv.append(move)
+            color = OPPONENT_COLORS[color]
+        for move in reversed(pv):
+            color = OPPONENT_COLORS[color]
+            self._undo_move(move[0], move[1], color)
+        return pv
+    
+    @property
+    def tt(self) -> np.ndarray:
+        """置换表（首次访问时分配，MCTS、神经网络等不做Alpha-Beta搜索的AI不占用这部分内存）"""
+        if self._tt is None:
+            self._tt = self.new_tt()
+        return self._tt
+    
+    @tt.setter
+    def tt(self, tt: np.ndarray):
+        self._tt = tt
+    
+    @property
+    def tt_nbytes(self) -> int:
+        """置换表已占用的字节数（尚未分配时为0）"""
+        return 0 if self._tt is None else self._tt.nbytes
+    
+    def _spawn_worker(self) -> 'BaseAI':
+        """创建并行搜索用的工作副本（共享评估器等只读状态，棋盘、位棋盘、哈希和置换表各自独立）"""
+        worker = copy.copy(self)
+        worker._tt = None
+        worker.board = None
+        worker.thinking_callback = None
+        return worker
+    
+    @classmethod
+    def new_tt(cls) -> np.ndarray:
+        """创建空的置换表（可由AIFactory.create_ai传给多个AI实例共享）"""
+        tt = np.zeros(1 << cls.TT_SIZE_BITS, dtype=TT_DTYPE)
+        tt['depth'].fill(-1)  # 深度-1表示空条目
+        return tt
+    
+    @staticmethod
+    def reset_tt(tt: np.ndarray):
+        """清空置换表（原地清空，共享该表的AI实例同时生效）"""
+        tt['key'].fill(0)
+        tt['depth'].fill(-1)
     
     def clear_cache(self):
         """清空置换表缓存"""
-        self.transposition_table.clear()
+        if self._tt is None:
+            return
+        self.reset_tt(self._tt)
     
     def set_level(self, level: str):
         """设置AI难度"""
         self.level = level
         self.max_depth = self._get_max_depth_by_level()
-        self.logger.info(f"AI难度已设置为: {level}，最大搜索深度: {self.max_depth}")
+        self.logger.info("AI难度已设置为: %s，最大搜索深度: %s", level, self.max_depth)
     
     @abc.abstractmethod
     def evaluate(self, board: List[List[int]]) -> float:
         """评估棋盘得分（正数对AI有利，负数对对手有利）"""
         pass
     
-    def _get_pattern_score(self, pattern: List[int], color: int) -> float:
+    def _get_pattern_score(self, pattern: List[int], color: int) -> int:
         """根据棋型获取得分"""
-        opponent = PIECE_COLORS['WHITE'] if color == PIECE_COLORS['BLACK'] else PIECE_COLORS['BLACK']
-        empty = PIECE_COLORS['EMPTY']
-        
-        # 五连
-        if pattern.count(color) == 5:
-            return EVAL_WEIGHTS['FIVE']
-        # 活四（两端为空）
-        elif pattern.count(color) == 4 and pattern[0] == empty and pattern[-1] == empty:
-            return EVAL_WEIGHTS['FOUR']
-        # 冲四（一端为空，一端为自己或边界）
-        elif pattern.count(color) == 4:
-            return EVAL_WEIGHTS['BLOCKED_FOUR']
-        # 活三（两端为空，中间三个连续）
-        elif pattern.count(color) == 3 and pattern[0] == empty and pattern[-1] == empty:
-            return EVAL_WEIGHTS['THREE']
-        # 冲三（一端为空）
-        elif pattern.count(color) == 3:
-            return EVAL_WEIGHTS['BLOCKED_THREE']
-        # 活二
-        elif pattern.count(color) == 2 and pattern[0] == empty and pattern[-1] == empty:
-            return EVAL_WEIGHTS['TWO']
-        # 冲二
-        elif pattern.count(color) == 2:
-            return EVAL_WEIGHTS['BLOCKED_TWO']
-        # 活一
-        elif pattern.count(color) == 1 and pattern[0] == empty and pattern[-1] == empty:
-            return EVAL_WEIGHTS['ONE']
-        
-        return 0.0
+        return int(_pattern_score_kernel(np.asarray(pattern, dtype=np.int64), color, PIECE_COLORS['EMPTY']))
 
 class AIFactory:
     """AI工厂类（创建不同类型的AI实例）"""
     @staticmethod
-    def create_ai(ai_type: str, color: int, level: str = AI_LEVELS['HARD']) -> BaseAI:
+    def create_ai(ai_type: str, color: int, level: str = AI_LEVELS['HARD'], tt: Optional[np.ndarray] = None) -> BaseAI:
         """创建AI实例
         Args:
             ai_type: AI类型（minimax, mcts, nn, minimax+mcts, nn+mcts）
             color: AI棋子颜色
             level: AI难度
+            tt: 共享的置换表（由BaseAI.new_tt创建；条目得分相对于AI颜色，只能在同色AI之间共享）
         Returns:
             BaseAI: AI实例
         """
+        ai = AIFactory._create_ai(ai_type, color, level)
+        if tt is not None:
+            ai.tt = tt
+        return ai
+    
+    @staticmethod
+    def _create_ai(ai_type: str, color: int, level: str) -> BaseAI:
+        """按类型创建AI实例"""
         try:
             if ai_type == 'minimax':
                 from AI.minimax_ai import MinimaxAI
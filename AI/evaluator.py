@@ -1,20 +1,168 @@
+import functools
 import numpy as np
-from typing import List, Tuple, Dict
-from Common.constants import PIECE_COLORS, EVAL_WEIGHTS
+from typing import List, Tuple, Dict, Optional
+from Common.constants import PIECE_COLORS, EVAL_WEIGHTS, WIN_DIRECTIONS, OPPONENT_COLORS
 from Common.config import Config
 from Common.logger import Logger
+from Common.jit_utils import njit, NUMBA_AVAILABLE
+
+_LOGGER = Logger.get_instance()  # 模块级日志引用（导入时获取一次）
+
+# 棋型名称（下标即棋型ID，0表示未匹配）
+PATTERN_NAMES = (
+    'none', 'five', 'live_four', 'blocked_four', 'live_three',
+    'blocked_three', 'live_two', 'blocked_two', 'live_one'
+)
+
+def _build_pattern_table():
+    """按匹配优先级展开所有棋型模板（1=自己，2=对手，0=空）"""
+    patterns = [
+        ('five', EVAL_WEIGHTS['FIVE'], [[1, 1, 1, 1, 1]]),
+        ('live_four', EVAL_WEIGHTS['FOUR'], [[0, 1, 1, 1, 1, 0]]),
+        ('blocked_four', EVAL_WEIGHTS['BLOCKED_FOUR'], [
+            [0, 1, 1, 1, 1, 2], [2, 1, 1, 1, 1, 0], [0, 1, 1, 1, 1, 1], [1, 1, 1, 1, 0, 1]
+        ]),
+        ('live_three', EVAL_WEIGHTS['THREE'], [[0, 1, 1, 1, 0]]),
+        ('blocked_three', EVAL_WEIGHTS['BLOCKED_THREE'], [
+            [0, 1, 1, 1, 2], [2, 1, 1, 1, 0], [0, 1, 1, 1, 1], [1, 1, 1, 0, 1]
+        ]),
+        ('live_two', EVAL_WEIGHTS['TWO'], [[0, 1, 1, 0]]),
+        ('blocked_two', EVAL_WEIGHTS['BLOCKED_TWO'], [
+            [0, 1, 1, 2], [2, 1, 1, 0], [0, 1, 1, 1], [1, 1, 0, 1]
+        ]),
+        ('live_one', EVAL_WEIGHTS['ONE'], [[0, 1, 0]])
+    ]
+    rows = [(PATTERN_NAMES.index(name), score, template) for name, score, templates in patterns for template in templates]
+    templates = np.full((len(rows), 6), -1, dtype=np.int8)
+    for i, (_, _, template) in enumerate(rows):
+        templates[i, :len(template)] = template
+    lengths = np.array([len(template) for _, _, template in rows], dtype=np.int64)
+    pattern_ids = np.array([pattern_id for pattern_id, _, _ in rows], dtype=np.int64)
+    scores = np.array([score for _, score, _ in rows], dtype=np.int32)
+    return templates, lengths, pattern_ids, scores
+
+_TEMPLATES, _TEMPLATE_LENGTHS, _TEMPLATE_IDS, _TEMPLATE_SCORES = _build_pattern_table()
+
+_WALL = 3  # 棋盘边界在线条数组中的取值（按对手棋子处理）
+
+def _build_automaton():
+    """把所有棋型模板编译为Aho-Corasick自动机（字母表{0,1,2}，展开为完整转移表）
+    Returns:
+        (转移表[状态, 符号], 每个状态命中的棋型总分, 每个状态是否命中五连)
+    """
+    goto = [{}]
+    outputs = [[]]
+    for template, k, pattern_id, score in zip(_TEMPLATES, _TEMPLATE_LENGTHS, _TEMPLATE_IDS, _TEMPLATE_SCORES):
+        state = 0
+        for symbol in template[:k]:
+            symbol = int(symbol)
+            if symbol not in goto[state]:
+                goto.append({})
+                outputs.append([])
+                goto[state][symbol] = len(goto) - 1
+            state = goto[state][symbol]
+        outputs[state].append((int(score), PATTERN_NAMES[pattern_id] == 'five'))
+    
+    # 按BFS顺序计算失败指针，同时补全转移表并沿失败指针累积输出
+    n_states = len(goto)
+    transitions = np.zeros((n_states, 3), dtype=np.intp)
+    fail = [0] * n_states
+    state_scores = np.zeros(n_states, dtype=np.int32)
+    state_five = np.zeros(n_states, dtype=bool)
+    queue = []
+    for symbol in range(3):
+        child = goto[0].get(symbol)
+        if child is not None:
+            transitions[0, symbol] = child
+            queue.append(child)
+    while queue:
+        state = queue.pop(0)
+        state_scores[state] = sum(score for score, _ in outputs[state]) + state_scores[fail[state]]
+        state_five[state] = any(is_five for _, is_five in outputs[state]) or state_five[fail[state]]
+        for symbol in range(3):
+            child = goto[state].get(symbol)
+            if child is None:
+                transitions[state, symbol] = transitions[fail[state], symbol]
+            else:
+                fail[child] = transitions[fail[state], symbol]
+                transitions[state, symbol] = child
+                queue.append(child)
+    return transitions, state_scores, state_five
+
+_AC_TRANSITIONS, _AC_SCORES, _AC_FIVE = _build_automaton()
+
+@njit(cache=True, nogil=True)
+def _scan_lines_kernel(normalized, transitions, state_scores, state_five):
+    """逐条线在Aho-Corasick自动机上推进并累计得分（JIT编译时使用；纯Python下按列向量化更快）"""
+    total_score = 0
+    has_five = False
+    for i in range(normalized.shape[0]):
+        state = 0
+        for t in range(normalized.shape[1]):
+            state = transitions[state, normalized[i, t]]
+            total_score += state_scores[state]
+            has_five = has_five or state_five[state]
+    return total_score, has_five
+
+@njit(cache=True, nogil=True)
+def _match_pattern_kernel(segment, color, opponent, templates, lengths, pattern_ids, scores):
+    """匹配线段中优先级最高的棋型
+    Returns:
+        (棋型ID, 得分)
+    """
+    n = segment.shape[0]
+    normalized = np.zeros(n, dtype=np.int8)
+    for i in range(n):
+        if segment[i] == color:
+            normalized[i] = 1
+        elif segment[i] == opponent:
+            normalized[i] = 2
+    
+    for t in range(templates.shape[0]):
+        k = lengths[t]
+        for i in range(n - k + 1):
+            matched = True
+            for j in range(k):
+                if normalized[i + j] != templates[t, j]:
+                    matched = False
+                    break
+            if matched:
+                return pattern_ids[t], scores[t]
+    return 0, 0
+
+@njit(cache=True, nogil=True)
+def _is_board_full_kernel(board, empty):
+    """判断棋盘是否已无空位（遇到第一个空位即返回）"""
+    for i in range(board.shape[0]):
+        for j in range(board.shape[1]):
+            if board[i, j] == empty:
+                return False
+    return True
+
+# 位置权重的定点小数位数（权重按Q8定点数存储，乘法后右移还原）
+_WEIGHT_SHIFT = 8
 
 class BoardEvaluator:
     """棋盘评估器（独立的评估工具，供所有AI使用）"""
     def __init__(self, board_size: int = 15):
         self.board_size = board_size
-        self.logger = Logger.get_instance()
+        self.logger = _LOGGER
         
         # 棋型模板（用于快速匹配）
         self.pattern_templates = self._init_pattern_templates()
         
         # 位置权重（中心位置权重更高）
         self.position_weights = self._init_position_weights()
+        self.position_weights_q8 = np.round(self.position_weights * (1 << _WEIGHT_SHIFT)).astype(np.int32)
+        
+        # 所有横、竖、斜线（长度>=5）的下标表（用于整盘向量化评估）
+        self.line_index = self._init_line_index()
+        
+        # 以每个位置为中心的长度9斜线下标（与棋盘内容无关，只需计算一次）
+        self.diag_idx, self.anti_diag_idx = self._init_diagonal_index()
+        
+        # 以每个位置为中心、四个方向上长度9窗口的展平下标（用于批量评估所有空位）
+        self.window_index, self.window_valid = self._init_window_index()
     
     def _init_pattern_templates(self) -> Dict[str, List[List[int]]]:
         """初始化棋型模板"""
@@ -53,169 +201,235 @@ class BoardEvaluator:
     
     def _init_position_weights(self) -> np.ndarray:
         """初始化位置权重矩阵（中心位置权重高）"""
-        weights = np.ones((self.board_size, self.board_size), dtype=np.float32)
         center = self.board_size // 2
         max_distance = np.sqrt(2) * center  # 对角线最大距离
         
-        for i in range(self.board_size):
-            for j in range(self.board_size):
-                # 计算到中心的距离
-                distance = np.sqrt((i - center)**2 + (j - center)**2)
-                # 距离越近，权重越高（0.5-1.5之间）
-                weights[i][j] = 1.5 - (distance / max_distance)
-        return weights
+        # 计算每个位置到中心的距离（广播一次算完）
+        ii, jj = np.ogrid[:self.board_size, :self.board_size]
+        distance = np.sqrt((ii - center) ** 2 + (jj - center) ** 2)
+        # 距离越近，权重越高（0.5-1.5之间）
+        return (1.5 - distance / max_distance).astype(np.float32)
+    
+    def _init_diagonal_index(self) -> Tuple[Dict, Dict]:
+        """预计算所有合法中心点的正/反对角线下标数组（用于一次性花式索引取线段）"""
+        offsets = np.arange(9) - 4
+        diag_idx = {}
+        anti_diag_idx = {}
+        for x in range(4, self.board_size - 4):
+            for y in range(4, self.board_size - 4):
+                diag_idx[(x, y)] = (x + offsets, y + offsets)
+                anti_diag_idx[(x, y)] = (x + offsets, y - offsets)
+        return diag_idx, anti_diag_idx
+    
+    def _init_window_index(self) -> Tuple[np.ndarray, np.ndarray]:
+        """预计算每个位置四个方向长度9窗口的展平下标
+        Returns:
+            (下标数组[N*N, 4, 9]，越界处指向展平棋盘末尾追加的哨兵格；窗口是否完整位于棋盘内[N*N, 4])
+        """
+        size = self.board_size
+        offsets = np.arange(9) - 4
+        xs, ys = np.divmod(np.arange(size * size), size)
+        index = np.full((size * size, len(WIN_DIRECTIONS), 9), size * size, dtype=np.intp)
+        valid = np.zeros((size * size, len(WIN_DIRECTIONS)), dtype=bool)
+        for d, (dx, dy) in enumerate(WIN_DIRECTIONS):
+            wx = xs[:, None] + dx * offsets
+            wy = ys[:, None] + dy * offsets
+            inside = (wx >= 0) & (wx < size) & (wy >= 0) & (wy < size)
+            index[:, d] = np.where(inside, wx * size + wy, size * size)
+            valid[:, d] = inside.all(axis=1)
+        return index, valid
+    
+    def _init_line_index(self) -> np.ndarray:
+        """预计算所有横、竖、斜线在展平棋盘中的下标
+        每条线两端及长度不足的部分填充边界下标（指向展平棋盘末尾追加的边界格）
+        """
+        size = self.board_size
+        wall = size * size
+        index = np.arange(size * size).reshape(size, size)
+        lines = list(index) + list(index.T)
+        for offset in range(-(size - 5), size - 4):
+            lines.append(np.diagonal(index, offset))
+            lines.append(np.diagonal(np.fliplr(index), offset))
+        line_index = np.full((len(lines), size + 2), wall, dtype=np.intp)
+        for i, line in enumerate(lines):
+            line_index[i, 1:len(line) + 1] = line
+        return line_index
     
-    def _get_line_segments(self, board: List[List[int]], x: int, y: int) -> List[List[int]]:
-        """获取以(x,y)为中心的所有线段（横、竖、两个对角线）"""
+    def _score_lines(self, board_np: np.ndarray, color: int) -> Tuple[int, bool]:
+        """一次性统计某颜色在所有线上的棋型得分
+        所有线同时在Aho-Corasick自动机上推进，每条线只扫描一遍即可找出全部模板命中
+        Returns:
+            (棋型总分, 是否存在五连)
+        """
+        lines = np.append(board_np.ravel(), _WALL)[self.line_index]
+        # 归一化：自己=1，空=0，对手/边界=2
+        normalized = np.where(lines == color, 1, np.where(lines == PIECE_COLORS['EMPTY'], 0, 2))
+        if NUMBA_AVAILABLE:
+            total_score, has_five = _scan_lines_kernel(normalized, _AC_TRANSITIONS, _AC_SCORES, _AC_FIVE)
+            return int(total_score), bool(has_five)
+        states = np.zeros(normalized.shape[0], dtype=np.intp)
+        total_score = 0
+        has_five = False
+        for t in range(normalized.shape[1]):
+            states = _AC_TRANSITIONS[states, normalized[:, t]]
+            total_score += int(_AC_SCORES[states].sum())
+            has_five = has_five or bool(_AC_FIVE[states].any())
+        return total_score, has_five
+    
+    def _get_line_segments(self, board_np: np.ndarray, x: int, y: int) -> List[np.ndarray]:
+        """获取以(x,y)为中心的所有线段（横、竖、两个对角线）
+        Args:
+            board_np: numpy棋盘（由调用方一次性转换，此处不再复制）
+        """
         segments = []
-        board_np = np.array(board)
         
         # 横向线段（长度9，中心为(x,y)）
         if y - 4 >= 0 and y + 4 < self.board_size:
-            segments.append(board_np[x, y-4:y+5].tolist())
+            segments.append(board_np[x, y-4:y+5])
         # 纵向线段
         if x - 4 >= 0 and x + 4 < self.board_size:
-            segments.append(board_np[x-4:x+5, y].tolist())
-        # 正对角线线段
-        if x - 4 >= 0 and x + 4 < self.board_size and y - 4 >= 0 and y + 4 < self.board_size:
-            diagonal = [board_np[x - 4 + k][y - 4 + k] for k in range(9)]
-            segments.append(diagonal)
-        # 反对角线线段
-        if x - 4 >= 0 and x + 4 < self.board_size and y + 4 < self.board_size and y - 4 >= 0:
-            diagonal = [board_np[x - 4 + k][y + 4 - k] for k in range(9)]
-            segments.append(diagonal)
+            segments.append(board_np[x-4:x+5, y])
+        # 正对角线与反对角线线段（使用预计算的下标一次取出）
+        if (x, y) in self.diag_idx:
+            segments.append(board_np[self.diag_idx[(x, y)]])
+            segments.append(board_np[self.anti_diag_idx[(x, y)]])
         
         return segments
     
-    def _match_pattern(self, segment: List[int], color: int) -> Tuple[str, float]:
+    def _match_pattern_id(self, segment: np.ndarray, color: int) -> Tuple[int, int]:
+        """匹配棋型并返回(棋型ID, 得分)（JIT编译的热路径）"""
+        opponent = OPPONENT_COLORS[color]
+        return _match_pattern_kernel(
+            np.asarray(segment, dtype=np.int8), color, opponent,
+            _TEMPLATES, _TEMPLATE_LENGTHS, _TEMPLATE_IDS, _TEMPLATE_SCORES
+        )
+    
+    def _match_pattern(self, segment: List[int], color: int) -> Tuple[str, int]:
         """匹配棋型并返回得分"""
-        opponent = PIECE_COLORS['WHITE'] if color == PIECE_COLORS['BLACK'] else PIECE_COLORS['BLACK']
-        # 将线段中的颜色替换为1（自己）、2（对手）、0（空）
-        normalized = [1 if c == color else 2 if c == opponent else 0 for c in segment]
-        
-        # 检查五连
-        for i in range(len(normalized) - 4):
-            sub = normalized[i:i+5]
-            if sub == [1, 1, 1, 1, 1]:
-                return 'five', EVAL_WEIGHTS['FIVE']
-        
-        # 检查活四
-        for i in range(len(normalized) - 5):
-            sub = normalized[i:i+6]
-            if sub == [0, 1, 1, 1, 1, 0]:
-                return 'live_four', EVAL_WEIGHTS['FOUR']
-        
-        # 检查冲四
-        blocked_four_patterns = [
-            [0, 1, 1, 1, 1, 2],
-            [2, 1, 1, 1, 1, 0],
-            [0, 1, 1, 1, 1, 1],
-            [1, 1, 1, 1, 0, 1]
-        ]
-        for pattern in blocked_four_patterns:
-            pattern_len = len(pattern)
-            for i in range(len(normalized) - pattern_len + 1):
-                if normalized[i:i+pattern_len] == pattern:
-                    return 'blocked_four', EVAL_WEIGHTS['BLOCKED_FOUR']
-        
-        # 检查活三
-        for i in range(len(normalized) - 4):
-            sub = normalized[i:i+5]
-            if sub == [0, 1, 1, 1, 0]:
-                return 'live_three', EVAL_WEIGHTS['THREE']
-        
-        # 检查冲三
-        blocked_three_patterns = [
-            [0, 1, 1, 1, 2],
-            [2, 1, 1, 1, 0],
-            [0, 1, 1, 1, 1],
-            [1, 1, 1, 0, 1]
-        ]
-        for pattern in blocked_three_patterns:
-            pattern_len = len(pattern)
-            for i in range(len(normalized) - pattern_len + 1):
-                if normalized[i:i+pattern_len] == pattern:
-                    return 'blocked_three', EVAL_WEIGHTS['BLOCKED_THREE']
-        
-        # 检查活二
-        for i in range(len(normalized) - 3):
-            sub = normalized[i:i+4]
-            if sub == [0, 1, 1, 0]:
-                return 'live_two', EVAL_WEIGHTS['TWO']
-        
-        # 检查冲二
-        blocked_two_patterns = [
-            [0, 1, 1, 2],
-            [2, 1, 1, 0],
-            [0, 1, 1, 1],
-            [1, 1, 0, 1]
-        ]
-        for pattern in blocked_two_patterns:
-            pattern_len = len(pattern)
-            for i in range(len(normalized) - pattern_len + 1):
-                if normalized[i:i+pattern_len] == pattern:
-                    return 'blocked_two', EVAL_WEIGHTS['BLOCKED_TWO']
-        
-        # 活一
-        for i in range(len(normalized) - 2):
-            sub = normalized[i:i+3]
-            if sub == [0, 1, 0]:
-                return 'live_one', EVAL_WEIGHTS['ONE']
-        
-        return 'none', 0.0
+        pattern_id, score = self._match_pattern_id(segment, color)
+        return PATTERN_NAMES[pattern_id], int(score)
     
-    def evaluate_position(self, board: List[List[int]], x: int, y: int, color: int) -> float:
-        """评估单个位置的得分"""
+    def evaluate_position(self, board: List[List[int]], x: int, y: int, color: int) -> int:
+        """评估单个位置的得分（board必须可写，评估期间会临时落子）"""
         if board[x][y] != PIECE_COLORS['EMPTY']:
-            return 0.0
-        
-        # 模拟落子
-        temp_board = [row.copy() for row in board]
-        temp_board[x][y] = color
-        
-        # 获取所有线段
-        segments = self._get_line_segments(temp_board, x, y)
-        
-        # 匹配棋型并计算得分
-        total_score = 0.0
-        for segment in segments:
-            pattern, score = self._match_pattern(segment, color)
-            total_score += score
-        
-        # 乘以位置权重
-        total_score *= self.position_weights[x][y]
-        
-        return total_score
+            return 0
+        
+        # 只转换一次（numpy棋盘不复制），原地模拟落子，评估完成后恢复
+        board_np = np.asarray(board)
+        board_np[x, y] = color
+        try:
+            # 获取所有线段
+            segments = self._get_line_segments(board_np, x, y)
+            
+            # 匹配棋型并计算得分
+            total_score = 0
+            for segment in segments:
+                _, score = self._match_pattern_id(segment, color)
+                total_score += int(score)
+        finally:
+            board_np[x, y] = PIECE_COLORS['EMPTY']
+        
+        # 乘以位置权重（定点数乘法）
+        return (total_score * int(self.position_weights_q8[x, y])) >> _WEIGHT_SHIFT
     
-    def evaluate_board(self, board: List[List[int]], ai_color: int) -> float:
-        """评估整个棋盘的得分（对AI有利为正，对手有利为负）"""
-        opponent_color = PIECE_COLORS['WHITE'] if ai_color == PIECE_COLORS['BLACK'] else PIECE_COLORS['BLACK']
-        
-        # 检查是否有获胜者
-        ai_win, _ = self._is_win(board, ai_color)
+    def evaluate_positions(self, board: List[List[int]], color: int) -> np.ndarray:
+        """批量评估所有位置的得分（与逐个调用evaluate_position结果一致，已有棋子的位置为0）
+        Returns:
+            得分矩阵[N, N]
+        """
+        board_np = np.asarray(board)
+        scores = self._score_windows(board_np, self.window_index, self.window_valid, color)
+        scores = scores.reshape(board_np.shape) * self.position_weights_q8 >> _WEIGHT_SHIFT
+        scores[board_np != PIECE_COLORS['EMPTY']] = 0
+        return scores
+    
+    def evaluate_positions_batch(self, board: List[List[int]], xs: np.ndarray, ys: np.ndarray, color: int) -> np.ndarray:
+        """批量评估指定位置的得分（与逐个调用evaluate_position结果一致，已有棋子的位置为0）
+        Returns:
+            与xs/ys等长的得分数组
+        """
+        board_np = np.asarray(board)
+        xs = np.asarray(xs, dtype=np.intp)
+        ys = np.asarray(ys, dtype=np.intp)
+        cells = xs * self.board_size + ys
+        scores = self._score_windows(board_np, self.window_index[cells], self.window_valid[cells], color)
+        scores = scores * self.position_weights_q8[xs, ys] >> _WEIGHT_SHIFT
+        scores[board_np[xs, ys] != PIECE_COLORS['EMPTY']] = 0
+        return scores
+    
+    def creates_pattern(self, board: List[List[int]], xs: np.ndarray, ys: np.ndarray, color: int, template: List[int]) -> np.ndarray:
+        """批量判断在指定位置落子后，经过该位置的四条线中是否出现给定棋型（1=自己，2=对手，0=空）
+        Returns:
+            与xs/ys等长的布尔数组
+        """
+        board_np = np.asarray(board)
+        cells = np.asarray(xs, dtype=np.intp) * self.board_size + np.asarray(ys, dtype=np.intp)
+        segments = self._normalized_segments(board_np, self.window_index[cells], color)
+        windows = np.lib.stride_tricks.sliding_window_view(segments, len(template), axis=-1)
+        hit = (windows == np.asarray(template, dtype=np.int8)).all(axis=-1).any(axis=-1)
+        return hit.any(axis=1)
+    
+    def _normalized_segments(self, board_np: np.ndarray, window_index: np.ndarray, color: int) -> np.ndarray:
+        """取出窗口线段并归一化为 1=自己，2=对手，0=空（越界的哨兵格按对手处理），同时模拟在中心落子"""
+        flat = board_np.ravel()
+        normalized = np.full(flat.size + 1, 2, dtype=np.int8)
+        normalized[:-1] = 0
+        normalized[:-1][flat == color] = 1
+        normalized[:-1][flat == OPPONENT_COLORS[color]] = 2
+        segments = normalized[window_index]
+        segments[:, :, 4] = 1  # 模拟在中心落子
+        return segments
+    
+    def _score_windows(self, board_np: np.ndarray, window_index: np.ndarray, window_valid: np.ndarray, color: int) -> np.ndarray:
+        """对给定的窗口下标（[M, 4, 9]）模拟在中心落子后匹配棋型，返回每个中心四个方向的得分之和（未乘位置权重）"""
+        segments = self._normalized_segments(board_np, window_index, color)
+        
+        # 按优先级依次匹配模板，每条线段取第一个命中的棋型
+        line_scores = np.zeros(window_valid.shape, dtype=np.int32)
+        matched = ~window_valid
+        for template, k, score in zip(_TEMPLATES, _TEMPLATE_LENGTHS, _TEMPLATE_SCORES):
+            windows = np.lib.stride_tricks.sliding_window_view(segments, k, axis=-1)
+            hit = (windows == template[:k]).all(axis=-1).any(axis=-1) & ~matched
+            line_scores[hit] = score
+            matched |= hit
+        return line_scores.sum(axis=1, dtype=np.int64)
+    
+    def evaluate_board(self, board: List[List[int]], ai_color: int) -> int:
+        """评估整个棋盘的得分（对AI有利为正，对手有利为负）
+        对横、竖、斜所有线上的棋型做一次向量化计数，而不是逐个空位模拟落子
+        """
+        opponent_color = OPPONENT_COLORS[ai_color]
+        board_np = np.asarray(board, dtype=np.int8)
+        
+        # 检查是否有获胜者（五连模板命中即获胜）
+        ai_score, ai_win = self._score_lines(board_np, ai_color)
         if ai_win:
             return EVAL_WEIGHTS['FIVE'] * 2
         
-        opponent_win, _ = self._is_win(board, opponent_color)
+        opponent_score, opponent_win = self._score_lines(board_np, opponent_color)
         if opponent_win:
             return -EVAL_WEIGHTS['FIVE'] * 2
         
-        # 遍历所有空位置，计算得分
-        total_score = 0.0
-        for i in range(self.board_size):
-            for j in range(self.board_size):
-                if board[i][j] == PIECE_COLORS['EMPTY']:
-                    # 计算AI落子得分
-                    ai_score = self.evaluate_position(board, i, j, ai_color)
-                    # 计算对手落子得分（取反）
-                    opponent_score = -self.evaluate_position(board, i, j, opponent_color)
-                    # 总得分
-                    total_score += ai_score + opponent_score
+        # 位置得分（中心位置的棋子更有价值）
+        position_score = (int(
+            self.position_weights_q8[board_np == ai_color].sum() - self.position_weights_q8[board_np == opponent_color].sum()
+        ) * EVAL_WEIGHTS['ONE']) >> _WEIGHT_SHIFT
         
-        return total_score
+        return ai_score - opponent_score + position_score
     
-    def _is_win(self, board: List[List[int]], color: int) -> Tuple[bool, List[Tuple[int, int]]]:
-        """判断是否获胜（同BaseAI，但这里用于独立评估）"""
+    def _is_win(
+        self,
+        board: List[List[int]],
+        color: int,
+        last_move: Optional[Tuple[int, int]] = None
+    ) -> Tuple[bool, List[Tuple[int, int]]]:
+        """判断是否获胜（同BaseAI，但这里用于独立评估）
+        Args:
+            last_move: 最后一步落子提示；提供时只检查经过该点的四条线
+        """
+        if last_move is not None:
+            return self._is_win_at(board, last_move[0], last_move[1], color)
+        
         # 横向
         for i in range(self.board_size):
             for j in range(self.board_size - 4):
@@ -242,22 +456,46 @@ class BoardEvaluator:
         
         return False, []
     
-    def get_key_moves(self, board: List[List[int]], ai_color: int, top_k: int = 5) -> List[Tuple[int, int, float]]:
+    def _is_board_full(self, board: List[List[int]]) -> bool:
+        """判断棋盘是否已下满"""
+        return bool(_is_board_full_kernel(np.asarray(board), PIECE_COLORS['EMPTY']))
+    
+    def _is_win_at(self, board: List[List[int]], x: int, y: int, color: int) -> Tuple[bool, List[Tuple[int, int]]]:
+        """判断经过(x,y)的四条线上是否存在五连"""
+        if board[x][y] != color:
+            return False, []
+        for dx, dy in WIN_DIRECTIONS:
+            line = [(x, y)]
+            for sign in (1, -1):
+                nx, ny = x + sign * dx, y + sign * dy
+                for _ in range(4):
+                    if not (0 <= nx < self.board_size and 0 <= ny < self.board_size) or board[nx][ny] != color:
+                        break
+                    line.append((nx, ny))
+                    nx += sign * dx
+                    ny += sign * dy
+            if len(line) >= 5:
+                return True, sorted(line)[:5]
+        return False, []
+    
+    def get_key_moves(self, board: List[List[int]], ai_color: int, top_k: int = 5) -> List[Tuple[int, int, int]]:
         """获取关键落子（得分最高的top_k个位置）"""
-        key_moves = []
-        for i in range(self.board_size):
-            for j in range(self.board_size):
-                if board[i][j] == PIECE_COLORS['EMPTY']:
-                    score = self.evaluate_position(board, i, j, ai_color)
-                    key_moves.append((i, j, score))
-        
-        # 按得分降序排序，取前top_k
-        key_moves.sort(key=lambda x: x[2], reverse=True)
-        return key_moves[:top_k]
+        board_np = np.asarray(board)
+        scores = self.evaluate_positions(board_np, ai_color)
+        scores[board_np != PIECE_COLORS['EMPTY']] = -1  # 得分非负，已有棋子的位置不会被选中
+        
+        # 只做部分选择取出前top_k，再对这top_k个排序
+        flat_scores = scores.ravel()
+        top_k = min(top_k, int(np.count_nonzero(board_np == PIECE_COLORS['EMPTY'])))
+        if top_k <= 0:
+            return []
+        top = np.argpartition(flat_scores, -top_k)[-top_k:]
+        top = top[np.lexsort((top, -flat_scores[top]))]
+        return [(int(i // self.board_size), int(i % self.board_size), int(flat_scores[i])) for i in top]
     
     def analyze_board(self, board: List[List[int]], ai_color: int) -> Dict:
         """生成棋盘分析报告"""
-        opponent_color = PIECE_COLORS['WHITE'] if ai_color == PIECE_COLORS['BLACK'] else PIECE_COLORS['BLACK']
+        opponent_color = OPPONENT_COLORS[ai_color]
         
         # 获取关键落子
         ai_key_moves = self.get_key_moves(board, ai_color, 3)
@@ -292,4 +530,9 @@ class BoardEvaluator:
             'opponent_key_moves': [(x, y, round(score, 2)) for x, y, score in opponent_key_moves],
             'threats': threats,
             'key_move': ai_key_moves[0][:2] if ai_key_moves else None
-        }
\ No newline at end of file
+        }
+
+@functools.lru_cache(maxsize=None)
+def get_evaluator(board_size: int = 15) -> BoardEvaluator:
+    """获取共享的棋盘评估器（评估器不保存对局状态，按棋盘尺寸缓存，避免重复构建模板与权重表）"""
+    return BoardEvaluator(board_size)
@@ -1,93 +1,116 @@
+import math
 import numpy as np
 import random
-from typing import List, Tuple, Dict, Optional, Callable
-from Common.constants import PIECE_COLORS, AI_LEVELS, EVAL_WEIGHTS
+from typing import List, Tuple, Dict, Optional, Callable, Set, Sequence
+from Common.constants import PIECE_COLORS, AI_LEVELS, EVAL_WEIGHTS, OPPONENT_COLORS
 from Common.config import Config
 from Common.logger import Logger
-from AI.base_ai import BaseAI
-from AI.evaluator import BoardEvaluator
+from Common.error_handler import AIError
+from AI.base_ai import BaseAI, Board, count_neighbors, update_neighbors, to_bitboard, bitboard_five, winning_cells
+from AI.evaluator import get_evaluator
+
+# 热路径上使用的常量（导入时从字典取出一次）
+_EMPTY = PIECE_COLORS['EMPTY']
+_W_FIVE = EVAL_WEIGHTS['FIVE']
+_W_THREE = EVAL_WEIGHTS['THREE']
+_W_THREE_HALF = EVAL_WEIGHTS['THREE'] / 2
+
+def check_terminal(
+    bitboards: Sequence[int],
+    board_size: int,
+    last_color: Optional[int],
+    board_full: bool
+) -> Tuple[bool, int]:
+    """判断局面是否结束（新的五连只可能由最后一步落子方形成，只需检查其位棋盘）
+    Args:
+        bitboards: 黑、白双方的位棋盘
+        last_color: 最后一步落子的颜色（None表示未知，检查双方）
+        board_full: 棋盘是否已下满
+    Returns:
+        (是否结束, 获胜方颜色/0表示平局)
+    """
+    colors = (PIECE_COLORS['BLACK'], PIECE_COLORS['WHITE']) if last_color is None else (last_color,)
+    for color in colors:
+        if bitboard_five(bitboards[color - 1], board_size)[0]:
+            return True, color
+    if board_full:
+        return True, 0
+    return False, 0
+
+def _get_candidates(empties: Set[Tuple[int, int]], neighbor_count: np.ndarray) -> List[Tuple[int, int]]:
+    """从空位中筛选已有棋子邻域内的候选落子（空棋盘时返回中心点）"""
+    candidates = [move for move in empties if neighbor_count[move] > 0]
+    if not candidates and empties:
+        center = neighbor_count.shape[0] // 2
+        candidates = [(center, center)] if (center, center) in empties else list(empties)
+    return candidates
 
 class MCTSNode:
     """MCTS节点类（蒙特卡洛树搜索节点）"""
-    def __init__(self, board: List[List[int]], parent: Optional['MCTSNode'] = None, move: Optional[Tuple[int, int]] = None):
-        self.board = board  # 当前节点的棋盘状态
+    def __init__(
+        self,
+        board: Board,
+        parent: Optional['MCTSNode'] = None,
+        move: Optional[Tuple[int, int]] = None,
+        empties: Optional[Set[Tuple[int, int]]] = None,
+        neighbor_count: Optional[np.ndarray] = None,
+        bitboards: Optional[Tuple[int, int]] = None,
+        board_hash: int = 0
+    ):
+        self.board = np.ascontiguousarray(board, dtype=np.uint8)  # 当前节点的棋盘状态
+        # 黑、白双方的位棋盘（子节点在父节点位棋盘上置位得到，用于快速五连判断）
+        if bitboards is None:
+            bitboards = (to_bitboard(self.board, PIECE_COLORS['BLACK']), to_bitboard(self.board, PIECE_COLORS['WHITE']))
+        self.bitboards = bitboards
+        self.board_hash = board_hash  # 棋盘的Zobrist哈希（子节点由父节点哈希异或落子对应的键得到）
         self.parent = parent  # 父节点
+        self.depth = 0 if parent is None else parent.depth + 1  # 节点在搜索树中的深度
         self.move = move  # 到达当前节点的落子
         self.children = []  # 子节点列表
         self.visits = 0  # 访问次数
         self.wins = 0  # 获胜次数
-        self.untried_moves = self._get_empty_positions(board)  # 未尝试的落子
+        # 空位集合（子节点由父节点的集合去掉落子得到，无需重新扫描棋盘）
+        self.empties = self._get_empty_positions(self.board) if empties is None else empties
+        # 邻域棋子计数（子节点复制父节点的计数后增量更新）
+        self.neighbor_count = count_neighbors(self.board) if neighbor_count is None else neighbor_count
+        self.untried_moves = _get_candidates(self.empties, self.neighbor_count)  # 未尝试的落子（只考虑已有棋子的邻域）
         self.value = 0.0  # 节点价值（结合评估得分）
     
-    def _get_empty_positions(self, board: List[List[int]]) -> List[Tuple[int, int]]:
+    def _get_empty_positions(self, board: Board) -> Set[Tuple[int, int]]:
         """获取棋盘上的空位置"""
-        empty_pos = []
-        board_size = len(board)
-        for i in range(board_size):
-            for j in range(board_size):
-                if board[i][j] == PIECE_COLORS['EMPTY']:
-                    empty_pos.append((i, j))
-        return empty_pos
+        return set(map(tuple, np.argwhere(board == _EMPTY).tolist()))
     
     def is_terminal(self, board_size: int) -> Tuple[bool, int]:
         """判断节点是否为终端节点（游戏结束）
         Returns:
             (是否终端节点, 获胜方颜色/0表示平局)
         """
-        # 检查横向
-        for i in range(board_size):
-            for j in range(board_size - 4):
-                color = self.board[i][j]
-                if color != PIECE_COLORS['EMPTY'] and all(self.board[i][j + k] == color for k in range(5)):
-                    return True, color
-        
-        # 检查纵向
-        for j in range(board_size):
-            for i in range(board_size - 4):
-                color = self.board[i][j]
-                if color != PIECE_COLORS['EMPTY'] and all(self.board[i + k][j] == color for k in range(5)):
-                    return True, color
-        
-        # 检查正对角线
-        for i in range(board_size - 4):
-            for j in range(board_size - 4):
-                color = self.board[i][j]
-                if color != PIECE_COLORS['EMPTY'] and all(self.board[i + k][j + k] == color for k in range(5)):
-                    return True, color
-        
-        # 检查反对角线
-        for i in range(board_size - 4):
-            for j in range(4, board_size):
-                color = self.board[i][j]
-                if color != PIECE_COLORS['EMPTY'] and all(self.board[i + k][j - k] == color for k in range(5)):
-                    return True, color
-        
-        # 检查棋盘是否下满（平局）
-        if not self.untried_moves:
-            return True, 0
-        
-        return False, 0
+        # 根节点没有最后一步落子，检查双方
+        last_color = None if self.move is None else int(self.board[self.move])
+        return check_terminal(self.bitboards, board_size, last_color, not self.empties)
     
     def uct_select_child(self, exploration_constant: float = 1.414) -> 'MCTSNode':
-        """使用UCT算法选择子节点（平衡探索与利用）"""
-        # 计算所有子节点的UCT值
-        uct_values = []
+        """使用UCT算法选择子节点（平衡探索与利用）
+        UCT公式：胜率 + 探索常数 * sqrt(ln(父节点访问次数)/子节点访问次数)
+        """
+        # 父节点相关的项对所有子节点相同，只计算一次
+        exploration_scale = exploration_constant * math.sqrt(math.log(self.visits)) if self.visits > 0 else 0.0
+        best_child = None
+        best_value = -float('inf')
         for child in self.children:
             if child.visits == 0:
-                uct_value = float('inf')  # 未访问过的节点优先选择
-            else:
-                # UCT公式：胜率 + 探索常数 * sqrt(ln(父节点访问次数)/子节点访问次数)
-                win_rate = child.wins / child.visits
-                exploration_term = exploration_constant * np.sqrt(np.log(self.visits) / child.visits)
-                uct_value = win_rate + exploration_term
-            uct_values.append(uct_value)
-        
-        # 选择UCT值最大的子节点
-        max_index = np.argmax(uct_values)
-        return self.children[max_index]
+                return child  # 未访问过的节点优先选择
+            uct_value = child.wins / child.visits + exploration_scale / math.sqrt(child.visits)
+            if uct_value > best_value:
+                best_value = uct_value
+                best_child = child
+        return best_child
     
-    def expand(self, color: int) -> 'MCTSNode':
-        """扩展节点（选择一个未尝试的落子创建子节点）"""
+    def expand(self, color: int, zobrist_keys: List[List[List[int]]]) -> 'MCTSNode':
+        """扩展节点（选择一个未尝试的落子创建子节点）
+        Args:
+            zobrist_keys: Zobrist键表[x][y][颜色-1]（用于增量计算子节点的棋盘哈希）
+        """
         if not self.untried_moves:
             raise AIError("没有可扩展的落子", 4201)
         
@@ -96,40 +119,51 @@ class MCTSNode:
         x, y = move
         
         # 模拟落子，创建新棋盘
-        new_board = [row.copy() for row in self.board]
-        new_board[x][y] = color
+        new_board = self.board.copy()
+        new_board[x, y] = color
         
         # 创建子节点
-        child_node = MCTSNode(new_board, self, move)
+        neighbor_count = self.neighbor_count.copy()
+        update_neighbors(neighbor_count, x, y, 1)
+        bitboards = list(self.bitboards)
+        bitboards[color - 1] |= 1 << (x * (len(new_board) + 1) + y)
+        board_hash = self.board_hash ^ zobrist_keys[x][y][color - 1]
+        child_node = MCTSNode(new_board, self, move, self.empties - {move}, neighbor_count, tuple(bitboards), board_hash)
         self.children.append(child_node)
         return child_node
     
     def backpropagate(self, result: int, ai_color: int):
-        """回溯更新节点的访问次数和获胜次数"""
-        self.visits += 1
-        
+        """回溯更新节点的访问次数和获胜次数（沿父节点指针迭代，避免逐层递归）"""
         # 判断结果对AI是否有利
         if result == ai_color:
-            self.wins += 1
-            self.value += EVAL_WEIGHTS['FIVE']  # 获胜价值
+            wins, value = 1, _W_FIVE  # 获胜价值
         elif result == 0:
-            self.value += EVAL_WEIGHTS['THREE'] / 2  # 平局价值
+            wins, value = 0, _W_THREE_HALF  # 平局价值
         else:
-            self.value -= EVAL_WEIGHTS['FIVE']  # 失败价值
+            wins, value = 0, -_W_FIVE  # 失败价值
         
-        # 递归更新父节点
-        if self.parent:
-            self.parent.backpropagate(result, ai_color)
+        node = self
+        while node is not None:
+            node.visits += 1
+            node.wins += wins
+            node.value += value
+            node = node.parent
 
 class MCTSAI(BaseAI):
     """MCTS（蒙特卡洛树搜索）AI"""
     def __init__(self, color: int, level: str = AI_LEVELS['HARD']):
         super().__init__(color, level)
-        self.evaluator = BoardEvaluator(self.board_size)  # 棋盘评估器
+        self.evaluator = get_evaluator(self.board_size)  # 棋盘评估器（共享实例）
         self.iterations = self._get_iterations_by_level()  # 搜索迭代次数
         self.exploration_constant = 1.414  # UCT探索常数
         self.simulation_depth = 5  # 模拟最大深度
+        self.rollout_temperature = self._get_rollout_temperature_by_level()  # 模拟落子的随机温度（0表示总选最高分）
         self.root = None  # MCTS根节点
+        self._node_index: Dict[int, MCTSNode] = {}  # 按棋盘Zobrist哈希索引的搜索树节点
+        self._max_depth = 0  # 搜索树的最大深度（扩展节点时增量维护）
+        # 所有模拟共用的预分配缓冲区（模拟顺序执行，每次从叶节点整块复制一次即可）
+        self._sim_board = np.empty((self.board_size, self.board_size), dtype=np.uint8)
+        self._sim_neighbors = np.empty((self.board_size, self.board_size), dtype=np.int16)
     
     def _get_iterations_by_level(self) -> int:
         """根据难度获取迭代次数"""
@@ -141,17 +175,40 @@ class MCTSAI(BaseAI):
         }
         return iterations_map.get(self.level, 1000)
     
+    def _get_rollout_temperature_by_level(self) -> float:
+        """根据难度获取模拟落子的温度（温度越高，低分落子被选中的概率越大）"""
+        temperature_map = {
+            AI_LEVELS['EASY']: float(EVAL_WEIGHTS['TWO']),
+            AI_LEVELS['MEDIUM']: float(EVAL_WEIGHTS['BLOCKED_TWO']),
+            AI_LEVELS['HARD']: 0.0,
+            AI_LEVELS['EXPERT']: 0.0
+        }
+        return temperature_map.get(self.level, 0.0)
+    
+    def _choose_rollout_move(self, scores: np.ndarray) -> int:
+        """根据候选落子得分选择模拟落子的下标（温度为0时取最大值，否则按softmax(得分/温度)抽样）"""
+        if self.rollout_temperature <= 0:
+            return int(np.argmax(scores))
+        logits = (scores - scores.max()) / self.rollout_temperature
+        probs = np.exp(logits)
+        return int(np.random.choice(len(scores), p=probs / probs.sum()))
+    
     def move(self, board: List[List[int]], thinking_callback: Optional[Callable[[Dict], None]] = None) -> Tuple[int, int]:
         """计算最佳落子（MCTS算法）"""
         self.set_thinking_callback(thinking_callback)
         
-        # 初始化根节点
-        self.root = MCTSNode(board)
+        # 初始化根节点（上一步的搜索树中已有当前局面时复用该子树的统计）
+        board = self._to_board_array(board)
+        self.root = self._reuse_subtree(board)
+        if self.root is None:
+            self.root = MCTSNode(board, board_hash=self._compute_hash(board))
+            self._node_index = {self.root.board_hash: self.root}
+            self._max_depth = 0
         
         # 检查是否有必胜落子（优先处理）
         winning_move = self._check_winning_move(board)
         if winning_move:
-            self.logger.info(f"MCTS AI 发现必胜落子: {winning_move}")
+            self.logger.info("MCTS AI 发现必胜落子: %s", winning_move)
             self._notify_thinking({
                 'scores': self._get_node_scores(),
                 'best_move': winning_move,
@@ -168,7 +225,9 @@ class MCTSAI(BaseAI):
             
             # 2. 扩展（Expansion）
             if not selected_node.is_terminal(self.board_size)[0] and selected_node.untried_moves:
-                selected_node = selected_node.expand(self.color if selected_node.parent else self.opponent_color)
+                selected_node = selected_node.expand(self._color_to_move(selected_node), self._zobrist_keys)
+                self._node_index[selected_node.board_hash] = selected_node
+                self._max_depth = max(self._max_depth, selected_node.depth)
             
             # 3. 模拟（Simulation）
             result = self._simulate(selected_node)
@@ -182,16 +241,46 @@ class MCTSAI(BaseAI):
                     'scores': self._get_node_scores(),
                     'best_move': self._get_best_move(),
                     'considering_moves': self._get_top_moves(5),
-                    'depth': self._get_tree_depth(self.root),
+                    'depth': self._get_tree_depth(),
                     'iteration': i + 1,
                     'total_iterations': self.iterations
                 })
         
         # 获取最佳落子（访问次数最多的子节点）
         best_move = self._get_best_move()
-        self.logger.info(f"MCTS AI 落子: {best_move}，迭代次数: {self.iterations}，根节点访问次数: {self.root.visits}")
+        self.logger.info("MCTS AI 落子: %s，迭代次数: %s，根节点访问次数: %s", best_move, self.iterations, self.root.visits)
         return best_move
     
+    def _color_to_move(self, node: MCTSNode) -> int:
+        """获取节点局面下轮到落子的颜色（根节点轮到AI，其余节点与到达该节点的落子方相反）"""
+        if node.move is None:
+            return self.color
+        return OPPONENT_COLORS[int(node.board[node.move])]
+    
+    def _reuse_subtree(self, board: Board) -> Optional[MCTSNode]:
+        """在上一步的搜索树中查找当前局面（通常是AI落子+对手应对后的孙节点），提升为新的根节点
+        Returns:
+            复用的根节点（未找到时返回None）
+        """
+        node = self._find_node_by_board(board) if self.root is not None else None
+        if node is None or self._color_to_move(node) != self.color:
+            return None
+        
+        # 断开与旧树的连接（兄弟子树随旧根一起释放），重建只包含该子树的索引并以新根重新计算深度
+        node.parent = None
+        node.move = None
+        self._node_index = {}
+        self._max_depth = 0
+        stack = [(node, 0)]
+        while stack:
+            current, depth = stack.pop()
+            current.depth = depth
+            self._node_index[current.board_hash] = current
+            self._max_depth = max(self._max_depth, depth)
+            stack.extend((child, depth + 1) for child in current.children)
+        self.logger.debug("MCTS AI 复用搜索子树，根节点访问次数: %d", node.visits)
+        return node
+    
     def _select_node(self, node: MCTSNode) -> MCTSNode:
         """选择节点（UCT算法）"""
         current_node = node
@@ -201,42 +290,42 @@ class MCTSAI(BaseAI):
     
     def _simulate(self, node: MCTSNode) -> int:
         """模拟游戏直到结束，返回结果（获胜方颜色/0平局）"""
-        current_board = [row.copy() for row in node.board]
-        current_color = self.color if node.parent else self.opponent_color  # 交替落子
-        depth = 0
+        # 检查游戏是否结束
+        is_terminal, winner = node.is_terminal(self.board_size)
+        if is_terminal:
+            return winner
         
-        while depth < self.simulation_depth:
-            # 检查游戏是否结束
-            is_terminal, winner = node.is_terminal(self.board_size)
-            if is_terminal:
-                return winner
-            
-            # 获取所有空位置并评估
-            empty_positions = self._get_empty_positions(current_board)
-            if not empty_positions:
-                return 0  # 平局
-            
-            # 基于评估得分选择落子（启发式模拟）
-            scored_moves = []
-            for (x, y) in empty_positions:
-                score = self.evaluator.evaluate_position(current_board, x, y, current_color)
-                scored_moves.append((x, y, score))
+        # 在共用缓冲区上模拟落子（从叶节点整块复制，不分配新数组，也不修改节点棋盘）
+        current_board = self._sim_board
+        current_board[:] = node.board
+        neighbor_count = self._sim_neighbors  # 模拟过程中增量维护的邻域计数
+        neighbor_count[:] = node.neighbor_count
+        current_color = self._color_to_move(node)  # 交替落子
+        empties = set(node.empties)  # 模拟过程中增量维护的空位集合
+        bitboards = list(node.bitboards)  # 模拟过程中增量维护的位棋盘
+        width = self.board_size + 1
+        for _ in range(self.simulation_depth):
+            # 基于评估得分选择落子（启发式模拟，一次性批量评估所有候选落子）
+            candidates = _get_candidates(empties, neighbor_count)
+            xs, ys = np.array(candidates).T
+            scores = self.evaluator.evaluate_positions_batch(current_board, xs, ys, current_color)
+            x, y = candidates[self._choose_rollout_move(scores)]
             
-            # 选择得分最高的落子
-            scored_moves.sort(key=lambda x: x[2], reverse=True)
-            best_move = scored_moves[0][:2]
-            x, y = best_move
-            
-            # 模拟落子
-            current_board[x][y] = current_color
-            current_color = self.opponent_color if current_color == self.color else self.color
-            depth += 1
+            # 模拟落子（只对当前局面检查这一步落子是否结束游戏）
+            current_board[x, y] = current_color
+            empties.discard((x, y))
+            update_neighbors(neighbor_count, x, y, 1)
+            bitboards[current_color - 1] |= 1 << (x * width + y)
+            ended, winner = check_terminal(bitboards, self.board_size, current_color, not empties)
+            if ended:
+                return winner
+            current_color = OPPONENT_COLORS[current_color]
         
         # 达到最大模拟深度，使用评估得分判断结果
         ai_score = self.evaluator.evaluate_board(current_board, self.color)
-        if ai_score > EVAL_WEIGHTS['THREE']:
+        if ai_score > _W_THREE:
             return self.color
-        elif ai_score < -EVAL_WEIGHTS['THREE']:
+        elif ai_score < -_W_THREE:
             return self.opponent_color
         else:
             return 0  # 平局
@@ -244,7 +333,7 @@ class MCTSAI(BaseAI):
     def _get_best_move(self) -> Tuple[int, int]:
         """获取最佳落子（访问次数最多的子节点）"""
         if not self.root.children:
-            return self._get_empty_positions(self.root.board)[0]
+            return tuple(map(int, self._get_empty_positions(self.root.board)[0]))
         
         # 选择访问次数最多的子节点
         best_child = max(self.root.children, key=lambda c: c.visits)
@@ -262,7 +351,7 @@ class MCTSAI(BaseAI):
                 score = 0.0
             else:
                 win_rate = child.wins / child.visits
-                value_weight = child.value / EVAL_WEIGHTS['FIVE']
+                value_weight = child.value / _W_FIVE
                 score = (win_rate + value_weight) * 127  # 归一化到0-255
             x, y = child.move
             scores[x][y] = score
@@ -278,21 +367,16 @@ class MCTSAI(BaseAI):
         sorted_children = sorted(self.root.children, key=lambda c: c.visits, reverse=True)
         return [child.move for child in sorted_children[:top_k]]
     
-    def _get_tree_depth(self, node: MCTSNode) -> int:
-        """获取树的深度"""
-        if not node.children:
-            return 0
-        return 1 + max(self._get_tree_depth(child) for child in node.children)
+    def _get_tree_depth(self) -> int:
+        """获取树的深度（扩展时已增量维护，O(1)）"""
+        return self._max_depth
     
-    def _check_winning_move(self, board: List[List[int]]) -> Optional[Tuple[int, int]]:
-        """检查是否有必胜落子"""
-        empty_positions = self._get_empty_positions(board)
-        for (x, y) in empty_positions:
-            temp_board = self._copy_board(board)
-            temp_board[x][y] = self.color
-            if self._is_win(temp_board, self.color)[0]:
-                return (x, y)
-        return None
+    def _check_winning_move(self, board: Board) -> Optional[Tuple[int, int]]:
+        """检查是否有必胜落子（整盘向量化统计连子数，无需逐个空位试落子）"""
+        wins = np.flatnonzero(winning_cells(self._to_board_array(board), self.color))
+        if wins.size == 0:
+            return None
+        return divmod(int(wins[0]), self.board_size)
     
     def evaluate(self, board: List[List[int]]) -> float:
         """评估棋盘得分（使用MCTS节点价值）"""
@@ -300,19 +384,17 @@ class MCTSAI(BaseAI):
             return self.evaluator.evaluate_board(board, self.color)
         
         # 找到对应棋盘状态的节点
-        node = self._find_node_by_board(self.root, board)
+        node = self._find_node_by_board(board)
         if node:
             return node.value / node.visits if node.visits > 0 else 0.0
         return self.evaluator.evaluate_board(board, self.color)
     
-    def _find_node_by_board(self, node: MCTSNode, target_board: List[List[int]]) -> Optional[MCTSNode]:
-        """根据棋盘状态查找节点"""
-        if node.board == target_board:
+    def _find_node_by_board(self, target_board: Board) -> Optional[MCTSNode]:
+        """根据棋盘状态查找节点（按Zobrist哈希查索引，再比较棋盘排除哈希冲突）"""
+        target_board = self._to_board_array(target_board)
+        node = self._node_index.get(self._compute_hash(target_board))
+        if node is not None and np.array_equal(node.board, target_board):
             return node
-        for child in node.children:
-            found = self._find_node_by_board(child, target_board)
-            if found:
-                return found
         return None
     
     def set_level(self, level: str):
@@ -327,4 +409,5 @@ class MCTSAI(BaseAI):
             AI_LEVELS['EXPERT']: 6
         }
         self.simulation_depth = depth_map.get(level, 5)
-        self.logger.info(f"MCTS AI 难度已设置为: {level}，迭代次数: {self.iterations}，模拟深度: {self.simulation_depth}")
\ No newline at end of file
+        self.rollout_temperature = self._get_rollout_temperature_by_level()
+        self.logger.info("MCTS AI 难度已设置为: %s，迭代次数: %s，模拟深度: %s", level, self.iterations, self.simulation_depth)
\ No newline at end of file
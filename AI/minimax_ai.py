@@ -1,36 +1,101 @@
+import multiprocessing
+import queue
+import weakref
 import numpy as np
-from typing import List, Tuple, Dict, Optional
+from concurrent.futures import ThreadPoolExecutor, ProcessPoolExecutor, as_completed
+from typing import List, Tuple, Dict, Optional, Callable
 from Common.constants import PIECE_COLORS, AI_LEVELS, EVAL_WEIGHTS
 from Common.config import Config
 from Common.logger import Logger
+from Common.error_handler import AIError
 from AI.base_ai import BaseAI
-from AI.evaluator import BoardEvaluator
+from AI.evaluator import get_evaluator
+
+# 搜索进程中的搜索器（由进程池初始化函数创建，同一进程内的任务共用，置换表跨任务保留）
+_PROCESS_SEARCHER: Optional['MinimaxAI'] = None
+
+def _get_mp_context():
+    """获取根节点并行搜索进程池的启动方式（不使用fork：主进程已运行UI、联机和推理线程，fork可能继承被持有的锁）"""
+    methods = multiprocessing.get_all_start_methods()
+    return multiprocessing.get_context('forkserver' if 'forkserver' in methods else 'spawn')
+
+def _init_search_process(color: int, level: str):
+    """搜索进程初始化：创建本进程的搜索器（置换表在进程内首次使用时分配，初始为空）"""
+    global _PROCESS_SEARCHER
+    _PROCESS_SEARCHER = MinimaxAI(color, level)
+    _PROCESS_SEARCHER.search_threads = 1
+
+def _search_root_move_in_process(
+    board: np.ndarray,
+    x: int,
+    y: int,
+    depth: int,
+    alpha: float,
+    beta: float,
+    deadline: Optional[float]
+) -> Tuple[float, int, int]:
+    """在搜索进程中搜索根节点的单个落子
+    Returns:
+        (得分, 新增搜索节点数, 新增剪枝次数)
+    """
+    searcher = _PROCESS_SEARCHER
+    searcher._load_board(board)
+    searcher._search_deadline = deadline
+    node_count, prune_count = searcher.node_count, searcher.prune_count
+    score = searcher._search_root_move(searcher.board, x, y, depth, alpha, beta)
+    return score, searcher.node_count - node_count, searcher.prune_count - prune_count
 
 class MinimaxAI(BaseAI):
     """Minimax算法AI（带Alpha-Beta剪枝）"""
     def __init__(self, color: int, level: str = AI_LEVELS['HARD']):
         super().__init__(color, level)
-        self.evaluator = BoardEvaluator(self.board_size)  # 棋盘评估器
+        self.evaluator = get_evaluator(self.board_size)  # 棋盘评估器（共享实例）
         self.node_count = 0  # 搜索节点计数（性能统计）
         self.prune_count = 0  # 剪枝计数（性能统计）
         
         # 优化参数
         self.move_ordering_enabled = True  # 启用落子排序（提升剪枝效率）
         self.killer_moves = {}  # 杀手落子（记录每层最有效的落子）
+        self._root_scores: Dict[Tuple[int, int], float] = {}  # 上一轮迭代中根节点各落子的得分（用于下一轮排序）
+        
+        # 每步思考时间预算（秒），超时返回最近一次完整迭代的结果
+        self.time_budget = Config.get_instance().get_float('GAME', 'max_time_per_move')
+        
+        # 根节点并行搜索（Young Brothers Wait：第一个落子串行搜索，其余兄弟节点并行）
+        self.search_threads = max(1, Config.get_instance().ai_search_threads)
+        self._workers: List['MinimaxAI'] = []  # 工作副本（惰性创建，各自持有独立的置换表）
+        self._process_pool: Optional[ProcessPoolExecutor] = None  # 根节点并行搜索进程池（惰性创建，跨迭代、跨步复用）
+        self._use_processes = True  # 平台不支持多进程时置为False，退化为线程并行
     
     def move(self, board: List[List[int]], thinking_callback: Optional[Callable[[Dict], None]] = None) -> Tuple[int, int]:
-        """计算最佳落子（Minimax+Alpha-Beta剪枝）"""
+        """计算最佳落子（迭代加深Minimax+Alpha-Beta剪枝）"""
         self.set_thinking_callback(thinking_callback)
-        self.clear_cache()  # 清空缓存
+        # 置换表跨步保留（条目校验完整哈希，上一步搜索过的局面可直接复用）
         self.node_count = 0
         self.prune_count = 0
         self.killer_moves.clear()
+        self._root_scores = {}
+        board = self._load_board(board)
         
-        # 获取所有空位置
-        empty_positions = self._get_empty_positions(board)
-        if not empty_positions:
+        if self._is_board_full(board):
             raise AIError("棋盘已满，无法落子", 4101)
         
+        # 必胜/必防落子无需搜索
+        forced_move = self._check_forced_move(board)
+        if forced_move is not None:
+            self.logger.info("Minimax AI 发现强制落子: %s", forced_move)
+            self._notify_thinking({
+                'scores': np.zeros((self.board_size, self.board_size)),
+                'best_move': forced_move,
+                'considering_moves': [forced_move],
+                'depth': 0,
+                'iteration': 0
+            })
+            return forced_move
+        
+        # 获取候选落子（已有棋子的邻域）
+        empty_positions = self._get_candidate_moves(board)
+        
         # 落子排序（提升剪枝效率）
         if self.move_ordering_enabled:
             empty_positions = self._order_moves(board, empty_positions)
@@ -43,108 +108,333 @@ class MinimaxAI(BaseAI):
             'iteration': 0
         })
         
+        # 迭代加深搜索（置换表在各轮迭代间保留，浅层结果为深层提供落子排序）
+        best_move, best_score, searched_depth = self._iterative_search(board, self.time_budget)
+        if best_move is None:
+            best_move = tuple(map(int, empty_positions[0]))
+        
+        self.logger.info("Minimax AI 落子: %s，得分: %.2f，搜索深度: %s，搜索节点: %s，剪枝次数: %s", best_move, best_score, searched_depth, self.node_count, self.prune_count)
+        return best_move
+    
+    def search(
+        self,
+        board: List[List[int]],
+        depth: int,
+        time_budget: Optional[float] = None
+    ) -> Tuple[Optional[Tuple[int, int]], float, int]:
+        """以指定深度搜索最佳落子（迭代加深Alpha-Beta，置换表中的最佳落子优先尝试，不触发思考过程回调）
+        Args:
+            depth: 最大搜索深度
+            time_budget: 时间预算（秒，默认不限时）
+        Returns:
+            (最佳落子, 得分, 完成的搜索深度)
+        """
+        self.node_count = 0
+        self.prune_count = 0
+        self.killer_moves.clear()
+        self._root_scores = {}
+        board = self._load_board(board)
+        max_depth, self.max_depth = self.max_depth, depth
+        try:
+            return self._iterative_search(board, time_budget)
+        finally:
+            self.max_depth = max_depth
+    
+    def _alphabeta(
+        self,
+        board: np.ndarray,
+        depth: int,
+        alpha: float,
+        beta: float
+    ) -> Tuple[float, Optional[Tuple[int, int]]]:
+        """根节点搜索（迭代加深的单次迭代）"""
+        empty_positions = self._get_candidate_moves(board)
+        if self.move_ordering_enabled:
+            empty_positions = self._order_moves(board, empty_positions, tt_move=self._get_cached_move(board))
+            if self._root_scores:
+                # 按上一轮迭代的得分重新排序（稳定排序，未评分的落子保持静态排序放在最后）
+                empty_positions.sort(key=lambda move: -self._root_scores.get(move, -float('inf')))
+        
+        alpha_orig = alpha
+        root_scores = {}
         best_score = -float('inf')
-        best_move = empty_positions[0]
+        best_move = None
         
-        # 遍历所有候选落子
-        for i, (x, y) in enumerate(empty_positions):
-            # 模拟落子
-            temp_board = self._copy_board(board)
-            temp_board[x][y] = self.color
-            
-            # 递归搜索
-            score = self._alpha_beta(
-                temp_board,
-                depth=self.max_depth - 1,
-                alpha=-float('inf'),
-                beta=float('inf'),
-                is_maximizing=False,
-                current_depth=1
-            )
+        # 并行时只串行搜索第一个落子（排序后最可能最佳）以确定alpha，其余落子并行搜索
+        parallel = self.search_threads > 1 and len(empty_positions) > 2
+        serial_moves = empty_positions[:1] if parallel else empty_positions
+        
+        for i, (x, y) in enumerate(serial_moves):
+            x, y = int(x), int(y)
+            score = self._search_root_move(board, x, y, depth, alpha, beta)
+            root_scores[(x, y)] = score
             
             # 更新最佳落子
             if score > best_score:
                 best_score = score
                 best_move = (x, y)
+            alpha = max(alpha, score)
+            self._notify_root_progress(board, empty_positions, best_move, depth, i + 1)
             
-            # 实时通知思考进度
-            scores = np.zeros((self.board_size, self.board_size))
-            for (nx, ny) in empty_positions[:10]:  # 只显示前10个候选落子的得分
-                scores[nx][ny] = self.evaluator.evaluate_position(board, nx, ny, self.color)
-            
-            self._notify_thinking({
-                'scores': scores,
-                'best_move': best_move,
-                'considering_moves': empty_positions[:5],
-                'depth': self.max_depth,
-                'iteration': i + 1,
-                'total_iterations': len(empty_positions)
-            })
+            if alpha >= beta:
+                break
         
-        self.logger.info(f"Minimax AI 落子: {best_move}，得分: {best_score:.2f}，搜索节点: {self.node_count}，剪枝次数: {self.prune_count}")
-        return best_move
+        if parallel and alpha < beta:
+            results = self._search_root_moves_parallel(board, empty_positions[1:], depth, alpha, beta)
+            for i, (move, score) in enumerate(results, start=2):
+                root_scores[move] = score
+                if score > best_score:
+                    best_score = score
+                    best_move = move
+                self._notify_root_progress(board, empty_positions, best_move, depth, i)
+        
+        self._root_scores = root_scores
+        self._cache_evaluation(board, best_score, depth, self._get_bound_flag(best_score, alpha_orig, beta), best_move)
+        return best_score, best_move
+    
+    def _search_root_move(self, board: np.ndarray, x: int, y: int, depth: int, alpha: float, beta: float) -> float:
+        """搜索根节点的单个落子（模拟落子后从对手视角递归搜索）"""
+        self._make_move(x, y, self.color)
+        try:
+            return self._alpha_beta(
+                board,
+                depth=depth - 1,
+                alpha=alpha,
+                beta=beta,
+                is_maximizing=False,
+                current_depth=1,
+                last_move=(x, y)
+            )
+        finally:
+            self._undo_move(x, y, self.color)
+    
+    def _search_root_moves_parallel(
+        self,
+        board: np.ndarray,
+        moves: List[Tuple[int, int]],
+        depth: int,
+        alpha: float,
+        beta: float
+    ):
+        """并行搜索根节点的兄弟落子（按完成顺序产出(落子, 得分)）
+        优先使用进程池（不受GIL限制），平台不支持多进程时退化为线程池
+        """
+        pool = self._get_process_pool()
+        if pool is not None:
+            futures = self._submit_to_processes(pool, board, moves, depth, alpha, beta)
+            merge_worker_tables = False
+        else:
+            pool, futures = self._submit_threaded(board, moves, depth, alpha, beta)
+            merge_worker_tables = True
+        try:
+            for future in as_completed(futures):
+                score, node_count, prune_count = future.result()
+                self.node_count += node_count
+                self.prune_count += prune_count
+                yield futures[future], score
+        finally:
+            # 超时或异常时取消尚未开始的任务（进程池保留复用，已开始的任务到截止时间后自行结束）
+            for future in futures:
+                future.cancel()
+            if merge_worker_tables:
+                pool.shutdown(wait=True, cancel_futures=True)
+                for worker in self._workers:
+                    deeper = worker.tt['depth'] > self.tt['depth']
+                    self.tt[deeper] = worker.tt[deeper]
+    
+    def _get_process_pool(self) -> Optional[ProcessPoolExecutor]:
+        """获取根节点并行搜索进程池（首次调用时创建，平台不支持多进程时返回None）
+        各搜索进程使用各自独立的置换表（从空表开始，跨任务保留），每个任务只传递棋盘、落子和搜索窗口；
+        主进程的置换表不传给搜索进程（每个进程复制一份开销过大），搜索进程的结果也不合并回主进程，
+        因此主进程置换表只保存根节点迭代得到的最佳落子，子树条目由各搜索进程自行积累
+        """
+        if self._process_pool is None and self._use_processes:
+            try:
+                self._process_pool = ProcessPoolExecutor(
+                    max_workers=self.search_threads,
+                    mp_context=_get_mp_context(),
+                    initializer=_init_search_process,
+                    initargs=(self.color, self.level)
+                )
+            except (ImportError, NotImplementedError, OSError) as e:
+                self.logger.warning("无法创建搜索进程池，使用线程并行搜索: %s", e)
+                self._use_processes = False
+                return None
+            # AI实例被回收时关闭进程池（不持有AI实例的引用）
+            weakref.finalize(self, self._process_pool.shutdown, wait=False, cancel_futures=True)
+        return self._process_pool
+    
+    def _submit_to_processes(
+        self,
+        pool: ProcessPoolExecutor,
+        board: np.ndarray,
+        moves: List[Tuple[int, int]],
+        depth: int,
+        alpha: float,
+        beta: float
+    ) -> Dict:
+        """在进程池中提交根节点落子的搜索任务（截止时间随任务传递，超时由搜索进程自行中止）"""
+        board = board.copy()  # 任务参数在后台线程中序列化，传递快照以免根棋盘之后的修改被带入
+        return {
+            pool.submit(_search_root_move_in_process, board, int(x), int(y), depth, alpha, beta, self._search_deadline): (int(x), int(y))
+            for x, y in moves
+        }
+    
+    def _submit_threaded(self, board: np.ndarray, moves: List[Tuple[int, int]], depth: int, alpha: float, beta: float):
+        """在线程池中提交根节点落子的搜索任务
+        每个任务借用一个工作副本，在棋盘拷贝上搜索，互不共享可变状态；
+        工作副本的置换表以主置换表为起点，搜索结束后按深度优先合并回主置换表
+        """
+        while len(self._workers) < self.search_threads:
+            self._workers.append(self._spawn_worker())
+        idle_workers = queue.Queue()
+        for worker in self._workers:
+            worker.tt[...] = self.tt
+            idle_workers.put(worker)
+        # 提交前取根棋盘快照（调用方在消费结果时会在根棋盘上原地模拟落子，任务开始时再拷贝可能带入模拟的棋子）
+        snapshot = board.copy()
+        
+        def search(x: int, y: int) -> Tuple[float, int, int]:
+            worker = idle_workers.get()
+            try:
+                worker._load_board(snapshot.copy())
+                worker._search_deadline = self._search_deadline
+                node_count, prune_count = worker.node_count, worker.prune_count
+                score = worker._search_root_move(worker.board, x, y, depth, alpha, beta)
+                return score, worker.node_count - node_count, worker.prune_count - prune_count
+            finally:
+                idle_workers.put(worker)
+        
+        pool = ThreadPoolExecutor(max_workers=self.search_threads)
+        futures = {pool.submit(search, int(x), int(y)): (int(x), int(y)) for x, y in moves}
+        return pool, futures
+    
+    def _spawn_worker(self) -> 'MinimaxAI':
+        """创建并行搜索用的工作副本（杀手落子和统计计数独立）"""
+        worker = super()._spawn_worker()
+        worker.killer_moves = {}
+        worker.node_count = 0
+        worker.prune_count = 0
+        worker._workers = []
+        worker._process_pool = None
+        worker._use_processes = False
+        return worker
+    
+    def _notify_root_progress(
+        self,
+        board: np.ndarray,
+        empty_positions: List[Tuple[int, int]],
+        best_move: Optional[Tuple[int, int]],
+        depth: int,
+        iteration: int
+    ):
+        """实时通知根节点搜索进度"""
+        scores = np.zeros((self.board_size, self.board_size))
+        for (nx, ny) in empty_positions[:10]:  # 只显示前10个候选落子的得分
+            scores[nx][ny] = self.evaluator.evaluate_position(board, nx, ny, self.color)
+        
+        self._notify_thinking({
+            'scores': scores,
+            'best_move': best_move,
+            'considering_moves': empty_positions[:5],
+            'depth': depth,
+            'iteration': iteration,
+            'total_iterations': len(empty_positions)
+        })
+    
+    def _check_forced_move(self, board: np.ndarray) -> Optional[Tuple[int, int]]:
+        """搜索前的强制落子检查（依次为：己方直接成五、阻止对手直接成五、己方形成活四）
+        Returns:
+            强制落子坐标，没有时返回None
+        """
+        if not (board != PIECE_COLORS['EMPTY']).any():
+            return None
+        candidates = self._get_candidate_moves(board)
+        
+        # 1. 己方直接成五；2. 对手下一步成五，必须阻挡
+        for color in (self.color, self.opponent_color):
+            for (x, y) in candidates:
+                if self._is_win_at(board, x, y, color):
+                    return (int(x), int(y))
+        
+        # 3. 己方形成活四（对手无法同时阻挡两端）
+        xs, ys = candidates.T
+        live_four = self.evaluator.creates_pattern(board, xs, ys, self.color, [0, 1, 1, 1, 1, 0])
+        if live_four.any():
+            index = int(np.argmax(live_four))
+            return (int(xs[index]), int(ys[index]))
+        return None
     
     def _alpha_beta(
         self,
-        board: List[List[int]],
+        board: np.ndarray,
         depth: int,
         alpha: float,
         beta: float,
         is_maximizing: bool,
-        current_depth: int
+        current_depth: int,
+        last_move: Optional[Tuple[int, int]] = None
     ) -> float:
-        """Alpha-Beta剪枝递归函数"""
+        """Alpha-Beta剪枝递归函数
+        Args:
+            last_move: 到达当前局面的最后一步落子（用于增量胜负判断）
+        """
         self.node_count += 1
+        if self.node_count & 63 == 0:
+            self._check_timeout()
+        alpha_orig, beta_orig = alpha, beta
         
-        # 检查缓存
-        cached_score = self._get_cached_evaluation(board, depth)
+        # 检查缓存（精确值直接返回，边界值收窄窗口，窗口为空时截断）
+        cached_score, alpha, beta = self._probe_window(board, depth, alpha, beta)
         if cached_score is not None:
             return cached_score
         
+        # 检查是否获胜（只有上一步落子方可能形成五连）
+        if last_move is not None:
+            lx, ly = last_move
+            if is_maximizing:
+                # 上一步为对手落子
+                if self._is_win_at(board, lx, ly, self.opponent_color):
+                    score = -EVAL_WEIGHTS['FIVE'] - depth
+                    self._cache_evaluation(board, score, depth)
+                    return score
+            elif self._is_win_at(board, lx, ly, self.color):
+                # 上一步为AI落子
+                score = EVAL_WEIGHTS['FIVE'] + depth  # 深度越大，得分越高（优先结束游戏）
+                self._cache_evaluation(board, score, depth)
+                return score
+        
         # 终端节点：到达最大深度或游戏结束
         if depth == 0:
             score = self.evaluate(board)
             self._cache_evaluation(board, score, depth)
             return score
         
-        # 检查是否获胜
-        if is_maximizing:
-            # AI回合（最大化得分）
-            win, _ = self._is_win(board, self.color)
-            if win:
-                score = EVAL_WEIGHTS['FIVE'] + depth  # 深度越大，得分越高（优先结束游戏）
-                self._cache_evaluation(board, score, depth)
-                return score
-        else:
-            # 对手回合（最小化得分）
-            win, _ = self._is_win(board, self.opponent_color)
-            if win:
-                score = -EVAL_WEIGHTS['FIVE'] - depth
-                self._cache_evaluation(board, score, depth)
-                return score
-        
-        # 检查棋盘是否下满
-        if self._is_board_full(board):
-            score = 0.0  # 平局
+        # 检查棋盘是否下满（空位集合随落子/撤销增量维护）
+        if not self._empties:
+            score = 0  # 平局
             self._cache_evaluation(board, score, depth)
             return score
         
-        # 获取所有空位置并排序
-        empty_positions = self._get_empty_positions(board)
+        # 获取候选落子并排序
+        empty_positions = self._get_candidate_moves(board)
         if self.move_ordering_enabled:
-            empty_positions = self._order_moves(board, empty_positions, is_maximizing, current_depth)
+            empty_positions = self._order_moves(board, empty_positions, is_maximizing, current_depth, self._get_cached_move(board))
         
         if is_maximizing:
             # 最大化玩家（AI）
             max_score = -float('inf')
+            best_move = None
             for (x, y) in empty_positions:
                 # 模拟落子
-                temp_board = self._copy_board(board)
-                temp_board[x][y] = self.color
+                self._make_move(x, y, self.color)
                 
                 # 递归搜索
-                score = self._alpha_beta(temp_board, depth - 1, alpha, beta, False, current_depth + 1)
-                max_score = max(max_score, score)
+                score = self._alpha_beta(board, depth - 1, alpha, beta, False, current_depth + 1, (x, y))
+                self._undo_move(x, y, self.color)
+                if score > max_score:
+                    max_score = score
+                    best_move = (x, y)
                 
                 # Alpha剪枝
                 alpha = max(alpha, score)
@@ -154,19 +444,22 @@ class MinimaxAI(BaseAI):
                     self._record_killer_move(current_depth, (x, y))
                     break
             
-            self._cache_evaluation(board, max_score, depth)
+            self._cache_evaluation(board, max_score, depth, self._get_bound_flag(max_score, alpha_orig, beta_orig), best_move)
             return max_score
         else:
             # 最小化玩家（对手）
             min_score = float('inf')
+            best_move = None
             for (x, y) in empty_positions:
                 # 模拟落子
-                temp_board = self._copy_board(board)
-                temp_board[x][y] = self.opponent_color
+                self._make_move(x, y, self.opponent_color)
                 
                 # 递归搜索
-                score = self._alpha_beta(temp_board, depth - 1, alpha, beta, True, current_depth + 1)
-                min_score = min(min_score, score)
+                score = self._alpha_beta(board, depth - 1, alpha, beta, True, current_depth + 1, (x, y))
+                self._undo_move(x, y, self.opponent_color)
+                if score < min_score:
+                    min_score = score
+                    best_move = (x, y)
                 
                 # Beta剪枝
                 beta = min(beta, score)
@@ -176,43 +469,51 @@ class MinimaxAI(BaseAI):
                     self._record_killer_move(current_depth, (x, y))
                     break
             
-            self._cache_evaluation(board, min_score, depth)
+            self._cache_evaluation(board, min_score, depth, self._get_bound_flag(min_score, alpha_orig, beta_orig), best_move)
             return min_score
     
     def _order_moves(
         self,
-        board: List[List[int]],
-        moves: List[Tuple[int, int]],
+        board: np.ndarray,
+        moves: np.ndarray,
         is_maximizing: bool = True,
-        depth: int = 0
+        depth: int = 0,
+        tt_move: Optional[Tuple[int, int]] = None
     ) -> List[Tuple[int, int]]:
-        """落子排序（提升剪枝效率）"""
-        if not moves:
+        """落子排序（提升剪枝效率）
+        Args:
+            tt_move: 置换表中记录的最佳落子（来自更浅一层的搜索，优先尝试）
+        """
+        if len(moves) == 0:
             return []
+        moves = [tuple(move) for move in np.asarray(moves).tolist()]
+        move_set = set(moves)
         
-        # 1. 优先考虑杀手落子
-        killer_move = self.killer_moves.get(depth, None)
         ordered_moves = []
-        remaining_moves = []
         
-        if killer_move and killer_move in moves:
+        # 1. 优先考虑置换表最佳落子，其次是杀手落子
+        if tt_move is not None and tt_move in move_set:
+            ordered_moves.append(tt_move)
+        killer_move = self.killer_moves.get(depth, None)
+        if killer_move and killer_move in move_set and killer_move != tt_move:
             ordered_moves.append(killer_move)
         
-        # 2. 按评估得分排序
-        for move in moves:
-            if move not in ordered_moves:
-                x, y = move
-                if is_maximizing:
-                    # AI回合：按AI得分降序
-                    score = self.evaluator.evaluate_position(board, x, y, self.color)
-                else:
-                    # 对手回合：按对手得分升序（对AI最不利的先考虑）
-                    score = -self.evaluator.evaluate_position(board, x, y, self.opponent_color)
-                remaining_moves.append((move, score))
-        
-        # 排序并合并
-        remaining_moves.sort(key=lambda x: x[1], reverse=True)
-        ordered_moves += [move for move, _ in remaining_moves]
+        # 2. 其余落子一次性批量评估后排序（稳定排序，得分相同时保持原顺序）
+        if ordered_moves:
+            prioritized = set(ordered_moves)
+            remaining_moves = [move for move in moves if move not in prioritized]
+        else:
+            remaining_moves = moves
+        if remaining_moves:
+            xs, ys = np.array(remaining_moves).T
+            if is_maximizing:
+                # AI回合：按AI得分降序
+                scores = -self.evaluator.evaluate_positions_batch(board, xs, ys, self.color)
+            else:
+                # 对手回合：按对手得分升序（对AI最不利的先考虑）
+                scores = self.evaluator.evaluate_positions_batch(board, xs, ys, self.opponent_color)
+            order = np.argsort(scores, kind='stable')
+            ordered_moves += [remaining_moves[i] for i in order]
         
         return ordered_moves
     
@@ -237,4 +538,4 @@ class MinimaxAI(BaseAI):
             AI_LEVELS['EXPERT']: 0.7
         }
         self.prune_threshold = level_threshold.get(level, 0.8)
-        self.logger.info(f"Minimax AI 剪枝阈值已设置为: {self.prune_threshold}")
\ No newline at end of file
+        self.logger.info("Minimax AI 剪枝阈值已设置为: %s", self.prune_threshold)
\ No newline at end of file
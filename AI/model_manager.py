@@ -1,17 +1,82 @@
 import os
 import json
+import shutil
+from collections import OrderedDict
 import numpy as np
+import torch
 from typing import List, Tuple, Dict, Optional
 from Common.constants import AI_TYPES, AI_LEVELS
 from Common.config import Config
 from Common.logger import Logger
 from Common.data_utils import DataUtils
 from Common.error_handler import ModelError
+from DB.db_conn import DatabaseConnection
 from DB.model_dao import ModelDAO
 from DB.training_data_dao import TrainingDataDAO
 from AI.base_ai import BaseAI, AIFactory
 from AI.nn_ai import NNAI
 
+# 用户最新模型查询（SQL Server无LIMIT，用TOP 1；走(user_id, create_time DESC)索引）
+_LATEST_USER_MODEL_SQL = (
+    "SELECT TOP 1 * FROM [dbo].[AI_Models] WHERE [user_id] = ? ORDER BY [create_time] DESC"
+)
+
+class LRUModelCache:
+    """按内存占用限制容量的LRU模型缓存（超出上限时淘汰最久未使用的模型）"""
+    def __init__(self, max_bytes: int):
+        self.max_bytes = max_bytes  # 缓存总字节数上限
+        self.total_bytes = 0  # 当前缓存的总字节数
+        self._entries: 'OrderedDict[str, Tuple[BaseAI, int]]' = OrderedDict()  # 模型ID -> (AI实例, 占用字节数)
+        self.logger = Logger.get_instance()
+    
+    @staticmethod
+    def _size_of(ai_instance: BaseAI) -> int:
+        """估算AI实例占用的字节数（神经网络参数 + 置换表）"""
+        size = ai_instance.tt_nbytes
+        if isinstance(ai_instance, NNAI):
+            size += sum(p.numel() * p.element_size() for p in ai_instance.model.parameters())
+        return size
+    
+    def get(self, model_id: str) -> Optional[BaseAI]:
+        """获取缓存的模型（命中时标记为最近使用）"""
+        entry = self._entries.get(model_id)
+        if entry is None:
+            return None
+        self._entries.move_to_end(model_id)
+        return entry[0]
+    
+    def put(self, model_id: str, ai_instance: BaseAI):
+        """缓存模型，超出容量时淘汰最久未使用的模型（至少保留刚放入的模型）"""
+        self.pop(model_id)
+        size = self._size_of(ai_instance)
+        self._entries[model_id] = (ai_instance, size)
+        self.total_bytes += size
+        while self.total_bytes > self.max_bytes and len(self._entries) > 1:
+            evicted_id, (evicted, evicted_size) = self._entries.popitem(last=False)
+            self.total_bytes -= evicted_size
+            self._release(evicted)
+            self.logger.info("模型缓存已满，淘汰模型 %s", evicted_id)
+    
+    def pop(self, model_id: str) -> Optional[BaseAI]:
+        """从缓存移除模型"""
+        entry = self._entries.pop(model_id, None)
+        if entry is None:
+            return None
+        self.total_bytes -= entry[1]
+        return entry[0]
+    
+    @staticmethod
+    def _release(ai_instance: BaseAI):
+        """释放被淘汰模型占用的显存（仍被引用的实例可继续在CPU上使用）"""
+        if isinstance(ai_instance, NNAI):
+            ai_instance.release_device()
+    
+    def __contains__(self, model_id: str) -> bool:
+        return model_id in self._entries
+    
+    def __len__(self) -> int:
+        return len(self._entries)
+
 class ModelManager:
     """AI模型管理器（负责模型的训练、保存、加载、合并等）"""
     def __init__(self):
@@ -22,11 +87,10 @@ class ModelManager:
         
         # 模型存储路径
         self.model_dir = self.config.get('PATH', 'models')
-        if not os.path.exists(self.model_dir):
-            os.makedirs(self.model_dir)
+        os.makedirs(self.model_dir, exist_ok=True)
         
-        # 当前加载的模型
-        self.current_models: Dict[str, BaseAI] = {}
+        # 当前加载的模型（按内存占用限制容量的LRU缓存）
+        self.current_models = LRUModelCache(self.config.ai_model_cache_mb << 20)
         
         # 加载默认模型
         self.load_default_models()
@@ -48,22 +112,23 @@ class ModelManager:
                     ai_instance._load_model(model['model_path'])
                 
                 # 缓存模型
-                self.current_models[model['model_id']] = ai_instance
+                self.current_models.put(str(model['model_id']), ai_instance)
             
-            self.logger.info(f"成功加载 {len(self.current_models)} 个默认模型")
+            self.logger.info("成功加载 %s 个默认模型", len(self.current_models))
         except Exception as e:
-            self.logger.error(f"加载默认模型失败: {str(e)}")
+            self.logger.error("加载默认模型失败: %s", e)
     
     def get_model_by_id(self, model_id: int, user_id: int) -> Optional[BaseAI]:
         """根据模型ID获取模型实例"""
         # 先检查缓存
-        if str(model_id) in self.current_models:
-            return self.current_models[str(model_id)]
+        cached = self.current_models.get(str(model_id))
+        if cached is not None:
+            return cached
         
         # 从数据库获取模型信息
         model_info = self.model_dao.get_model_by_id(model_id, user_id)
         if not model_info:
-            self.logger.error(f"模型 {model_id} 不存在或无访问权限")
+            self.logger.error("模型 %s 不存在或无访问权限", model_id)
             return None
         
         try:
@@ -79,10 +144,10 @@ class ModelManager:
                 ai_instance._load_model(model_info['model_path'])
             
             # 缓存模型
-            self.current_models[str(model_id)] = ai_instance
+            self.current_models.put(str(model_id), ai_instance)
             return ai_instance
         except Exception as e:
-            self.logger.error(f"加载模型 {model_id} 失败: {str(e)}")
+            self.logger.error("加载模型 %s 失败: %s", model_id, e)
             return None
     
     def train_model(
@@ -112,17 +177,14 @@ class ModelManager:
                 self.logger.error("没有可用的训练数据")
                 return False, None
             
-            # 转换训练数据格式
-            train_data = []
-            for data in training_data:
-                board = DataUtils.str_to_board(data['input_data'])
-                move_idx = int(data['output_data'])
-                move = DataUtils.index_to_move(move_idx, self.config.board_size)
-                train_data.append((board, move))
+            # 转换训练数据格式（棋盘保留为字符串，由NNAI按字符串缓存预处理结果）
+            move_idxs = np.array([int(data['output_data']) for data in training_data], dtype=np.int64)
+            moves = DataUtils.indices_to_moves(move_idxs, self.config.board_size).tolist()
+            train_data = [(data['input_data'], tuple(move)) for data, move in zip(training_data, moves)]
             
             # 创建AI实例（仅支持神经网络模型训练）
             if ai_type not in ['nn', 'nn+mcts']:
-                self.logger.error(f"不支持 {ai_type} 类型的模型训练")
+                self.logger.error("不支持 %s 类型的模型训练", ai_type)
                 return False, None
             
             ai_instance = AIFactory.create_ai(ai_type, PIECE_COLORS['BLACK'], ai_level)
@@ -131,7 +193,7 @@ class ModelManager:
                 return False, None
             
             # 开始训练
-            self.logger.info(f"开始训练模型: {model_name}，数据量: {len(train_data)}")
+            self.logger.info("开始训练模型: %s，数据量: %s", model_name, len(train_data))
             loss_history, accuracy_history = ai_instance.train_model(
                 train_data,
                 epochs=epochs,
@@ -164,11 +226,11 @@ class ModelManager:
             })
             
             # 缓存新模型
-            self.current_models[str(model_id)] = ai_instance
-            self.logger.info(f"模型训练完成，ID: {model_id}，准确率: {accuracy_history[-1]:.4f}")
+            self.current_models.put(str(model_id), ai_instance)
+            self.logger.info("模型训练完成，ID: %s，准确率: %.4f", model_id, accuracy_history[-1])
             return True, model_id
         except Exception as e:
-            self.logger.error(f"模型训练失败: {str(e)}")
+            self.logger.error("模型训练失败: %s", e)
             return False, None
     
     def merge_models(
@@ -192,16 +254,16 @@ class ModelManager:
                 self.logger.error("至少需要两个模型才能合并")
                 return False, None
             
-            # 检查模型是否属于当前用户
-            model_paths = []
-            model_types = set()
+            # 检查模型是否属于当前用户（每个模型只查询一次，后续统计训练次数复用查询结果）
+            model_infos = {}
             for model_id in model_ids:
                 model_info = self.model_dao.get_model_by_id(model_id, user_id)
                 if not model_info:
-                    self.logger.error(f"模型 {model_id} 不存在或无访问权限")
+                    self.logger.error("模型 %s 不存在或无访问权限", model_id)
                     return False, None
-                model_paths.append(model_info['model_path'])
-                model_types.add(model_info['model_type'])
+                model_infos[model_id] = model_info
+            model_paths = [model_infos[model_id]['model_path'] for model_id in model_ids]
+            model_types = {model_info['model_type'] for model_info in model_infos.values()}
             
             # 检查模型类型是否一致（仅支持神经网络模型合并）
             if len(model_types) != 1 or list(model_types)[0] not in ['nn', 'nn+mcts']:
@@ -235,22 +297,19 @@ class ModelManager:
             test_data = self.training_data_dao.get_training_data_by_user(user_id, limit=1000)
             accuracy = 0.0
             if test_data:
+                # 整体预处理测试数据后分批推理（减少逐样本的设备拷贝和内核启动）
+                inputs = ai_instance._preprocess_board_strs([data['input_data'] for data in test_data])
+                labels = torch.as_tensor([int(data['output_data']) for data in test_data], dtype=torch.long).to(ai_instance.device)
+                dataloader = torch.utils.data.DataLoader(torch.utils.data.TensorDataset(inputs, labels), batch_size=256)
+                
                 correct = 0
-                total = 0
                 ai_instance.model.eval()
-                
                 with torch.no_grad():
-                    for data in test_data:
-                        board = DataUtils.str_to_board(data['input_data'])
-                        move_idx = int(data['output_data'])
-                        input_tensor = ai_instance._preprocess_board(board)
-                        output = ai_instance.model(input_tensor)
-                        _, predicted = torch.max(output.data, 1)
-                        if predicted.item() == move_idx:
-                            correct += 1
-                        total += 1
+                    for batch_inputs, batch_labels in dataloader:
+                        outputs = ai_instance._forward(batch_inputs)
+                        correct += (outputs.argmax(dim=1) == batch_labels).sum().item()
                 
-                accuracy = correct / total if total > 0 else 0.0
+                accuracy = correct / len(test_data)
             
             # 保存模型信息到数据库
             model_id = self.model_dao.add_model({
@@ -258,17 +317,17 @@ class ModelManager:
                 'user_id': user_id,
                 'model_type': list(model_types)[0],
                 'accuracy': accuracy,
-                'train_count': sum([self.model_dao.get_model_by_id(mid, user_id)['train_count'] for mid in model_ids]),
+                'train_count': sum(model_infos[mid]['train_count'] for mid in model_ids),
                 'model_path': model_path,
                 'is_default': 0
             })
             
             # 缓存新模型
-            self.current_models[str(model_id)] = ai_instance
-            self.logger.info(f"模型合并完成，ID: {model_id}，准确率: {accuracy:.4f}")
+            self.current_models.put(str(model_id), ai_instance)
+            self.logger.info("模型合并完成，ID: %s，准确率: %.4f", model_id, accuracy)
             return True, model_id
         except Exception as e:
-            self.logger.error(f"模型合并失败: {str(e)}")
+            self.logger.error("模型合并失败: %s", e)
             return False, None
     
     def export_model(self, model_id: int, user_id: int, export_path: str) -> bool:
@@ -277,42 +336,37 @@ class ModelManager:
             # 获取模型信息
             model_info = self.model_dao.get_model_by_id(model_id, user_id)
             if not model_info:
-                self.logger.error(f"模型 {model_id} 不存在或无访问权限")
+                self.logger.error("模型 %s 不存在或无访问权限", model_id)
                 return False
             
             # 读取模型文件
             if not os.path.exists(model_info['model_path']):
-                self.logger.error(f"模型文件不存在: {model_info['model_path']}")
+                self.logger.error("模型文件不存在: %s", model_info['model_path'])
                 return False
             
-            # 读取模型权重
-            with open(model_info['model_path'], 'rb') as f:
-                model_data = f.read()
-            
-            # 写入导出文件
-            with open(export_path, 'wb') as f:
-                f.write(model_data)
+            # 复制模型文件（内核态拷贝，不把整个模型读入内存）
+            shutil.copyfile(model_info['model_path'], export_path)
             
             # 生成模型元数据文件
             meta_path = os.path.splitext(export_path)[0] + '.json'
-            with open(meta_path, 'w', encoding='utf-8') as f:
-                json.dump({
-                    'model_info': model_info,
-                    'export_time': DataUtils.get_current_time_str()
-                }, f, ensure_ascii=False, indent=2)
+            DataUtils.save_json({
+                'model_info': model_info,
+                'export_time': DataUtils.get_current_time_str()
+            }, meta_path)
             
-            self.logger.info(f"模型导出成功: {export_path}")
+            self.logger.info("模型导出成功: %s", export_path)
             return True
         except Exception as e:
-            self.logger.error(f"模型导出失败: {str(e)}")
+            self.logger.error("模型导出失败: %s", e)
             return False
     
     def import_model(self, user_id: int, import_path: str, model_name: str = "导入模型") -> Tuple[bool, Optional[int]]:
         """从本地文件导入模型"""
+        model_path = None
         try:
             # 检查文件是否存在
             if not os.path.exists(import_path):
-                self.logger.error(f"导入文件不存在: {import_path}")
+                self.logger.error("导入文件不存在: %s", import_path)
                 return False, None
             
             # 读取元数据（如果存在）
@@ -340,9 +394,7 @@ class ModelManager:
             model_filename = f"{model_name}_{user_id}_{DataUtils.generate_unique_id()}.pth"
             model_path = os.path.join(self.model_dir, model_filename)
             
-            with open(import_path, 'rb') as f_in:
-                with open(model_path, 'wb') as f_out:
-                    f_out.write(f_in.read())
+            shutil.copyfile(import_path, model_path)
             
             # 验证模型文件
             ai_instance = AIFactory.create_ai(model_info['model_type'], PIECE_COLORS['BLACK'], AI_LEVELS['HARD'])
@@ -358,11 +410,14 @@ class ModelManager:
             })
             
             # 缓存新模型
-            self.current_models[str(model_id)] = ai_instance
-            self.logger.info(f"模型导入成功，ID: {model_id}")
+            self.current_models.put(str(model_id), ai_instance)
+            self.logger.info("模型导入成功，ID: %s", model_id)
             return True, model_id
         except Exception as e:
-            self.logger.error(f"模型导入失败: {str(e)}")
+            self.logger.error("模型导入失败: %s", e)
+            # 删除已复制的模型文件，避免残留未登记的文件
+            if model_path and os.path.exists(model_path):
+                os.remove(model_path)
             return False, None
     
     def delete_model(self, model_id: int, user_id: int) -> bool:
@@ -371,13 +426,16 @@ class ModelManager:
             # 获取模型信息
             model_info = self.model_dao.get_model_by_id(model_id, user_id)
             if not model_info:
-                self.logger.error(f"模型 {model_id} 不存在或无访问权限")
+                self.logger.error("模型 %s 不存在或无访问权限", model_id)
                 return False
             
-            # 删除本地文件
+            # 删除本地文件（包括safetensors模型旁的元数据文件）
             if os.path.exists(model_info['model_path']):
                 os.remove(model_info['model_path'])
-                self.logger.info(f"删除模型文件: {model_info['model_path']}")
+                self.logger.info("删除模型文件: %s", model_info['model_path'])
+            meta_path = model_info['model_path'] + '.meta.json'
+            if os.path.exists(meta_path):
+                os.remove(meta_path)
             
             # 从数据库删除
             if not self.model_dao.delete_model(model_id, user_id):
@@ -385,19 +443,23 @@ class ModelManager:
                 return False
             
             # 从缓存删除
-            if str(model_id) in self.current_models:
-                del self.current_models[str(model_id)]
+            self.current_models.pop(str(model_id))
             
-            self.logger.info(f"模型 {model_id} 删除成功")
+            self.logger.info("模型 %s 删除成功", model_id)
             return True
         except Exception as e:
-            self.logger.error(f"删除模型 {model_id} 失败: {str(e)}")
+            self.logger.error("删除模型 %s 失败: %s", model_id, e)
             return False
     
     def get_user_models(self, user_id: int) -> List[Dict]:
         """获取用户的所有模型"""
         return self.model_dao.get_models_by_user(user_id)
     
+    def get_latest_user_model(self, user_id: int) -> Optional[Dict]:
+        """获取用户最新创建的模型（SELECT TOP 1 ... ORDER BY create_time DESC，不传输其余模型；没有模型时返回None）"""
+        rows = DatabaseConnection().execute_query(_LATEST_USER_MODEL_SQL, (user_id,))
+        return rows[0] if rows else None
+    
     def add_training_data(self, user_id: int, board: List[List[int]], best_move: Tuple[int, int], score: float = 0.0) -> bool:
         """添加训练数据"""
         try:
@@ -413,7 +475,7 @@ class ModelManager:
                 'score': score
             })
         except Exception as e:
-            self.logger.error(f"添加训练数据失败: {str(e)}")
+            self.logger.error("添加训练数据失败: %s", e)
             return False
     
     def clear_training_data(self, user_id: int) -> bool:
@@ -421,5 +483,5 @@ class ModelManager:
         try:
             return self.training_data_dao.clear_training_data(user_id)
         except Exception as e:
-            self.logger.error(f"清空训练数据失败: {str(e)}")
+            self.logger.error("清空训练数据失败: %s", e)
             return False
\ No newline at end of file
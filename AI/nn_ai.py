@@ -1,14 +1,195 @@
+import os
+import json
+import atexit
+import hashlib
+import queue
+import struct
+import threading
+import time
+import weakref
+from collections import OrderedDict
+from concurrent.futures import Future, ThreadPoolExecutor
+from multiprocessing import shared_memory
 import torch
 import torch.nn as nn
 import torch.optim as optim
 import numpy as np
-from typing import List, Tuple, Dict, Optional, Callable
+try:
+    import safetensors.torch
+    SAFETENSORS_AVAILABLE = True
+except ImportError:
+    SAFETENSORS_AVAILABLE = False  # safetensors为可选依赖，缺失时使用torch.save/torch.load
+from typing import List, Tuple, Dict, Optional, Callable, Union
 from Common.constants import PIECE_COLORS, AI_LEVELS, EVAL_WEIGHTS
 from Common.config import Config
 from Common.logger import Logger
 from Common.data_utils import DataUtils
-from AI.base_ai import BaseAI
-from AI.evaluator import BoardEvaluator
+from AI.base_ai import BaseAI, winning_cells
+from AI.evaluator import get_evaluator
+
+_COMPILE_CACHE_FILE = 'torch_compile_cache.bin'  # torch.compile编译缓存文件名（保存在模型目录下）
+# 当前torch是否支持导出/导入编译缓存（torch.compiler.save_cache_artifacts在较新版本中才提供）
+_COMPILE_CACHE_SUPPORTED = hasattr(getattr(torch, 'compiler', None), 'save_cache_artifacts')
+_compile_cache_paths = set()  # 进程退出时需要写入编译缓存的文件路径（只记录路径，不持有AI实例）
+
+_META_SUFFIX = '.meta.json'  # safetensors模型文件旁的元数据文件后缀
+_PREPROCESS_CACHE_SIZE = 100000  # 棋盘字符串预处理结果缓存的最大条目数（超出时按LRU淘汰）
+_SHM_CACHE_LIMIT = 1 << 30  # 本进程映射的共享内存权重缓存总字节数上限（超出时按LRU淘汰）
+_SHM_ALIGN = 64  # 共享内存中每个张量数据的对齐字节数
+_SHM_HEADER = struct.Struct('<Q')  # 共享内存头部：元数据JSON的字节长度
+_BATCHER_IDLE_CHECK = 1.0  # 批量推理线程空闲时检查所属AI是否已被回收的间隔（秒）
+_shm_cache: 'OrderedDict[str, Tuple[shared_memory.SharedMemory, bool]]' = OrderedDict()  # 名称 -> (共享内存, 是否由本进程创建)
+_shm_pending: List[Tuple[shared_memory.SharedMemory, bool]] = []  # 已淘汰但仍有张量引用、暂时无法释放的共享内存（进程退出时再次释放）
+
+def _shm_name(path: str) -> str:
+    """根据模型文件路径、修改时间和大小生成共享内存名称（文件变化后自动失效）"""
+    stat = os.stat(path)
+    key = f"{os.path.abspath(path)}:{stat.st_mtime_ns}:{stat.st_size}"
+    return 'gobang_' + hashlib.sha1(key.encode('utf-8')).hexdigest()[:24]
+
+def _attach_shm(name: str) -> shared_memory.SharedMemory:
+    """附加到其他进程创建的共享内存（不登记到resource_tracker，避免本进程退出时误删）"""
+    try:
+        return shared_memory.SharedMemory(name=name, track=False)
+    except TypeError:
+        # Python 3.13以前没有track参数，手动取消登记
+        shm = shared_memory.SharedMemory(name=name)
+        try:
+            from multiprocessing import resource_tracker
+            resource_tracker.unregister(shm._name, 'shared_memory')
+        except Exception:
+            pass
+        return shm
+
+def _release_shm(shm: shared_memory.SharedMemory, owner: bool) -> bool:
+    """释放本进程对共享内存的映射（创建者同时删除共享内存段）
+    Returns:
+        是否已释放（仍有张量引用该缓冲区时返回False）
+    """
+    try:
+        shm.close()
+    except BufferError:
+        return False
+    if owner:
+        try:
+            shm.unlink()
+        except FileNotFoundError:
+            pass  # 已被删除
+    return True
+
+def _evict_shm_cache():
+    """按LRU顺序淘汰共享内存缓存，直到总字节数不超过上限
+    仍被张量引用而无法释放的共享内存移入待释放列表，之后淘汰或进程退出时重试
+    """
+    _shm_pending[:] = [entry for entry in _shm_pending if not _release_shm(*entry)]
+    while len(_shm_cache) > 1 and sum(shm.size for shm, _ in _shm_cache.values()) > _SHM_CACHE_LIMIT:
+        _, (shm, owner) = _shm_cache.popitem(last=False)
+        if not _release_shm(shm, owner):
+            _shm_pending.append((shm, owner))
+
+def _store_state_dict(name: str, state_dict: Dict[str, torch.Tensor]) -> shared_memory.SharedMemory:
+    """把state_dict的张量数据按对齐偏移写入新建的共享内存（头部为元数据JSON）"""
+    entries = []
+    blobs = []
+    offset = 0
+    for key, tensor in state_dict.items():
+        data = tensor.detach().cpu().contiguous().reshape(-1).view(torch.uint8).numpy()
+        entries.append({'key': key, 'dtype': str(tensor.dtype).split('.')[-1], 'shape': list(tensor.shape), 'offset': offset, 'nbytes': data.nbytes})
+        blobs.append(data)
+        offset += -(-data.nbytes // _SHM_ALIGN) * _SHM_ALIGN
+    meta = json.dumps(entries).encode('utf-8')
+    data_start = -(-(_SHM_HEADER.size + len(meta)) // _SHM_ALIGN) * _SHM_ALIGN
+    
+    shm = shared_memory.SharedMemory(name=name, create=True, size=data_start + max(offset, 1))
+    _SHM_HEADER.pack_into(shm.buf, 0, len(meta))
+    shm.buf[_SHM_HEADER.size:_SHM_HEADER.size + len(meta)] = meta
+    for entry, data in zip(entries, blobs):
+        start = data_start + entry['offset']
+        shm.buf[start:start + entry['nbytes']] = data.tobytes()
+    return shm
+
+def _view_state_dict(shm: shared_memory.SharedMemory) -> Dict[str, torch.Tensor]:
+    """从共享内存重建state_dict（张量直接引用共享内存缓冲区，不拷贝数据）"""
+    meta_size, = _SHM_HEADER.unpack_from(shm.buf, 0)
+    entries = json.loads(bytes(shm.buf[_SHM_HEADER.size:_SHM_HEADER.size + meta_size]).decode('utf-8'))
+    data_start = -(-(_SHM_HEADER.size + meta_size) // _SHM_ALIGN) * _SHM_ALIGN
+    state_dict = OrderedDict()
+    for entry in entries:
+        dtype = getattr(torch, entry['dtype'])
+        if entry['nbytes'] == 0:
+            state_dict[entry['key']] = torch.empty(entry['shape'], dtype=dtype)
+            continue
+        tensor = torch.frombuffer(shm.buf, dtype=torch.uint8, count=entry['nbytes'], offset=data_start + entry['offset'])
+        state_dict[entry['key']] = tensor.view(dtype).view(entry['shape'])
+    return state_dict
+
+def _is_safetensors_file(path: str) -> bool:
+    """判断模型文件是否为safetensors格式（8字节头部长度后紧跟JSON头部）"""
+    with open(path, 'rb') as f:
+        header = f.read(9)
+    return len(header) == 9 and header[8:9] == b'{'
+
+def load_state_dict(path: str) -> Dict[str, torch.Tensor]:
+    """读取模型文件中的权重（safetensors格式直接内存映射构造张量，旧格式回退到torch.load）"""
+    if SAFETENSORS_AVAILABLE and _is_safetensors_file(path):
+        return safetensors.torch.load_file(path, device='cpu')
+    return torch.load(path, map_location='cpu')['model_state_dict']
+
+def cached_load_state_dict(path: str) -> Dict[str, torch.Tensor]:
+    """加载模型权重（跨进程共享内存缓存）
+    首次加载时反序列化checkpoint并把权重写入以(路径, 修改时间, 大小)命名的共享内存，
+    之后任何进程再加载同一文件都直接映射该共享内存，零拷贝重建张量。
+    Returns:
+        CPU上的state_dict（由load_state_dict拷贝到模型参数所在设备）
+    """
+    name = _shm_name(path)
+    cached = _shm_cache.get(name)
+    if cached is not None:
+        _shm_cache.move_to_end(name)
+        return _view_state_dict(cached[0])
+    
+    try:
+        shm, owner = _attach_shm(name), False
+    except FileNotFoundError:
+        state_dict = load_state_dict(path)
+        try:
+            shm, owner = _store_state_dict(name, state_dict), True
+        except FileExistsError:
+            shm, owner = _attach_shm(name), False  # 其他进程同时完成了写入
+        except OSError:
+            return state_dict  # 共享内存不可用时直接使用反序列化结果
+    
+    _shm_cache[name] = (shm, owner)
+    _evict_shm_cache()
+    return _view_state_dict(shm)
+
+@atexit.register
+def _release_shm_cache():
+    """进程退出时释放共享内存缓存（包括此前无法释放的共享内存；仍无法解除映射时也删除本进程创建的共享内存段）"""
+    entries = list(_shm_cache.values()) + _shm_pending
+    _shm_cache.clear()
+    _shm_pending.clear()
+    for shm, owner in entries:
+        if not _release_shm(shm, owner) and owner:
+            try:
+                shm.unlink()
+            except FileNotFoundError:
+                pass
+
+@atexit.register
+def _save_compile_cache():
+    """进程退出时保存torch.compile编译缓存（缓存为进程级，所有模型目录写入同一份）"""
+    if not _compile_cache_paths:
+        return
+    try:
+        artifacts = torch.compiler.save_cache_artifacts()
+        if artifacts is None:
+            return
+        for path in _compile_cache_paths:
+            with open(path, 'wb') as f:
+                f.write(artifacts[0])
+    except Exception as e:
+        Logger.get_instance().warning("保存编译缓存失败: %s", e)
 
 class GobangNN(nn.Module):
     """五子棋神经网络（用于落子预测）"""
@@ -25,8 +206,7 @@ class GobangNN(nn.Module):
             layers.append(nn.ReLU())
             layers.append(nn.Dropout(0.3))  # 防止过拟合
             prev_size = hidden_size
-        layers.append(nn.Linear(prev_size, output_size))
-        layers.append(nn.Softmax(dim=1))  # 输出落子概率
+        layers.append(nn.Linear(prev_size, output_size))  # 输出落子logits（softmax在训练损失/推理后处理中完成）
         
         self.model = nn.Sequential(*layers)
         
@@ -42,14 +222,77 @@ class GobangNN(nn.Module):
                     nn.init.zeros_(m.bias)
     
     def forward(self, x: torch.Tensor) -> torch.Tensor:
-        """前向传播"""
-        return self.model(x)
+        """前向传播（输入为int8编码的棋盘时先转换为浮点；推理时跳过eval模式下为恒等映射的Dropout层，输出logits）"""
+        x = x.float()
+        if self.training:
+            return self.model(x)
+        for layer in self.model:
+            if not isinstance(layer, nn.Dropout):
+                x = layer(x)
+        return x
+
+class _InferenceBatcher:
+    """动态批量推理：后台线程收集异步落子请求，凑满批次或等待超时后一次性前向传播
+    只持有AI的弱引用，AI实例被回收后线程自动退出
+    """
+    def __init__(self, ai: 'NNAI', max_batch: int, max_wait: float):
+        self._ai = weakref.ref(ai)
+        self.max_batch = max(1, max_batch)  # 每批最多合并的请求数
+        self.max_wait = max_wait  # 收到第一个请求后等待后续请求的最长时间（秒）
+        self._requests: 'queue.Queue[Tuple[np.ndarray, Future]]' = queue.Queue()
+        self._thread = threading.Thread(target=self._run, name='nn_infer_batcher', daemon=True)
+        self._thread.start()
+    
+    def submit(self, board: np.ndarray) -> Future:
+        """提交一个棋盘（调用方不得再修改），返回结果为落子坐标的Future"""
+        future = Future()
+        self._requests.put((board, future))
+        return future
+    
+    def _collect(self) -> List[Tuple[np.ndarray, Future]]:
+        """等待第一个请求（空闲超时返回空列表），再在等待时间内收集后续请求，直到凑满批次"""
+        try:
+            batch = [self._requests.get(timeout=_BATCHER_IDLE_CHECK)]
+        except queue.Empty:
+            return []
+        deadline = time.monotonic() + self.max_wait
+        while len(batch) < self.max_batch:
+            timeout = deadline - time.monotonic()
+            if timeout <= 0:
+                break
+            try:
+                batch.append(self._requests.get(timeout=timeout))
+            except queue.Empty:
+                break
+        return batch
+    
+    def _run(self):
+        while True:
+            batch = [(board, future) for board, future in self._collect() if future.set_running_or_notify_cancel()]
+            ai = self._ai()
+            if ai is None:
+                return
+            if batch:
+                self._process(ai, batch)
+            del ai  # 等待下一批请求期间不持有AI的强引用
+    
+    @staticmethod
+    def _process(ai: 'NNAI', batch: List[Tuple[np.ndarray, Future]]):
+        """对一批请求做一次批量推理并设置各自的结果"""
+        try:
+            moves = ai.batch_move(np.stack([board for board, _ in batch]))
+        except Exception as e:
+            for _, future in batch:
+                future.set_exception(e)
+            return
+        for (_, future), move in zip(batch, moves):
+            future.set_result(move)
 
 class NNAI(BaseAI):
     """神经网络AI（基于PyTorch+CUDA）"""
     def __init__(self, color: int, level: str = AI_LEVELS['HARD'], model_path: Optional[str] = None):
         super().__init__(color, level)
-        self.evaluator = BoardEvaluator(self.board_size)  # 棋盘评估器
+        self.evaluator = get_evaluator(self.board_size)  # 棋盘评估器（共享实例）
         self.device = torch.device('cuda' if torch.cuda.is_available() else 'cpu')  # 自动选择设备
         self.config = Config.get_instance()
         
@@ -58,10 +301,18 @@ class NNAI(BaseAI):
         self.hidden_layers = self.config.get_list('AI', 'nn_hidden_layers')
         self.output_size = self.board_size * self.board_size
         self.model = GobangNN(self.input_size, self.hidden_layers, self.output_size).to(self.device)
+        self._preprocess_cache: 'OrderedDict[str, np.ndarray]' = OrderedDict()  # 棋盘字符串 -> 预处理后的输入行（CPU）
+        self._input_buffers: Optional[Tuple[np.ndarray, torch.Tensor]] = None  # 单局面推理复用的(主机缓冲区, 输入张量)
+        self._infer_lock = threading.RLock()  # 保护单局面推理的共享输入缓冲区和CUDA图静态张量（批量推理线程也会重放CUDA图）
+        self._compiled = self._compile_model()  # 编译后的模型（与self.model共享参数，不可用时即为self.model）
+        self._quantized: Optional[nn.Module] = None  # CPU推理用的int8动态量化模型（权重变化后重新生成）
+        self._cuda_graph: Optional[Tuple[torch.cuda.CUDAGraph, torch.Tensor, torch.Tensor]] = None  # 单局面推理的CUDA图(图, 静态输入, 静态输出)
+        self._batcher: Optional[_InferenceBatcher] = None  # 异步落子请求的批量推理器（首次异步请求时创建）
+        self._batcher_lock = threading.Lock()
         
         # 加载预训练模型
         if model_path and self._load_model(model_path):
-            self.logger.info(f"成功加载预训练模型: {model_path}")
+            self.logger.info("成功加载预训练模型: %s", model_path)
         else:
             self.logger.warning("未加载预训练模型，使用随机初始化权重")
         
@@ -84,20 +335,127 @@ class NNAI(BaseAI):
         }
         return temp_map.get(self.level, 0.5)
     
+    def _compile_cache_path(self) -> str:
+        """获取torch.compile编译缓存文件路径"""
+        return os.path.join(self.config.get('PATH', 'models'), _COMPILE_CACHE_FILE)
+    
+    def _compile_model(self) -> nn.Module:
+        """使用torch.compile编译模型（融合逐元素算子、减少Python调度开销；不可用时回退到eager模型）"""
+        if not self.config.ai_nn_compile or not hasattr(torch, 'compile'):
+            return self.model
+        
+        # 加载上次进程保存的编译缓存，避免冷启动时重新编译（缓存为进程级，同一文件只需加载一次）
+        cache_path = self._compile_cache_path()
+        if _COMPILE_CACHE_SUPPORTED and cache_path not in _compile_cache_paths and os.path.exists(cache_path):
+            try:
+                with open(cache_path, 'rb') as f:
+                    torch.compiler.load_cache_artifacts(f.read())
+            except Exception as e:
+                self.logger.warning("加载编译缓存失败: %s", e)
+        
+        try:
+            compiled = torch.compile(self.model, mode='reduce-overhead', fullgraph=True)
+        except Exception as e:
+            self.logger.warning("模型编译失败，使用eager模式: %s", e)
+            return self.model
+        if _COMPILE_CACHE_SUPPORTED:
+            _compile_cache_paths.add(cache_path)
+        return compiled
+    
+    def _forward(self, inputs: torch.Tensor) -> torch.Tensor:
+        """模型前向传播（优先使用编译后的模型，编译在首次调用时发生，失败则回退到eager模式）"""
+        if self._compiled is not self.model:
+            try:
+                return self._compiled(inputs)
+            except Exception as e:
+                self.logger.warning("编译模型运行失败，回退到eager模式: %s", e)
+                self._compiled = self.model
+        return self.model(inputs)
+    
+    def _refresh_quantized_model(self):
+        """根据当前FP32权重重新生成int8动态量化的推理模型（仅CPU推理且配置开启时）"""
+        self._quantized = None
+        if self.device.type != 'cpu' or not self.config.ai_inference_quantized:
+            return
+        try:
+            self.model.eval()
+            self._quantized = torch.quantization.quantize_dynamic(self.model, {nn.Linear}, dtype=torch.qint8)
+        except Exception as e:
+            self.logger.warning("模型量化失败，使用FP32推理: %s", e)
+    
+    def release_device(self):
+        """释放GPU资源，之后在CPU上推理/训练
+        模型参数和优化器状态移到CPU，丢弃编译后的模型、CUDA图及其静态张量和设备上的输入缓冲区，最后归还缓存的显存
+        """
+        if self.device.type == 'cpu':
+            return
+        with self._infer_lock:
+            self.model.to('cpu')
+            for state in self.optimizer.state.values():
+                for k, v in state.items():
+                    if torch.is_tensor(v):
+                        state[k] = v.to('cpu')
+            self.device = torch.device('cpu')
+            self._compiled = self.model
+            self._cuda_graph = None
+            self._input_buffers = None
+            self._refresh_quantized_model()
+        if torch.cuda.is_available():
+            torch.cuda.empty_cache()
+    
+    def _infer(self, inputs: torch.Tensor) -> torch.Tensor:
+        """推理前向传播（有量化模型时使用量化模型；GPU上单局面推理且未编译时重放CUDA图；否则与训练共用FP32模型）"""
+        if self._quantized is not None:
+            return self._quantized(inputs)
+        if self.device.type == 'cuda' and self._compiled is self.model and inputs.shape == (1, self.input_size):
+            with self._infer_lock:
+                return self._graph_forward(inputs)
+        return self._forward(inputs)
+    
+    def _graph_forward(self, inputs: torch.Tensor) -> torch.Tensor:
+        """用CUDA图执行单局面前向传播（首次调用时捕获，之后只需拷贝输入并重放）
+        加载/合并权重时load_state_dict原地拷贝参数，捕获的图无需重建
+        """
+        if self._cuda_graph is None:
+            static_input = torch.zeros(1, self.input_size, device=self.device)
+            # 捕获前在独立的流上预热（初始化cuBLAS句柄等）
+            stream = torch.cuda.Stream()
+            stream.wait_stream(torch.cuda.current_stream())
+            with torch.cuda.stream(stream), torch.no_grad():
+                for _ in range(3):
+                    self.model(static_input)
+            torch.cuda.current_stream().wait_stream(stream)
+            
+            graph = torch.cuda.CUDAGraph()
+            with torch.cuda.graph(graph), torch.no_grad():
+                static_output = self.model(static_input)
+            self._cuda_graph = (graph, static_input, static_output)
+        
+        graph, static_input, static_output = self._cuda_graph
+        static_input.copy_(inputs)
+        graph.replay()
+        return static_output.clone()
+    
     def _load_model(self, model_path: str) -> bool:
         """加载模型权重"""
         try:
-            checkpoint = torch.load(model_path, map_location=self.device)
-            self.model.load_state_dict(checkpoint['model_state_dict'])
+            self.model.load_state_dict(cached_load_state_dict(model_path))
             self.model.eval()  # 设置为评估模式
+            self._refresh_quantized_model()
             return True
         except Exception as e:
-            self.logger.error(f"加载模型失败: {str(e)}")
+            self.logger.error("加载模型失败: %s", e)
             return False
     
     def _save_model(self, model_path: str, metadata: Optional[Dict] = None) -> bool:
-        """保存模型权重"""
+        """保存模型权重（safetensors可用时权重写入safetensors文件，元数据写入旁边的JSON文件）"""
         try:
+            if SAFETENSORS_AVAILABLE:
+                state_dict = {k: v.contiguous() for k, v in self.model.state_dict().items()}
+                safetensors.torch.save_file(state_dict, model_path)
+                DataUtils.save_json(metadata or {}, model_path + _META_SUFFIX)
+                return True
+            
             checkpoint = {
                 'model_state_dict': self.model.state_dict(),
                 'optimizer_state_dict': self.optimizer.state_dict(),
@@ -106,46 +464,113 @@ class NNAI(BaseAI):
             torch.save(checkpoint, model_path)
             return True
         except Exception as e:
-            self.logger.error(f"保存模型失败: {str(e)}")
+            self.logger.error("保存模型失败: %s", e)
             return False
     
+    def _infer_board(self, board: List[List[int]]) -> torch.Tensor:
+        """单局面推理（预处理和前向传播在锁内完成，多个线程同时调用move/evaluate时不会互相覆盖输入缓冲区）"""
+        with self._infer_lock, torch.no_grad():
+            return self._infer(self._preprocess_board(board))
+    
     def _preprocess_board(self, board: List[List[int]]) -> torch.Tensor:
-        """预处理棋盘数据（转换为模型输入）"""
-        # 转换为numpy数组
-        board_np = np.array(board, dtype=np.float32)
+        """预处理棋盘数据（转换为模型输入，原地写入预分配的缓冲区，不分配新数组/张量）
+        返回的张量在下一次调用时被覆盖，调用方需持有_infer_lock并在释放前完成推理
+        """
+        host_buf, input_tensor = self._get_input_buffers()
+        board_np = self._to_board_array(board).reshape(1, -1)
         
         # 标准化：自己的棋子为1，对手为-1，空为0
-        board_np[board_np == self.color] = 1.0
-        board_np[board_np == self.opponent_color] = -1.0
-        board_np[board_np == PIECE_COLORS['EMPTY']] = 0.0
-        
-        # 展平为一维向量并转换为Tensor
-        board_flat = board_np.flatten()
-        return torch.tensor(board_flat, dtype=torch.float32).unsqueeze(0).to(self.device)
-    
-    def _postprocess_output(self, output: torch.Tensor, board: List[List[int]]) -> Tuple[np.ndarray, List[Tuple[int, int, float]]]:
-        """后处理模型输出（转换为落子概率）"""
-        # 应用温度参数
-        output = output / self.temperature
-        probabilities = torch.softmax(output, dim=1).detach().cpu().numpy()[0]
-        
-        # 过滤掉已落子的位置（概率设为0）
-        board_np = np.array(board)
-        mask = (board_np == PIECE_COLORS['EMPTY']).flatten()
-        probabilities[~mask] = 0.0
-        
-        # 归一化概率
-        if probabilities.sum() > 0:
-            probabilities /= probabilities.sum()
-        
-        # 转换为落子概率列表
-        move_probs = []
-        for i in range(self.board_size):
-            for j in range(self.board_size):
-                idx = DataUtils.move_to_index(i, j, self.board_size)
-                move_probs.append((i, j, probabilities[idx]))
-        
-        return probabilities.reshape((self.board_size, self.board_size)), move_probs
+        np.copyto(host_buf, board_np == self.color)
+        host_buf -= board_np == self.opponent_color
+        
+        if input_tensor.device.type == 'cuda':
+            input_tensor.copy_(torch.from_numpy(host_buf), non_blocking=True)
+        return input_tensor
+    
+    def _get_input_buffers(self) -> Tuple[np.ndarray, torch.Tensor]:
+        """获取单局面推理的输入缓冲区（设备变化时重新分配）
+        CUDA下主机缓冲区为锁页内存，异步拷贝到设备上的输入张量；CPU下输入张量直接共享主机缓冲区
+        """
+        if self._input_buffers is None or self._input_buffers[1].device != self.device:
+            on_cuda = self.device.type == 'cuda'
+            host_tensor = torch.zeros(1, self.input_size, dtype=torch.int8, pin_memory=on_cuda)
+            input_tensor = torch.empty(1, self.input_size, dtype=torch.int8, device=self.device) if on_cuda else host_tensor
+            self._input_buffers = (host_tensor.numpy(), input_tensor)
+        return self._input_buffers
+    
+    def _preprocess_board_batch(self, boards: List[List[List[int]]], to_device: bool = True) -> torch.Tensor:
+        """批量预处理棋盘数据（一次性向量化转换，再整体拷贝到设备）
+        Args:
+            to_device: 是否拷贝到模型所在设备（False时返回CPU张量，由DataLoader分批传输）
+        Returns:
+            形状为(N, board_size*board_size)的输入张量
+        """
+        return self._to_input_tensor(self._normalize_boards(np.asarray(boards, dtype=np.int8)), to_device)
+    
+    def _preprocess_board_strs(self, board_strs: List[str], to_device: bool = True) -> torch.Tensor:
+        """批量预处理棋盘字符串（按字符串缓存预处理结果，重复出现的棋盘只需查表）
+        Args:
+            board_strs: 棋盘字符串列表（训练数据的input_data）
+            to_device: 是否拷贝到模型所在设备
+        Returns:
+            形状为(N, board_size*board_size)的输入张量
+        """
+        cache = self._preprocess_cache
+        missing = list(dict.fromkeys(board_str for board_str in board_strs if board_str not in cache))
+        if missing:
+            # 未命中的棋盘一次性解析并向量化预处理
+            boards_np = np.stack([DataUtils.str_to_np(board_str) for board_str in missing])
+            for board_str, row in zip(missing, self._normalize_boards(boards_np)):
+                cache[board_str] = row
+        
+        rows = []
+        for board_str in board_strs:
+            cache.move_to_end(board_str)
+            rows.append(cache[board_str])
+        while len(cache) > _PREPROCESS_CACHE_SIZE:
+            cache.popitem(last=False)
+        return self._to_input_tensor(np.stack(rows), to_device)
+    
+    def _normalize_boards(self, boards_np: np.ndarray) -> np.ndarray:
+        """标准化棋盘：自己的棋子为1，对手为-1，空为0
+        返回形状为(N, board_size*board_size)的int8数组（传输和缓存量为float32的1/4，模型第一步再转换为浮点）
+        """
+        inputs = (boards_np == self.color).astype(np.int8)
+        inputs -= boards_np == self.opponent_color
+        return inputs.reshape(len(boards_np), -1)
+    
+    def _to_input_tensor(self, inputs: np.ndarray, to_device: bool) -> torch.Tensor:
+        """把预处理后的数组转换为Tensor（单次主机到设备的拷贝，CUDA下使用锁页内存异步传输）"""
+        tensor = torch.from_numpy(inputs)
+        if not to_device:
+            return tensor
+        if self.device.type == 'cuda':
+            return tensor.pin_memory().to(self.device, non_blocking=True)
+        return tensor.to(self.device)
+    
+    def _postprocess_output(
+        self, output: torch.Tensor, board: List[List[int]], top_k: int = 5
+    ) -> Tuple[np.ndarray, List[Tuple[int, int, float]]]:
+        """后处理模型输出（温度缩放、屏蔽已落子位置、softmax在设备上一次完成）
+        Returns:
+            (落子概率矩阵, 概率最高的top_k个落子[(x, y, 概率)]，按概率降序)
+        """
+        # 已落子的位置logits设为-inf，softmax后概率为0（棋盘已满时不屏蔽）
+        empty = torch.as_tensor(self._to_board_array(board) == PIECE_COLORS['EMPTY'], device=output.device).view(1, -1)
+        logits = output / self.temperature
+        if empty.any():
+            logits = logits.masked_fill(~empty, float('-inf'))
+        probabilities = torch.softmax(logits, dim=1)
+        
+        # 只为概率最高的几个落子构造(x, y, 概率)
+        top_probs, top_idxs = torch.topk(probabilities[0], min(top_k, probabilities.shape[1]))
+        move_probs = [
+            (*divmod(idx, self.board_size), prob)
+            for idx, prob in zip(top_idxs.tolist(), top_probs.tolist())
+        ]
+        
+        prob_matrix = probabilities[0].detach().cpu().numpy().reshape((self.board_size, self.board_size))
+        return prob_matrix, move_probs
     
     def move(self, board: List[List[int]], thinking_callback: Optional[Callable[[Dict], None]] = None) -> Tuple[int, int]:
         """计算最佳落子（神经网络预测）"""
@@ -164,18 +589,13 @@ class NNAI(BaseAI):
             })
             return winning_move
         
-        # 预处理棋盘
-        input_tensor = self._preprocess_board(board)
-        
-        # 模型预测
-        with torch.no_grad():
-            output = self.model(input_tensor)
+        # 预处理棋盘并进行模型预测
+        output = self._infer_board(board)
         
         # 后处理输出
         prob_matrix, move_probs = self._postprocess_output(output, board)
         
-        # 排序并获取最佳落子
-        move_probs.sort(key=lambda x: x[2], reverse=True)
+        # 获取最佳落子（后处理已按概率降序排列）
         best_move = move_probs[0][:2]
         top_moves = [move[:2] for move in move_probs[:5]]
         
@@ -189,29 +609,65 @@ class NNAI(BaseAI):
             'iteration': 1
         })
         
-        self.logger.info(f"NN AI 落子: {best_move}，概率: {move_probs[0][2]:.4f}")
+        self.logger.info("NN AI 落子: %s，概率: %.4f", best_move, move_probs[0][2])
         return best_move
     
+    def forward_batch(self, boards: np.ndarray) -> np.ndarray:
+        """批量计算落子概率（整批一次前向传播，温度缩放、屏蔽已落子位置、softmax在设备上完成）
+        Args:
+            boards: 形状为(B, N, N)的棋盘数组
+        Returns:
+            形状为(B, N, N)的落子概率
+        """
+        self.model.eval()
+        boards = np.asarray(boards, dtype=np.uint8)
+        inputs = self._to_input_tensor(self._normalize_boards(boards), True)
+        with torch.no_grad():
+            logits = self._infer(inputs) / self.temperature
+            empty = torch.as_tensor(boards == PIECE_COLORS['EMPTY'], device=logits.device).view(len(boards), -1)
+            # 已落子的位置logits设为-inf（棋盘已满的行不屏蔽）
+            occupied = ~empty & empty.any(dim=1, keepdim=True)
+            probabilities = torch.softmax(logits.masked_fill(occupied, float('-inf')), dim=1)
+        return probabilities.cpu().numpy().reshape(len(boards), self.board_size, self.board_size)
+    
+    def batch_move(self, boards: np.ndarray) -> List[Tuple[int, int]]:
+        """批量计算多个棋盘的最佳落子（有必胜落子的棋盘直接返回，其余棋盘合并为一次推理）"""
+        moves: List[Optional[Tuple[int, int]]] = [self._check_winning_move(board) for board in boards]
+        pending = [i for i, move in enumerate(moves) if move is None]
+        if pending:
+            probabilities = self.forward_batch(np.asarray(boards)[pending]).reshape(len(pending), -1)
+            for i, idx in zip(pending, probabilities.argmax(axis=1).tolist()):
+                moves[i] = divmod(idx, self.board_size)
+        return moves
+    
+    def move_async(self, board: List[List[int]]) -> Future:
+        """异步计算落子（请求进入批量推理队列，与同一AI实例上的其他请求合并推理；不触发思考过程回调）"""
+        if self._batcher is None:
+            with self._batcher_lock:
+                if self._batcher is None:
+                    self._batcher = _InferenceBatcher(
+                        self, self.config.ai_infer_batch_size, self.config.ai_infer_batch_wait_ms / 1000.0
+                    )
+        return self._batcher.submit(self._copy_board(board))
+    
     def _check_winning_move(self, board: List[List[int]]) -> Optional[Tuple[int, int]]:
-        """检查是否有必胜落子"""
-        empty_positions = self._get_empty_positions(board)
-        for (x, y) in empty_positions:
-            temp_board = self._copy_board(board)
-            temp_board[x][y] = self.color
-            if self._is_win(temp_board, self.color)[0]:
-                return (x, y)
-        return None
-    
-    def train_model(self, train_data: List[Tuple[List[List[int]], Tuple[int, int]]], epochs: int = None, batch_size: int = None) -> Tuple[List[float], List[float]]:
+        """检查是否有必胜落子（整盘向量化统计连子数，无需逐个空位试落子）"""
+        wins = np.flatnonzero(winning_cells(self._to_board_array(board), self.color))
+        if wins.size == 0:
+            return None
+        return divmod(int(wins[0]), self.board_size)
+    
+    def train_model(self, train_data: Union[List[Tuple[List[List[int]], Tuple[int, int]]], np.ndarray], epochs: int = None, batch_size: int = None) -> Tuple[List[float], List[float]]:
         """训练模型
         Args:
-            train_data: 训练数据列表，每个元素为(棋盘状态, 最佳落子)
+            train_data: 训练数据列表，每个元素为(棋盘状态, 最佳落子)，棋盘状态可以是二维列表或棋盘字符串；
+                也可以是DataUtils.load_training_array加载的列式结构化数组（字段board/move，可为内存映射）
             epochs: 训练轮数（默认使用配置值）
             batch_size: 批次大小（默认使用配置值）
         Returns:
             (loss_history, accuracy_history): 损失和准确率历史
         """
-        if not train_data:
+        if len(train_data) == 0:
             raise AIError("没有训练数据", 4301)
         
         self.model.train()  # 设置为训练模式
@@ -221,21 +677,28 @@ class NNAI(BaseAI):
         loss_history = []
         accuracy_history = []
         
-        # 准备训练数据
-        inputs = []
-        labels = []
-        for board, move in train_data:
-            # 预处理输入
-            input_tensor = self._preprocess_board(board)
-            inputs.append(input_tensor)
-            
-            # 转换标签（落子位置索引）
-            label_idx = DataUtils.move_to_index(move[0], move[1], self.board_size)
-            labels.append(torch.tensor(label_idx, dtype=torch.long).to(self.device))
-        
-        # 组合数据并分批
-        dataset = torch.utils.data.TensorDataset(torch.cat(inputs), torch.stack(labels))
-        dataloader = torch.utils.data.DataLoader(dataset, batch_size=batch_size, shuffle=True)
+        # 准备训练数据（整体预处理输入，标签转换为落子位置索引；数据保留在CPU上由DataLoader分批传输）
+        if isinstance(train_data, np.ndarray) and train_data.dtype.names:
+            # 列式训练数据直接整列向量化预处理，不经过逐样本的Python对象
+            inputs = self._to_input_tensor(self._normalize_boards(train_data['board']), False)
+            moves_np = train_data['move'].astype(np.int64)
+        else:
+            boards, moves = zip(*train_data)
+            if isinstance(boards[0], str):
+                inputs = self._preprocess_board_strs(boards, to_device=False)
+            else:
+                inputs = self._preprocess_board_batch(boards, to_device=False)
+            moves_np = np.asarray(moves, dtype=np.int64).reshape(-1, 2)
+        labels = torch.from_numpy(DataUtils.moves_to_indices(moves_np[:, 0], moves_np[:, 1], self.board_size))
+        
+        # 组合数据并分批（GPU训练时用后台进程预取批次并放入锁页内存，与GPU计算重叠；
+        # 每次训练都新建DataLoader，不使用persistent_workers，训练结束后工作进程随之退出）
+        dataset = torch.utils.data.TensorDataset(inputs, labels)
+        loader_options = {}
+        if self.device.type == 'cuda':
+            num_workers = max(1, (os.cpu_count() or 2) // 2)
+            loader_options = {'num_workers': num_workers, 'pin_memory': True, 'prefetch_factor': 4}
+        dataloader = torch.utils.data.DataLoader(dataset, batch_size=batch_size, shuffle=True, **loader_options)
         
         # 开始训练
         for epoch in range(epochs):
@@ -244,8 +707,11 @@ class NNAI(BaseAI):
             total = 0
             
             for batch_inputs, batch_labels in dataloader:
+                batch_inputs = batch_inputs.to(self.device, non_blocking=True)
+                batch_labels = batch_labels.to(self.device, non_blocking=True)
+                
                 # 前向传播
-                outputs = self.model(batch_inputs)
+                outputs = self._forward(batch_inputs)
                 loss = self.criterion(outputs, batch_labels)
                 
                 # 反向传播和优化
@@ -265,8 +731,9 @@ class NNAI(BaseAI):
             loss_history.append(avg_loss)
             accuracy_history.append(accuracy)
             
-            self.logger.info(f"训练轮次 {epoch+1}/{epochs} - 损失: {avg_loss:.4f} - 准确率: {accuracy:.4f}")
+            self.logger.info("训练轮次 %s/%s - 损失: %.4f - 准确率: %.4f", epoch + 1, epochs, avg_loss, accuracy)
         
+        self._refresh_quantized_model()
         return loss_history, accuracy_history
     
     def merge_models(self, model_paths: List[str], weights: Optional[List[float]] = None) -> bool:
@@ -281,39 +748,40 @@ class NNAI(BaseAI):
             self.logger.error("至少需要两个模型才能合并")
             return False
         
-        # 初始化合并权重
-        merged_state_dict = None
+        # 预分配合并结果（与模型同设备的全零张量），逐个模型原地累加
         weights = weights or [1.0 / len(model_paths)] * len(model_paths)
-        
-        # 加载并合并每个模型的权重
-        for i, path in enumerate(model_paths):
-            try:
-                checkpoint = torch.load(path, map_location=self.device)
-                model_state = checkpoint['model_state_dict']
+        merged_state_dict = {k: torch.zeros_like(v) for k, v in self.model.state_dict().items()}
+        
+        # 后台线程预读下一个模型，与当前模型的累加重叠；任一时刻只持有一个已加载的模型
+        with ThreadPoolExecutor(max_workers=1) as executor:
+            pending = executor.submit(cached_load_state_dict, model_paths[0])
+            for i, path in enumerate(model_paths):
+                try:
+                    model_state = pending.result()
+                except Exception as e:
+                    self.logger.error("加载模型 %s 失败: %s", path, e)
+                    return False
+                if i + 1 < len(model_paths):
+                    pending = executor.submit(cached_load_state_dict, model_paths[i + 1])
                 
-                if merged_state_dict is None:
-                    # 初始化合并权重
-                    merged_state_dict = {k: v * weights[i] for k, v in model_state.items()}
-                else:
-                    # 累加权重
+                try:
                     for k, v in model_state.items():
-                        merged_state_dict[k] += v * weights[i]
-            except Exception as e:
-                self.logger.error(f"加载模型 {path} 失败: {str(e)}")
-                return False
+                        merged_state_dict[k].add_(v.to(self.device, non_blocking=True), alpha=weights[i])
+                except Exception as e:
+                    self.logger.error("合并模型 %s 失败: %s", path, e)
+                    return False
+                del model_state
         
         # 应用合并后的权重
         self.model.load_state_dict(merged_state_dict)
-        self.logger.info(f"成功合并 {len(model_paths)} 个模型")
+        self._refresh_quantized_model()
+        self.logger.info("成功合并 %s 个模型", len(model_paths))
         return True
     
     def evaluate(self, board: List[List[int]]) -> float:
         """评估棋盘得分（使用模型输出概率）"""
         self.model.eval()
-        input_tensor = self._preprocess_board(board)
-        
-        with torch.no_grad():
-            output = self.model(input_tensor)
+        output = self._infer_board(board)
         
         # 后处理输出
         prob_matrix, _ = self._postprocess_output(output, board)
@@ -327,7 +795,7 @@ class NNAI(BaseAI):
         """重写设置难度方法（调整温度参数）"""
         super().set_level(level)
         self.temperature = self._get_temperature_by_level()
-        self.logger.info(f"NN AI 温度参数已设置为: {self.temperature}")
+        self.logger.info("NN AI 温度参数已设置为: %s", self.temperature)
     
     def save_model(self, path: str, metadata: Optional[Dict] = None) -> bool:
         """对外暴露的保存模型方法"""
@@ -1,10 +1,14 @@
 import os
+import ast
 import configparser
+from functools import cached_property
 from Common.logger import Logger
 
 class Config:
     _instance = None
     _config = None
+    _values = None  # 解析后的配置项字符串 {(段, 键): 值}（加载时一次性展开，读取只需一次字典查询）
+    _typed = None  # 类型转换后的配置项缓存 {(类型, 段, 键): 值}
 
     # 配置项默认值
     DEFAULT_CONFIG = {
@@ -13,7 +17,8 @@ class Config:
             'server': 'localhost',
             'name': 'GobangAI',
             'user': 'sa',
-            'password': 'YourStrongPassword123!'
+            'password': 'YourStrongPassword123!',
+            'pool_size': 4  # 数据库连接池大小（可同时执行的数据库请求数）
         },
         # 服务器配置
         'SERVER': {
@@ -34,12 +39,18 @@ class Config:
         'AI': {
             'minimax_depth': 6,
             'mcts_iterations': 1000,
+            'search_threads': 1,  # 根节点并行搜索线程数（1表示串行搜索）
             'nn_input_size': 225,  # 15x15
             'nn_hidden_layers': '[1024, 512, 256]',
             'nn_output_size': 225,
+            'nn_compile': True,  # 是否使用torch.compile编译神经网络（失败时回退到eager模式）
+            'inference_quantized': True,  # CPU推理时是否使用int8动态量化模型（训练仍使用FP32模型）
             'learning_rate': 0.001,
             'batch_size': 32,
-            'max_epochs': 500
+            'max_epochs': 500,
+            'model_cache_mb': 1024,  # 已加载模型缓存的内存上限（MB，超出时淘汰最久未使用的模型）
+            'infer_batch_size': 32,  # 神经网络异步落子请求合并推理的最大批次
+            'infer_batch_wait_ms': 5  # 合并批次时等待后续请求的最长时间（毫秒）
         },
         # 可视化配置
         'VISUAL': {
@@ -75,11 +86,31 @@ class Config:
         # 如果配置文件不存在，创建默认配置
         if not os.path.exists(config_path):
             self._create_default_config(config_path)
-            Logger.get_instance().info("配置文件不存在，已创建默认配置")
+            message = "配置文件不存在，已创建默认配置"
         else:
             # 读取配置文件
             self._config.read(config_path, encoding='utf-8')
-            Logger.get_instance().info("配置文件加载成功")
+            message = "配置文件加载成功"
+        # 先展开配置再记录日志（Logger初始化时会回调Config.get读取日志目录）
+        self._materialize()
+        Logger.get_instance().info(message)
+
+    def _materialize(self):
+        """把configparser中的配置展开为扁平字典，并清空类型转换缓存和属性缓存"""
+        self._values = {
+            (section, key): value
+            for section in self._config.sections()
+            for key, value in self._config.items(section)
+        }
+        self._typed = {}
+        # 列表类型配置项在加载时一次性解析（只接受字面量，不执行任意代码）
+        for (section, key), value in self._values.items():
+            if value.lstrip().startswith('['):
+                self._parse_list(section, key, value)
+        # 清除属性缓存（配置属性用cached_property，首次访问后为普通实例属性）
+        for name, attr in type(self).__dict__.items():
+            if isinstance(attr, cached_property):
+                self.__dict__.pop(name, None)
 
     def _create_default_config(self, config_path):
         """创建默认配置文件"""
@@ -95,58 +126,85 @@ class Config:
         """初始化所需目录"""
         path_config = self.get_section('PATH')
         for dir_name, dir_path in path_config.items():
-            if not os.path.exists(dir_path):
+            try:
                 os.makedirs(dir_path)
-                Logger.get_instance().info(f"创建目录: {dir_path}")
+            except FileExistsError:
+                continue
+            Logger.get_instance().info("创建目录: %s", dir_path)
 
     def get(self, section, key):
-        """获取配置项"""
+        """获取配置项（缺失时使用默认值，并记录到扁平字典中，只警告一次）"""
         try:
-            return self._config.get(section, key)
-        except configparser.NoSectionError:
-            Logger.get_instance().warning(f"配置段不存在: {section}")
-            return self.DEFAULT_CONFIG.get(section, {}).get(key)
-        except configparser.NoOptionError:
-            Logger.get_instance().warning(f"配置项不存在: {section}.{key}")
-            return self.DEFAULT_CONFIG.get(section, {}).get(key)
+            return self._values[(section, key)]
+        except KeyError:
+            pass
+        if not self._config.has_section(section):
+            Logger.get_instance().warning("配置段不存在: %s", section)
+        else:
+            Logger.get_instance().warning("配置项不存在: %s.%s", section, key)
+        value = self.DEFAULT_CONFIG.get(section, {}).get(key)
+        self._values[(section, key)] = value
+        return value
 
     def get_int(self, section, key):
         """获取整数类型配置项"""
-        value = self.get(section, key)
-        try:
-            return int(value)
-        except:
-            return int(self.DEFAULT_CONFIG.get(section, {}).get(key))
+        cache_key = ('int', section, key)
+        if cache_key not in self._typed:
+            value = self.get(section, key)
+            try:
+                self._typed[cache_key] = int(value)
+            except:
+                self._typed[cache_key] = int(self.DEFAULT_CONFIG.get(section, {}).get(key))
+        return self._typed[cache_key]
 
     def get_float(self, section, key):
         """获取浮点数类型配置项"""
-        value = self.get(section, key)
-        try:
-            return float(value)
-        except:
-            return float(self.DEFAULT_CONFIG.get(section, {}).get(key))
+        cache_key = ('float', section, key)
+        if cache_key not in self._typed:
+            value = self.get(section, key)
+            try:
+                self._typed[cache_key] = float(value)
+            except:
+                self._typed[cache_key] = float(self.DEFAULT_CONFIG.get(section, {}).get(key))
+        return self._typed[cache_key]
 
     def get_bool(self, section, key):
         """获取布尔类型配置项"""
-        value = self.get(section, key)
-        if isinstance(value, str):
-            return value.lower() in ['true', '1', 'yes']
-        return bool(value)
+        cache_key = ('bool', section, key)
+        if cache_key not in self._typed:
+            value = self.get(section, key)
+            if isinstance(value, str):
+                self._typed[cache_key] = value.lower() in ['true', '1', 'yes']
+            else:
+                self._typed[cache_key] = bool(value)
+        return self._typed[cache_key]
 
-    def get_list(self, section, key):
-        """获取列表类型配置项"""
-        value = self.get(section, key)
+    def _parse_list(self, section, key, value):
+        """用ast.literal_eval解析列表配置项并缓存（解析失败时使用默认值）"""
         try:
-            return eval(value)
-        except:
-            return self.DEFAULT_CONFIG.get(section, {}).get(key)
+            parsed = ast.literal_eval(value) if isinstance(value, str) else value
+        except (ValueError, SyntaxError):
+            parsed = self.DEFAULT_CONFIG.get(section, {}).get(key)
+            if isinstance(parsed, str):
+                parsed = ast.literal_eval(parsed)
+        self._typed[('list', section, key)] = parsed
+        return parsed
+
+    def get_list(self, section, key):
+        """获取列表类型配置项（返回副本，调用方修改不影响缓存）"""
+        cache_key = ('list', section, key)
+        if cache_key in self._typed:
+            value = self._typed[cache_key]
+        else:
+            value = self._parse_list(section, key, self.get(section, key))
+        return list(value) if value is not None else None
 
     def get_section(self, section):
         """获取整个配置段"""
         try:
             return dict(self._config.items(section))
         except configparser.NoSectionError:
-            Logger.get_instance().warning(f"配置段不存在: {section}")
+            Logger.get_instance().warning("配置段不存在: %s", section)
             return self.DEFAULT_CONFIG.get(section, {})
 
     def set(self, section, key, value):
@@ -154,70 +212,99 @@ class Config:
         if not self._config.has_section(section):
             self._config.add_section(section)
         self._config.set(section, key, str(value))
+        self._materialize()
         # 保存到文件
         config_path = os.path.join(os.getcwd(), 'config.ini')
         with open(config_path, 'w', encoding='utf-8') as f:
             self._config.write(f)
 
-    @property
+    @cached_property
     def db_server(self):
         return self.get('DB', 'server')
 
-    @property
+    @cached_property
     def db_name(self):
         return self.get('DB', 'name')
 
-    @property
+    @cached_property
     def db_user(self):
         return self.get('DB', 'user')
 
-    @property
+    @cached_property
     def db_password(self):
         return self.get('DB', 'password')
 
-    @property
+    @cached_property
+    def db_pool_size(self):
+        return self.get_int('DB', 'pool_size')
+
+    @cached_property
     def server_host(self):
         return self.get('SERVER', 'host')
 
-    @property
+    @cached_property
     def server_port(self):
         return self.get_int('SERVER', 'port')
 
-    @property
+    @cached_property
     def board_size(self):
         return self.get_int('GAME', 'board_size')
 
-    @property
+    @cached_property
     def cell_size(self):
         return self.get_int('GAME', 'cell_size')
 
-    @property
+    @cached_property
     def ai_minimax_depth(self):
         return self.get_int('AI', 'minimax_depth')
 
-    @property
+    @cached_property
+    def ai_search_threads(self):
+        return self.get_int('AI', 'search_threads')
+
+    @cached_property
     def ai_mcts_iterations(self):
         return self.get_int('AI', 'mcts_iterations')
 
-    @property
+    @cached_property
+    def ai_nn_compile(self):
+        return self.get_bool('AI', 'nn_compile')
+
+    @cached_property
+    def ai_inference_quantized(self):
+        return self.get_bool('AI', 'inference_quantized')
+
+    @cached_property
     def ai_learning_rate(self):
         return self.get_float('AI', 'learning_rate')
 
-    @property
+    @cached_property
     def ai_batch_size(self):
         return self.get_int('AI', 'batch_size')
 
-    @property
+    @cached_property
     def ai_max_epochs(self):
         return self.get_int('AI', 'max_epochs')
 
-    @property
+    @cached_property
+    def ai_model_cache_mb(self):
+        return self.get_int('AI', 'model_cache_mb')
+
+    @cached_property
+    def ai_infer_batch_size(self):
+        return self.get_int('AI', 'infer_batch_size')
+
+    @cached_property
+    def ai_infer_batch_wait_ms(self):
+        return self.get_float('AI', 'infer_batch_wait_ms')
+
+    @cached_property
     def show_thinking_visual(self):
         return self.get_bool('VISUAL', 'show_thinking')
 
     @staticmethod
     def get_instance():
-        """获取单例实例"""
-        if Config._instance is None:
-            Config._instance = Config()
-        return Config._instance
\ No newline at end of file
+        """获取单例实例（创建后把get_instance替换为直接返回该实例的函数，之后的调用不再判断是否已创建）"""
+        instance = Config()
+        Config.get_instance = staticmethod(lambda: instance)
+        return instance
\ No newline at end of file
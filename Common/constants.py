@@ -38,6 +38,15 @@ PIECE_COLORS = {
     'EMPTY': 0
 }
 
+# 对手颜色查找表（避免热路径上重复的条件判断）
+OPPONENT_COLORS = {
+    PIECE_COLORS['BLACK']: PIECE_COLORS['WHITE'],
+    PIECE_COLORS['WHITE']: PIECE_COLORS['BLACK']
+}
+
+# 五连检测方向（纵向、横向、正对角线、反对角线）
+WIN_DIRECTIONS = ((1, 0), (0, 1), (1, 1), (1, -1))
+
 # 颜色值（RGB）
 COLORS = {
     'BLACK': (0, 0, 0),
@@ -102,6 +111,13 @@ EVAL_WEIGHTS = {
     'ONE': 1                 # 活一
 }
 
+# 置换表条目类型（Alpha-Beta搜索得到的值是精确值、下界还是上界）
+TT_FLAGS = {
+    'EXACT': 0,              # 精确值
+    'LOWER': 1,              # 下界（发生Beta剪枝，真实值>=缓存值）
+    'UPPER': 2               # 上界（未超过Alpha，真实值<=缓存值）
+}
+
 # 网络消息类型
 MSG_TYPES = {
     'LOGIN': 'login',
@@ -1,44 +1,127 @@
+import io
 import json
 import pickle
 import os
+import random
+import threading
+from functools import lru_cache
+from concurrent.futures import ThreadPoolExecutor
 import numpy as np
 import torch
+try:
+    import orjson
+    ORJSON_AVAILABLE = True
+except ImportError:
+    ORJSON_AVAILABLE = False  # orjson为可选依赖，缺失时使用标准库json
 from datetime import datetime
 from Common.constants import PIECE_COLORS, GAME_MODES, AI_LEVELS
 from Common.error_handler import DataError
 
+_EMPTY = PIECE_COLORS['EMPTY']
+
+_tensor_buffers = threading.local()  # 每个线程复用的棋盘输入张量缓冲区 {棋盘尺寸: Tensor}
+_WRITE_CHUNK_SIZE = 64 << 20  # 聚合写入时每次write系统调用的字节数
+_NPY_MAGIC = b'\x93NUMPY'  # .npy文件头（区分列式训练数据与旧版pickle训练数据）
+
+# normalize_board的查找表：格子值 -> 标准化后的值（棋子颜色以外的值保持不变）
+_NORMALIZE_LUT = np.arange(256, dtype=np.float32)
+_NORMALIZE_LUT[PIECE_COLORS['BLACK']] = 1.0
+_NORMALIZE_LUT[PIECE_COLORS['WHITE']] = -1.0
+_NORMALIZE_LUT[PIECE_COLORS['EMPTY']] = 0.0
+_NORMALIZE_LUT.setflags(write=False)
+
+def _write_buffer(path, buffer):
+    """把内存中已序列化好的完整内容按大块写入文件（避免序列化过程中的大量小块写入）"""
+    view = memoryview(buffer)
+    fd = os.open(path, os.O_WRONLY | os.O_CREAT | os.O_TRUNC | getattr(os, 'O_BINARY', 0), 0o644)
+    try:
+        offset = 0
+        while offset < len(view):
+            offset += os.write(fd, view[offset:offset + _WRITE_CHUNK_SIZE])
+    finally:
+        os.close(fd)
+
+_MKDIR_DONE = set()  # 本进程内已确认存在的目录（之后保存到同一目录时不再做任何系统调用）
+
+def _ensure_dir(dir_path):
+    """确保目录存在（一次mkdir系统调用，已存在时由exist_ok处理；确认过的目录记录下来不再重复检查）"""
+    if dir_path and dir_path not in _MKDIR_DONE:
+        os.makedirs(dir_path, exist_ok=True)
+        _MKDIR_DONE.add(dir_path)
+
+def _json_default(obj):
+    """标准库json的兜底序列化：NumPy标量/数组转换为Python数值/列表（与orjson的OPT_SERIALIZE_NUMPY一致），其他类型按字符串保存"""
+    if isinstance(obj, np.generic):
+        return obj.item()
+    if isinstance(obj, np.ndarray):
+        return obj.tolist()
+    return str(obj)
+
+@lru_cache(maxsize=None)
+def _index_tables(board_size):
+    """构建指定棋盘尺寸的坐标/索引查找表（索引->坐标 形状为(N*N, 2)，坐标->索引 形状为(N, N)）"""
+    xy2idx = np.arange(board_size * board_size, dtype=np.int64).reshape(board_size, board_size)
+    idx2xy = np.stack(np.divmod(np.arange(board_size * board_size, dtype=np.int64), board_size), axis=1)
+    xy2idx.setflags(write=False)
+    idx2xy.setflags(write=False)
+    return idx2xy, xy2idx
+
 class DataUtils:
     """数据处理工具类"""
 
     @staticmethod
-    def board_to_tensor(board, player=PIECE_COLORS['BLACK']):
-        """将棋盘转换为Tensor（用于AI输入）"""
-        board_size = len(board)
+    def board_to_tensor(board, player=PIECE_COLORS['BLACK'], reuse_buffer=False):
+        """将棋盘转换为Tensor（用于AI输入，三个通道由整盘向量化比较得到；取值只有0/1，使用int8存储，由模型转换为浮点）
+        Args:
+            reuse_buffer: 是否写入当前线程复用的缓冲区（不分配新张量；返回值在下次调用时被覆盖，需要保留时请clone）
+        """
+        arr = board if isinstance(board, np.ndarray) else np.asarray(board, dtype=np.int8)
         # 创建3通道输入：当前玩家、对手、空位置
-        input_tensor = torch.zeros(3, board_size, board_size, dtype=torch.float32)
-        for i in range(board_size):
-            for j in range(board_size):
-                if board[i][j] == player:
-                    input_tensor[0][i][j] = 1.0
-                elif board[i][j] != PIECE_COLORS['EMPTY']:
-                    input_tensor[1][i][j] = 1.0
-                else:
-                    input_tensor[2][i][j] = 1.0
-        return input_tensor.unsqueeze(0)  # 添加batch维度
+        empty = arr == _EMPTY
+        own = arr == player
+        if not reuse_buffer:
+            channels = np.stack([own, ~own & ~empty, empty]).astype(np.int8)
+            return torch.from_numpy(channels).unsqueeze_(0)  # 添加batch维度
+        
+        buffers = _tensor_buffers.__dict__
+        tensor = buffers.get(arr.shape[0])
+        if tensor is None:
+            tensor = buffers[arr.shape[0]] = torch.empty(1, 3, arr.shape[0], arr.shape[1], dtype=torch.int8)
+        channels = tensor.numpy()[0]
+        np.copyto(channels[0], own)
+        np.copyto(channels[1], ~(own | empty))
+        np.copyto(channels[2], empty)
+        return tensor
+
+    @staticmethod
+    def board_batch_to_tensor(boards, player=PIECE_COLORS['BLACK'], out=None):
+        """将一批棋盘一次性转换为(B,3,N,N)的int8 Tensor（通道含义与board_to_tensor相同）
+        Args:
+            boards: 棋盘列表或形状为(B,N,N)的数组
+            out: 可复用的输出张量（形状匹配时直接写入，避免每批重新分配；调用方可跨批次传入上次的返回值）
+        Returns:
+            输出张量（CUDA可用时分配在锁页内存上，可整批一次异步拷贝到GPU）
+        """
+        arr = boards if isinstance(boards, np.ndarray) else np.stack([np.asarray(board, dtype=np.int8) for board in boards])
+        shape = (arr.shape[0], 3) + arr.shape[1:]
+        if out is None or tuple(out.shape) != shape:
+            out = torch.empty(shape, dtype=torch.int8, pin_memory=torch.cuda.is_available())
+        channels = out.numpy()
+        empty = arr == _EMPTY
+        own = arr == player
+        np.copyto(channels[:, 0], own)
+        np.copyto(channels[:, 1], ~(own | empty))
+        np.copyto(channels[:, 2], empty)
+        return out
 
     @staticmethod
     def tensor_to_board(tensor):
         """将Tensor转换为棋盘"""
         tensor = tensor.squeeze(0)  # 去除batch维度
-        board_size = tensor.shape[1]
-        board = [[PIECE_COLORS['EMPTY'] for _ in range(board_size)] for _ in range(board_size)]
-        for i in range(board_size):
-            for j in range(board_size):
-                if tensor[0][i][j] == 1.0:
-                    board[i][j] = PIECE_COLORS['BLACK']
-                elif tensor[1][i][j] == 1.0:
-                    board[i][j] = PIECE_COLORS['WHITE']
-        return board
+        black = (tensor[0] == 1.0).cpu().numpy()
+        white = (tensor[1] == 1.0).cpu().numpy()
+        board = np.where(black, PIECE_COLORS['BLACK'], np.where(white, PIECE_COLORS['WHITE'], _EMPTY))
+        return board.tolist()
 
     @staticmethod
     def move_to_index(x, y, board_size=15):
@@ -52,6 +135,16 @@ class DataUtils:
         y = index % board_size
         return (x, y)
 
+    @staticmethod
+    def moves_to_indices(xs, ys, board_size=15):
+        """批量将落子坐标转换为索引（查表，一次花式索引完成）"""
+        return _index_tables(board_size)[1][xs, ys]
+
+    @staticmethod
+    def indices_to_moves(indices, board_size=15):
+        """批量将索引转换为落子坐标（返回形状为(..., 2)的数组）"""
+        return _index_tables(board_size)[0][indices]
+
     @staticmethod
     def save_model(model, path, metadata=None):
         """保存模型（包含权重和元数据）"""
@@ -61,7 +154,10 @@ class DataUtils:
                 'metadata': metadata or {},
                 'timestamp': datetime.now().strftime('%Y-%m-%d %H:%M:%S')
             }
-            torch.save(save_data, path)
+            # 先完整序列化到内存，再聚合写入文件
+            buffer = io.BytesIO()
+            torch.save(save_data, buffer)
+            _write_buffer(path, buffer.getbuffer())
             return True
         except Exception as e:
             raise ModelError(f"模型保存失败: {str(e)}", 7001)
@@ -82,52 +178,155 @@ class DataUtils:
         except Exception as e:
             raise ModelError(f"模型加载失败: {str(e)}", 7003)
 
+    @staticmethod
+    def training_data_to_array(data_list):
+        """把(棋盘状态, 最佳落子)样本列表转换为列式结构化数组
+        棋盘状态可以是二维列表、数组或棋盘字符串
+        Returns:
+            形状为(N,)的结构化数组，字段board为(B,B)的int8棋盘，move为(2,)的int16落子坐标
+        """
+        boards, moves = zip(*data_list)
+        if isinstance(boards[0], str):
+            boards_np = np.stack([DataUtils.str_to_np(board) for board in boards])
+        else:
+            boards_np = np.asarray(boards, dtype=np.int8)
+        moves_np = np.asarray(moves, dtype=np.int16).reshape(-1, 2)
+        if boards_np.ndim != 3 or boards_np.shape[1] != boards_np.shape[2] or len(moves_np) != len(boards_np):
+            raise DataError(f"训练数据形状无效: {boards_np.shape}", 8009)
+        dtype = np.dtype([('board', np.int8, boards_np.shape[1:]), ('move', np.int16, (2,))])
+        samples = np.empty(len(boards_np), dtype=dtype)
+        samples['board'] = boards_np
+        samples['move'] = moves_np
+        return samples
+
+    @staticmethod
+    def training_data_from_array(samples):
+        """把列式结构化数组转换回(棋盘状态, 最佳落子)样本列表（棋盘为二维列表，落子为坐标元组）"""
+        return [(board, (x, y)) for board, (x, y) in zip(samples['board'].tolist(), samples['move'].tolist())]
+
     @staticmethod
     def save_training_data(data_list, path):
-        """保存训练数据"""
+        """保存训练数据
+        (棋盘状态, 最佳落子)样本以列式结构化数组保存为.npy（加载时可直接内存映射，无需反序列化）；
+        无法转换为数组的其他数据仍以pickle保存
+        """
         try:
             # 确保目录存在
-            dir_path = os.path.dirname(path)
-            if not os.path.exists(dir_path):
-                os.makedirs(dir_path)
-            # 保存为pkl格式（高效）
-            with open(path, 'wb') as f:
-                pickle.dump(data_list, f)
+            _ensure_dir(os.path.dirname(path))
+            if not (isinstance(data_list, np.ndarray) and data_list.dtype.names):
+                try:
+                    data_list = DataUtils.training_data_to_array(data_list)
+                except (TypeError, ValueError, DataError):
+                    # 非(棋盘, 落子)格式的数据，保存为pkl格式（序列化后一次性聚合写入）
+                    _write_buffer(path, pickle.dumps(data_list, protocol=pickle.HIGHEST_PROTOCOL))
+                    return True
+            buffer = io.BytesIO()
+            np.save(buffer, data_list, allow_pickle=False)
+            _write_buffer(path, buffer.getbuffer())
             return True
         except Exception as e:
             raise DataError(f"训练数据保存失败: {str(e)}", 8001)
 
+    @staticmethod
+    def _is_npy_file(path):
+        """判断文件是否为.npy格式（按文件头判断，兼容旧版pickle训练数据）"""
+        with open(path, 'rb') as f:
+            return f.read(len(_NPY_MAGIC)) == _NPY_MAGIC
+
     @staticmethod
     def load_training_data(path):
-        """加载训练数据"""
+        """加载训练数据
+        Returns:
+            训练数据列表（列式.npy文件转换为(棋盘状态, 最佳落子)样本列表，旧版pickle训练数据返回原对象）
+        """
         try:
             if not os.path.exists(path):
                 raise DataError(f"训练数据文件不存在: {path}", 8002)
+            if DataUtils._is_npy_file(path):
+                return DataUtils.training_data_from_array(np.load(path, mmap_mode='r', allow_pickle=False))
             with open(path, 'rb') as f:
                 data_list = pickle.load(f)
             return data_list
         except Exception as e:
             raise DataError(f"训练数据加载失败: {str(e)}", 8003)
 
+    @staticmethod
+    def load_training_array(path, mmap=True):
+        """以列式结构化数组加载训练数据（可直接传给NNAI.train_model，不经过逐样本的Python对象）
+        Args:
+            mmap: 是否以只读内存映射方式加载（零拷贝，按需换页）
+        Returns:
+            结构化数组（字段board/move）；旧版pickle训练数据加载后转换为结构化数组
+        """
+        try:
+            if not os.path.exists(path):
+                raise DataError(f"训练数据文件不存在: {path}", 8002)
+            if DataUtils._is_npy_file(path):
+                return np.load(path, mmap_mode='r' if mmap else None, allow_pickle=False)
+            with open(path, 'rb') as f:
+                return DataUtils.training_data_to_array(pickle.load(f))
+        except Exception as e:
+            raise DataError(f"训练数据加载失败: {str(e)}", 8003)
+
+    @staticmethod
+    def batch_load_training_data(paths, max_workers=8):
+        """批量加载多个训练数据文件
+        列式训练数据内存映射后转换为样本列表；旧版pickle文件先提示预读（内核合并调度磁盘读取），
+        再由线程池并行读取文件内容（读取时释放GIL），最后在当前线程中依次反序列化
+        Returns:
+            与paths顺序对应的训练数据列表（每个元素与load_training_data的返回值相同）
+        """
+        for path in paths:
+            if not os.path.exists(path):
+                raise DataError(f"训练数据文件不存在: {path}", 8002)
+        try:
+            results = {path: DataUtils.training_data_from_array(np.load(path, mmap_mode='r', allow_pickle=False))
+                       for path in paths if DataUtils._is_npy_file(path)}
+            pickle_paths = [path for path in paths if path not in results]
+            if hasattr(os, 'posix_fadvise'):
+                for path in pickle_paths:
+                    fd = os.open(path, os.O_RDONLY)
+                    try:
+                        os.posix_fadvise(fd, 0, 0, os.POSIX_FADV_WILLNEED)
+                    finally:
+                        os.close(fd)
+            
+            def read_file(path):
+                with open(path, 'rb') as f:
+                    return f.read()
+            
+            if pickle_paths:
+                with ThreadPoolExecutor(max_workers=max(1, min(max_workers, len(pickle_paths)))) as executor:
+                    for path, data in zip(pickle_paths, executor.map(read_file, pickle_paths)):
+                        results[path] = pickle.loads(data)
+            return [results[path] for path in paths]
+        except Exception as e:
+            raise DataError(f"训练数据加载失败: {str(e)}", 8003)
+
     @staticmethod
     def save_json(data, path):
-        """保存JSON数据"""
+        """保存JSON数据（orjson可用时使用C实现序列化；日期、Decimal等类型按字符串保存）"""
         try:
-            dir_path = os.path.dirname(path)
-            if not os.path.exists(dir_path):
-                os.makedirs(dir_path)
-            with open(path, 'w', encoding='utf-8') as f:
-                json.dump(data, f, ensure_ascii=False, indent=2)
+            _ensure_dir(os.path.dirname(path))
+            if ORJSON_AVAILABLE:
+                with open(path, 'wb') as f:
+                    f.write(orjson.dumps(data, default=str, option=orjson.OPT_INDENT_2 | orjson.OPT_SERIALIZE_NUMPY))
+            else:
+                with open(path, 'w', encoding='utf-8') as f:
+                    json.dump(data, f, ensure_ascii=False, indent=2, default=_json_default)
             return True
         except Exception as e:
             raise DataError(f"JSON数据保存失败: {str(e)}", 8004)
 
     @staticmethod
     def load_json(path):
-        """加载JSON数据"""
+        """加载JSON数据（orjson可用时使用C实现解析）"""
         try:
             if not os.path.exists(path):
                 raise DataError(f"JSON文件不存在: {path}", 8005)
+            if ORJSON_AVAILABLE:
+                with open(path, 'rb') as f:
+                    return orjson.loads(f.read())
             with open(path, 'r', encoding='utf-8') as f:
                 data = json.load(f)
             return data
@@ -136,42 +335,58 @@ class DataUtils:
 
     @staticmethod
     def normalize_board(board):
-        """标准化棋盘数据（0-1）"""
-        board_np = np.array(board, dtype=np.float32)
-        board_np[board_np == PIECE_COLORS['BLACK']] = 1.0
-        board_np[board_np == PIECE_COLORS['WHITE']] = -1.0
-        board_np[board_np == PIECE_COLORS['EMPTY']] = 0.0
-        return board_np
+        """标准化棋盘数据（0-1，黑子为1、白子为-1、空为0，通过查找表一次取值得到）"""
+        return _NORMALIZE_LUT[np.asarray(board, dtype=np.uint8)]
+
+    @staticmethod
+    def str_to_np(board_str):
+        """将棋盘字符串直接解析为(B,B)的int8数组（按字节缓冲区解析，不经过嵌套列表）
+        每个格子为一位数字，忽略数字之间的分隔符
+        """
+        chars = np.frombuffer(board_str.encode('ascii'), dtype=np.uint8)
+        digits = chars[(chars >= ord('0')) & (chars <= ord('9'))]
+        board_size = int(np.sqrt(digits.size))
+        if board_size * board_size != digits.size:
+            raise DataError(f"棋盘字符串长度无效: {digits.size}", 8008)
+        return (digits - ord('0')).astype(np.int8).reshape(board_size, board_size)
 
     @staticmethod
     def generate_move_history_str(move_history):
-        """生成落子历史字符串（格式：x1,y1;x2,y2;...）"""
-        return ';'.join([f"{x},{y}" for x, y in move_history])
+        """生成落子历史字符串（每步x、y各占一个字节，整体编码为十六进制字符串）"""
+        return np.asarray(move_history, dtype=np.uint8).tobytes().hex()
 
     @staticmethod
     def parse_move_history_str(history_str):
-        """解析落子历史字符串"""
+        """解析落子历史字符串（兼容旧格式：x1,y1;x2,y2;...）"""
         if not history_str or history_str == '[]':
             return []
-        moves = history_str.split(';')
-        return [(int(x), int(y)) for x, y in [move.split(',') for move in moves if move]]
+        if ',' in history_str:
+            moves = history_str.split(';')
+            return [(int(x), int(y)) for x, y in [move.split(',') for move in moves if move]]
+        moves = np.frombuffer(bytes.fromhex(history_str), dtype=np.uint8).reshape(-1, 2)
+        return list(zip(*moves.T.tolist()))
 
     @staticmethod
     def calculate_model_accuracy(predictions, labels):
-        """计算模型准确率"""
+        """计算模型准确率（预测和标签可以是批量Tensor或Tensor列表，整批一次argmax比较）"""
         if len(predictions) != len(labels):
             raise DataError("预测结果与标签长度不匹配", 8007)
-        correct = 0
-        for pred, label in zip(predictions, labels):
-            if torch.argmax(pred) == torch.argmax(label):
-                correct += 1
-        return correct / len(predictions) if len(predictions) > 0 else 0.0
+        if len(predictions) == 0:
+            return 0.0
+        if not torch.is_tensor(predictions):
+            predictions = torch.stack(list(predictions))
+        if not torch.is_tensor(labels):
+            labels = torch.stack(list(labels))
+        # 每个样本展平后取最大值位置（与逐个样本torch.argmax的语义一致）
+        pred_idx = predictions.reshape(len(predictions), -1).argmax(dim=1)
+        label_idx = labels.reshape(len(labels), -1).argmax(dim=1).to(pred_idx.device)
+        return (pred_idx == label_idx).float().mean().item()
 
     @staticmethod
     def generate_unique_id(prefix=''):
         """生成唯一ID"""
         timestamp = datetime.now().strftime('%Y%m%d%H%M%S%f')
-        random_str = ''.join([str(np.random.randint(0, 10)) for _ in range(6)])
+        random_str = f"{random.randrange(1_000_000):06d}"  # 6位随机数字，一次取值
         return f"{prefix}_{timestamp}_{random_str}"
 
     @staticmethod
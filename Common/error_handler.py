@@ -50,11 +50,11 @@ class ErrorHandler:
 
         # 记录错误日志
         if isinstance(e, BaseError):
-            logger.error(f"自定义异常: {e}")
+            logger.error("自定义异常: %s", e)
             if isinstance(e, (AIError, ModelError)):
                 logger.exception(e.message)
         else:
-            logger.exception(f"系统异常: {str(e)}")
+            logger.exception("系统异常: %s", e)
 
         # 返回错误信息
         error_info = {
@@ -0,0 +1,13 @@
+"""JIT编译工具（numba为可选依赖，缺失时退化为纯Python执行）"""
+
+try:
+    from numba import njit
+    NUMBA_AVAILABLE = True
+except ImportError:
+    NUMBA_AVAILABLE = False
+
+    def njit(*args, **kwargs):
+        """numba.njit的占位实现（直接返回原函数）"""
+        if len(args) == 1 and callable(args[0]) and not kwargs:
+            return args[0]
+        return lambda func: func
@@ -3,6 +3,10 @@ import os
 from logging.handlers import RotatingFileHandler
 from Common.config import Config
 
+def _skip_find_caller(*args, **kwargs):
+    """跳过调用栈回溯（日志均经由本模块的包装方法输出，回溯得到的位置总是包装方法本身，没有实际意义）"""
+    return '(unknown file)', 0, '(unknown function)', None
+
 class Logger:
     _instance = None
     _logger = None
@@ -22,6 +26,8 @@ class Logger:
         # 创建日志器
         self._logger = logging.getLogger('GobangAI')
         self._logger.setLevel(logging.DEBUG)
+        # 只对本日志器关闭findCaller，不修改logging模块的全局设置（避免影响其他库的日志）
+        self._logger.findCaller = _skip_find_caller
 
         # 避免重复添加处理器
         if self._logger.handlers:
@@ -45,7 +51,7 @@ class Logger:
         )
         file_handler.setLevel(logging.DEBUG)
         file_formatter = logging.Formatter(
-            '%(asctime)s - %(name)s - %(levelname)s - %(module)s:%(funcName)s:%(lineno)d - %(message)s',
+            '%(asctime)s - %(name)s - %(levelname)s - %(message)s',
             datefmt='%Y-%m-%d %H:%M:%S'
         )
         file_handler.setFormatter(file_formatter)
@@ -54,33 +60,33 @@ class Logger:
         self._logger.addHandler(console_handler)
         self._logger.addHandler(file_handler)
 
-    def debug(self, message):
-        """调试日志"""
-        self._logger.debug(message)
+    def debug(self, message, *args):
+        """调试日志（message可使用%占位符，参数通过args传入，日志级别被过滤时不做格式化）"""
+        self._logger.debug(message, *args)
 
-    def info(self, message):
+    def info(self, message, *args):
         """信息日志"""
-        self._logger.info(message)
+        self._logger.info(message, *args)
 
-    def warning(self, message):
+    def warning(self, message, *args):
         """警告日志"""
-        self._logger.warning(message)
+        self._logger.warning(message, *args)
 
-    def error(self, message):
+    def error(self, message, *args):
         """错误日志"""
-        self._logger.error(message)
+        self._logger.error(message, *args)
 
-    def critical(self, message):
+    def critical(self, message, *args):
         """严重错误日志"""
-        self._logger.critical(message)
+        self._logger.critical(message, *args)
 
-    def exception(self, message):
+    def exception(self, message, *args):
         """异常日志（包含堆栈信息）"""
-        self._logger.exception(message)
+        self._logger.exception(message, *args)
 
     @staticmethod
     def get_instance():
-        """获取单例实例"""
-        if Logger._instance is None:
-            Logger._instance = Logger()
-        return Logger._instance
\ No newline at end of file
+        """获取单例实例（创建后把get_instance替换为直接返回该实例的函数，之后的调用不再判断是否已创建）"""
+        instance = Logger()
+        Logger.get_instance = staticmethod(lambda: instance)
+        return instance
\ No newline at end of file
@@ -1,14 +1,24 @@
 import pyodbc
 import json
 import os
+import re
+import queue
+from contextlib import contextmanager
+import numpy as np
 from Common.config import Config
 from Common.logger import Logger
 from Common.error_handler import DatabaseError
 
+# 启用ODBC驱动管理器级别的连接池（必须在建立任何连接之前设置）
+pyodbc.pooling = True
+
+_STMT_CACHE_SIZE = 64  # 每个连接缓存的已准备语句（游标）数量上限
+_GO_SEPARATOR = re.compile(r'^\s*GO\s*$', re.MULTILINE | re.IGNORECASE)  # SQL脚本的批次分隔行
+
 class DatabaseConnection:
     _instance = None
-    _conn = None
-    _cursor = None
+    _pool = None  # 空闲连接队列，元素为(连接, 语句缓存{SQL: 游标})
+    _connections = None  # 连接池中的全部连接（用于关闭）
 
     def __new__(cls):
         if cls._instance is None:
@@ -17,10 +27,11 @@ class DatabaseConnection:
         return cls._instance
 
     def _init_conn(self):
-        """初始化数据库连接"""
+        """初始化数据库连接池（预先建立db_pool_size个连接，并发请求各自占用一个连接）"""
         try:
             config = Config.get_instance()
-            self._conn = pyodbc.connect(
+            pool_size = max(1, config.db_pool_size)
+            conn_str = (
                 f"DRIVER={{ODBC Driver 18 for SQL Server}};"
                 f"SERVER={config.db_server};"
                 f"DATABASE={config.db_name};"
@@ -30,59 +41,105 @@ class DatabaseConnection:
                 f"TrustServerCertificate=yes;"
                 f"Connection Timeout=30;"
             )
-            self._cursor = self._conn.cursor()
-            Logger.get_instance().info("数据库连接成功")
+            self._pool = queue.Queue(maxsize=pool_size)
+            self._connections = []
+            for _ in range(pool_size):
+                conn = pyodbc.connect(conn_str)
+                self._connections.append(conn)
+                self._pool.put((conn, {}))
+            Logger.get_instance().info("数据库连接成功（连接池大小: %d）", pool_size)
         except Exception as e:
-            Logger.get_instance().error(f"数据库连接失败: {str(e)}")
+            Logger.get_instance().error("数据库连接失败: %s", e)
             raise DatabaseError(f"数据库连接失败: {str(e)}")
 
+    @contextmanager
+    def _acquire(self, sql):
+        """从连接池取出一个连接（池空时阻塞等待）及该SQL对应的游标，用完后归还
+        pyodbc只在游标上一次执行的SQL文本不同时才重新prepare，因此同一SQL固定使用同一个游标，
+        重复执行（如落子记录、心跳）可直接复用已准备的语句
+        """
+        conn, stmt_cache = self._pool.get()
+        try:
+            cursor = stmt_cache.get(sql)
+            if cursor is None:
+                if len(stmt_cache) >= _STMT_CACHE_SIZE:
+                    # 淘汰最早缓存的语句
+                    stmt_cache.pop(next(iter(stmt_cache))).close()
+                cursor = stmt_cache[sql] = conn.cursor()
+                # executemany以参数数组一次性提交，而不是逐行prepare+execute
+                cursor.fast_executemany = True
+            yield conn, cursor
+        finally:
+            self._pool.put((conn, stmt_cache))
+
+    @staticmethod
+    def _to_params(params):
+        """列表参数转为元组（pyodbc对元组参数不再做序列转换），其他参数原样传入"""
+        return tuple(params) if isinstance(params, list) else params
+
     def execute_query(self, sql, params=None):
         """执行查询语句"""
         try:
-            if params:
-                self._cursor.execute(sql, params)
-            else:
-                self._cursor.execute(sql)
-            columns = [column[0] for column in self._cursor.description]
-            results = []
-            for row in self._cursor.fetchall():
-                results.append(dict(zip(columns, row)))
-            return results
+            with self._acquire(sql) as (conn, cursor):
+                if params:
+                    cursor.execute(sql, self._to_params(params))
+                else:
+                    cursor.execute(sql)
+                columns = [column[0] for column in cursor.description]
+                return [dict(zip(columns, row)) for row in cursor.fetchall()]
         except Exception as e:
-            Logger.get_instance().error(f"查询执行失败: {str(e)} | SQL: {sql} | Params: {params}")
+            Logger.get_instance().error("查询执行失败: %s | SQL: %s | Params: %s", e, sql, params)
             raise DatabaseError(f"查询执行失败: {str(e)}")
 
     def execute_non_query(self, sql, params=None):
         """执行非查询语句（INSERT/UPDATE/DELETE）"""
-        try:
-            if params:
-                self._cursor.execute(sql, params)
-            else:
-                self._cursor.execute(sql)
-            self._conn.commit()
-            return self._cursor.rowcount
-        except Exception as e:
-            self._conn.rollback()
-            Logger.get_instance().error(f"非查询执行失败: {str(e)} | SQL: {sql} | Params: {params}")
-            raise DatabaseError(f"非查询执行失败: {str(e)}")
+        with self._acquire(sql) as (conn, cursor):
+            try:
+                if params:
+                    cursor.execute(sql, self._to_params(params))
+                else:
+                    cursor.execute(sql)
+                conn.commit()
+                return cursor.rowcount
+            except Exception as e:
+                conn.rollback()
+                Logger.get_instance().error("非查询执行失败: %s | SQL: %s | Params: %s", e, sql, params)
+                raise DatabaseError(f"非查询执行失败: {str(e)}")
 
     def execute_batch(self, sql, params_list):
-        """批量执行语句"""
+        """批量执行语句（游标已开启fast_executemany，整批参数一次往返提交）"""
+        with self._acquire(sql) as (conn, cursor):
+            try:
+                cursor.executemany(sql, params_list)
+                conn.commit()
+                return cursor.rowcount
+            except Exception as e:
+                conn.rollback()
+                Logger.get_instance().error("批量执行失败: %s | SQL: %s", e, sql)
+                raise DatabaseError(f"批量执行失败: {str(e)}")
+
+    def execute_script(self, commands):
+        """在同一个事务中依次执行多条语句，全部成功后只提交一次（任一失败则整体回滚）"""
+        conn, stmt_cache = self._pool.get()
+        cursor = conn.cursor()
         try:
-            self._cursor.executemany(sql, params_list)
-            self._conn.commit()
-            return self._cursor.rowcount
+            for cmd in commands:
+                cursor.execute(cmd)
+            conn.commit()
         except Exception as e:
-            self._conn.rollback()
-            Logger.get_instance().error(f"批量执行失败: {str(e)} | SQL: {sql}")
-            raise DatabaseError(f"批量执行失败: {str(e)}")
+            conn.rollback()
+            Logger.get_instance().error("脚本执行失败: %s", e)
+            raise DatabaseError(f"脚本执行失败: {str(e)}")
+        finally:
+            cursor.close()
+            self._pool.put((conn, stmt_cache))
 
     def close(self):
-        """关闭连接"""
-        if self._cursor:
-            self._cursor.close()
-        if self._conn:
-            self._conn.close()
+        """关闭连接池中的全部连接"""
+        if self._connections:
+            for conn in self._connections:
+                conn.close()
+            self._connections = None
             Logger.get_instance().info("数据库连接已关闭")
 
     def __del__(self):
@@ -105,15 +162,23 @@ class DataConverter:
 
     @staticmethod
     def board_to_str(board):
-        """将棋盘状态（二维列表）转换为字符串"""
-        return ';'.join(['|'.join(map(str, row)) for row in board])
+        """将棋盘状态（二维列表）转换为字符串（格式为"行内'|'分隔、行间';'分隔"，整盘向量化拼接）"""
+        arr = np.asarray(board, dtype=np.uint8)
+        # 每个格子占两个字节：数字字符 + 分隔符（行内为'|'，行末为';'）
+        chars = np.empty((arr.shape[0], arr.shape[1] * 2), dtype=np.uint8)
+        chars[:, 0::2] = arr + ord('0')
+        chars[:, 1::2] = ord('|')
+        chars[:, -1] = ord(';')
+        return chars.tobytes()[:-1].decode('ascii')
 
     @staticmethod
     def str_to_board(board_str):
-        """将字符串转换为棋盘状态（二维列表）"""
+        """将字符串转换为棋盘状态（二维列表，按字节缓冲区解析，每个格子为一位数字）"""
         if not board_str or board_str == 'NULL':
             return None
-        return [[int(cell) for cell in row.split('|')] for row in board_str.split(';')]
+        rows = board_str.count(';') + 1
+        cells = np.frombuffer(board_str.encode('ascii'), dtype=np.uint8)[0::2] - ord('0')
+        return cells.reshape(rows, -1).astype(int).tolist()
 
 # 数据库初始化工具
 class DBInitializer:
@@ -125,17 +190,13 @@ class DBInitializer:
             sql_path = os.path.join(os.path.dirname(__file__), 'sql', 'create_tables.sql')
             with open(sql_path, 'r', encoding='utf-8') as f:
                 sql_script = f.read()
-            # 执行建表脚本（按GO分割）
-            sql_commands = sql_script.split('GO')
-            for cmd in sql_commands:
-                cmd = cmd.strip()
-                if cmd:
-                    db_conn.execute_non_query(cmd)
+            # 执行建表脚本（按单独成行的GO分割批次，在一个事务中执行并只提交一次）
+            db_conn.execute_script(cmd for cmd in _GO_SEPARATOR.split(sql_script) if cmd.strip())
             Logger.get_instance().info("数据库初始化成功")
             # 插入默认模型
             DBInitializer._insert_default_models()
         except Exception as e:
-            Logger.get_instance().error(f"数据库初始化失败: {str(e)}")
+            Logger.get_instance().error("数据库初始化失败: %s", e)
             raise DatabaseError(f"数据库初始化失败: {str(e)}")
 
     @staticmethod
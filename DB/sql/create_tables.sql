@@ -74,5 +74,5 @@ CREATE TABLE [dbo].[Online_Rooms](
 -- 索引优化
 CREATE INDEX [IX_Games_User1Id] ON [dbo].[Games]([user1_id]);
 CREATE INDEX [IX_Games_GameMode] ON [dbo].[Games]([game_mode]);
-CREATE INDEX [IX_AI_Models_UserId] ON [dbo].[AI_Models]([user_id]);
+CREATE INDEX [IX_AI_Models_UserId_CreateTime] ON [dbo].[AI_Models]([user_id], [create_time] DESC);
 CREATE INDEX [IX_Online_Rooms_Status] ON [dbo].[Online_Rooms]([room_status]);
\ No newline at end of file
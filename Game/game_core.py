@@ -1,17 +1,26 @@
 import time
+import queue
+import threading
+from collections import OrderedDict
+import numpy as np
+from concurrent.futures import Future
 from typing import List, Tuple, Dict, Optional, Callable
-from Common.constants import PIECE_COLORS, GAME_MODES, AI_LEVELS, EVAL_WEIGHTS
+from Common.constants import PIECE_COLORS, GAME_MODES, AI_LEVELS, AI_TYPES, EVAL_WEIGHTS
 from Common.config import Config
 from Common.logger import Logger
 from Common.data_utils import DataUtils
 from Common.error_handler import GameError
-from AI.base_ai import BaseAI, AIFactory
+from AI.base_ai import BaseAI, AIFactory, Board, zobrist_table
 from AI.model_manager import ModelManager
-from AI.evaluator import BoardEvaluator
+from AI.evaluator import get_evaluator
 from DB.game_dao import GameDAO
 from DB.training_data_dao import TrainingDataDAO
 from Server.main_server import Server
 
+_ONLINE_OUTBOX_SIZE = 1000  # 待发送联机消息队列上限（满时发送方等待，限制未完成的发送数量）
+_ONLINE_POLL_INTERVAL = 0.5  # 联机发送线程检查停止信号的间隔（秒）
+_ANALYSIS_CACHE_SIZE = 256  # 局面分析报告缓存的最大条目数（超出时按LRU淘汰）
+
 class GameCore:
     """游戏核心管理器（统筹所有游戏逻辑）"""
     def __init__(self):
@@ -20,13 +29,21 @@ class GameCore:
         
         # 核心组件
         self.model_manager = ModelManager()
-        self.evaluator = BoardEvaluator(self.config.board_size)
+        self.evaluator = get_evaluator(self.config.board_size)
         self.game_dao = GameDAO()
         self.training_data_dao = TrainingDataDAO()
         
         # 游戏状态
         self.board_size = self.config.board_size
-        self.board = [[PIECE_COLORS['EMPTY'] for _ in range(self.board_size)] for _ in range(self.board_size)]
+        # 连续的uint8数组（与AI使用的棋盘类型一致，传给AI时不需要转换复制）
+        self.board: Board = np.full((self.board_size, self.board_size), PIECE_COLORS['EMPTY'], dtype=np.uint8)
+        # Zobrist哈希（键表与BaseAI相同，落子时异或更新），作为局面分析结果缓存的键
+        self._zobrist_keys = zobrist_table(self.board_size).tolist()
+        self._hash = 0  # 当前棋盘的Zobrist哈希
+        self._analysis_cache: 'OrderedDict[Tuple[int, int], Dict]' = OrderedDict()  # {(哈希, AI颜色): 分析报告}（LRU顺序）
+        # AI置换表{AI颜色: 置换表}：跨步、跨对局保留，重新创建AI时继续使用（得分相对于AI颜色，按颜色分开）
+        self.tt: Dict[int, np.ndarray] = {}
+        self._searchers: Dict[int, BaseAI] = {}  # search_best_move使用的Minimax搜索器{颜色: AI实例}
         self.move_history = []  # 落子历史：[(x,y,color,is_ai,timestamp), ...]
         self.game_active = False  # 游戏是否激活
         self.current_player = PIECE_COLORS['BLACK']  # 当前回合玩家（黑先）
@@ -43,6 +60,11 @@ class GameCore:
         self.server: Optional[Server] = None
         self.current_room_id = None
         self.online_callback: Optional[Callable[[Dict], None]] = None  # 联机回调
+        # 联机消息收发队列（网络发送在后台线程进行，不阻塞落子和AI搜索；收到的消息由主线程处理）
+        self._online_outbox: 'queue.Queue[Tuple[str, Dict]]' = queue.Queue(maxsize=_ONLINE_OUTBOX_SIZE)
+        self._online_inbox: 'queue.Queue[Dict]' = queue.Queue()
+        self._online_stop = threading.Event()  # 联机发送线程的停止信号
+        self._online_threads: List[threading.Thread] = []
         
         # 训练相关
         self.is_training = False
@@ -66,7 +88,7 @@ class GameCore:
         
         # 重置游戏状态
         self.reset_game()
-        self.logger.info(f"游戏模式已设置为: {mode}")
+        self.logger.info("游戏模式已设置为: %s", mode)
     
     def _init_ai(self):
         """初始化AI实例"""
@@ -76,14 +98,15 @@ class GameCore:
         
         # 创建AI实例
         ai_color = PIECE_COLORS['WHITE'] if self.ai_first else PIECE_COLORS['BLACK']
-        self.current_ai = AIFactory.create_ai(self.ai_type, ai_color, self.ai_level)
+        # 只有Minimax搜索使用置换表，其他类型的AI不分配
+        tt = self._get_tt(ai_color) if self.ai_type == AI_TYPES['MINIMAX'] else None
+        self.current_ai = AIFactory.create_ai(self.ai_type, ai_color, self.ai_level, tt=tt)
         
         # 如果是训练模式，加载用户的自定义模型（如果有）
         if self.current_mode == GAME_MODES['TRAIN'] and self.train_user_id:
-            user_models = self.model_manager.get_user_models(self.train_user_id)
-            if user_models:
-                # 加载最新的模型
-                latest_model = max(user_models, key=lambda m: m['create_time'])
+            # 加载最新的模型（由数据库排序后只取一行）
+            latest_model = self.model_manager.get_latest_user_model(self.train_user_id)
+            if latest_model:
                 self.load_ai_model(latest_model['model_id'], self.train_user_id)
     
     def _init_online(self):
@@ -91,9 +114,10 @@ class GameCore:
         try:
             # 连接服务器
             self.server = Server(self.config.server_host, self.config.server_port)
-            self.logger.info(f"已初始化联机模式，将连接服务器: {self.config.server_host}:{self.config.server_port}")
+            self._start_online_workers()
+            self.logger.info("已初始化联机模式，将连接服务器: %s:%s", self.config.server_host, self.config.server_port)
         except Exception as e:
-            self.logger.error(f"初始化联机模式失败: {str(e)}")
+            self.logger.error("初始化联机模式失败: %s", e)
             raise GameError(f"联机模式初始化失败: {str(e)}", 2001)
     
     def set_ai_level(self, level: str):
@@ -101,7 +125,7 @@ class GameCore:
         self.ai_level = level
         if self.current_ai:
             self.current_ai.set_level(level)
-        self.logger.info(f"AI难度已设置为: {level}")
+        self.logger.info("AI难度已设置为: %s", level)
     
     def set_ai_first(self, ai_first: bool):
         """设置AI是否先手"""
@@ -109,7 +133,7 @@ class GameCore:
         # 重新初始化AI（切换颜色）
         if self.current_mode in [GAME_MODES['PVE'], GAME_MODES['TRAIN']]:
             self._init_ai()
-        self.logger.info(f"AI先手设置为: {ai_first}")
+        self.logger.info("AI先手设置为: %s", ai_first)
     
     def start_game(self):
         """开始游戏"""
@@ -135,7 +159,12 @@ class GameCore:
     
     def reset_game(self):
         """重置游戏"""
-        self.board = [[PIECE_COLORS['EMPTY'] for _ in range(self.board_size)] for _ in range(self.board_size)]
+        self.board.fill(PIECE_COLORS['EMPTY'])
+        self._hash = 0
+        self._analysis_cache.clear()
+        # 新对局不复用上一局的置换表条目
+        for tt in self.tt.values():
+            BaseAI.reset_tt(tt)
         self.move_history = []
         self.game_active = False
         self.current_player = PIECE_COLORS['BLACK'] if not self.ai_first else PIECE_COLORS['WHITE']
@@ -155,7 +184,7 @@ class GameCore:
             return 'invalid_position'
         
         # 检查位置是否为空
-        if self.board[x][y] != PIECE_COLORS['EMPTY']:
+        if self.board[x, y] != PIECE_COLORS['EMPTY']:
             return 'occupied'
         
         # 检查当前回合
@@ -164,7 +193,8 @@ class GameCore:
         
         # 执行落子
         color = self.current_player
-        self.board[x][y] = color
+        self.board[x, y] = color
+        self._hash ^= self._zobrist_keys[x][y][color - 1]
         
         # 记录落子历史
         self.move_history.append({
@@ -206,32 +236,53 @@ class GameCore:
         
         return x, y
     
+    def ai_move_async(self) -> Future:
+        """异步请求AI落子（神经网络AI的请求与其他对局的请求合并为一次批量推理）
+        返回结果为落子坐标的Future；不执行落子，由调用方在主线程取得结果后调用place_piece
+        """
+        if not self.game_active or not self.current_ai:
+            raise GameError("无法执行AI落子：游戏未激活或未初始化AI", 2003)
+        if self.current_player != self.current_ai.color:
+            raise GameError("当前不是AI的回合", 2004)
+        return self.current_ai.move_async(self.board)
+    
+    def _get_tt(self, color: int) -> np.ndarray:
+        """获取指定颜色的置换表（首次使用时创建）"""
+        if color not in self.tt:
+            self.tt[color] = BaseAI.new_tt()
+        return self.tt[color]
+    
+    def search_best_move(self, depth: int, time_budget: Optional[float] = None) -> Tuple[Optional[Tuple[int, int]], float]:
+        """为当前回合玩家搜索最佳落子（Alpha-Beta剪枝，与该颜色的AI共用置换表，按置换表最佳落子和静态评分排序）
+        Returns:
+            (最佳落子, 得分)
+        """
+        color = self.current_player
+        searcher = self._searchers.get(color)
+        if searcher is None:
+            searcher = self._searchers[color] = AIFactory.create_ai('minimax', color, self.ai_level, tt=self._get_tt(color))
+        best_move, score, _ = searcher.search(self.board, depth, time_budget)
+        return best_move, score
+    
     def check_game_end(self) -> Optional[Dict]:
-        """检查游戏是否结束（返回结果字典）"""
-        if not self.game_active:
+        """检查游戏是否结束（返回结果字典）
+        只有最后一步落子可能构成五连，因此只检查经过该点的四条线；棋盘下满时判平局
+        """
+        if not self.game_active or not self.move_history:
             return None
         
-        # 检查黑方获胜
-        black_win, black_win_line = self.evaluator._is_win(self.board, PIECE_COLORS['BLACK'])
-        if black_win:
+        last_move = self.move_history[-1]
+        color = last_move['color']
+        win, win_line = self.evaluator._is_win_at(self.board, last_move['x'], last_move['y'], color)
+        if win:
             self.game_active = False
             return {
-                'winner': 'player1',
-                'win_line': black_win_line,
-                'color': PIECE_COLORS['BLACK']
+                'winner': 'player1' if color == PIECE_COLORS['BLACK'] else 'player2',
+                'win_line': win_line,
+                'color': color
             }
         
-        # 检查白方获胜
-        white_win, white_win_line = self.evaluator._is_win(self.board, PIECE_COLORS['WHITE'])
-        if white_win:
-            self.game_active = False
-            return {
-                'winner': 'player2',
-                'win_line': white_win_line,
-                'color': PIECE_COLORS['WHITE']
-            }
-        
-        # 检查平局
+        # 检查平局（遇到第一个空位即停止扫描）
         if self.evaluator._is_board_full(self.board):
             self.game_active = False
             return {'winner': 'draw', 'win_line': []}
@@ -245,7 +296,15 @@ class GameCore:
         
         # 确定AI颜色（用于分析）
         ai_color = self.current_ai.color if self.current_ai else PIECE_COLORS['WHITE']
-        return self.evaluator.analyze_board(self.board, ai_color)
+        key = (self._hash, ai_color)
+        report = self._analysis_cache.get(key)
+        if report is None:
+            report = self._analysis_cache[key] = self.evaluator.analyze_board(self.board, ai_color)
+            if len(self._analysis_cache) > _ANALYSIS_CACHE_SIZE:
+                self._analysis_cache.popitem(last=False)
+        else:
+            self._analysis_cache.move_to_end(key)
+        return report
     
     def save_ai_model(self, model_name: str, user_id: int) -> bool:
         """保存当前AI模型"""
@@ -263,7 +322,7 @@ class GameCore:
             )
             return success
         except Exception as e:
-            self.logger.error(f"保存AI模型失败: {str(e)}")
+            self.logger.error("保存AI模型失败: %s", e)
             return False
     
     def load_ai_model(self, model_id: int, user_id: int) -> bool:
@@ -275,11 +334,11 @@ class GameCore:
                 self.current_ai = ai_instance
                 self.ai_type = ai_instance.__class__.__name__.lower().replace('ai', '')
                 self.ai_level = ai_instance.level
-                self.logger.info(f"成功加载模型 ID: {model_id}")
+                self.logger.info("成功加载模型 ID: %s", model_id)
                 return True
             return False
         except Exception as e:
-            self.logger.error(f"加载AI模型失败: {str(e)}")
+            self.logger.error("加载AI模型失败: %s", e)
             return False
     
     def train_ai_model(
@@ -331,10 +390,10 @@ class GameCore:
             self.save_ai_model(f"训练模型_{int(time.time())}", user_id)
             
             self.is_training = False
-            self.logger.info(f"模型训练完成，总轮数: {epochs}")
+            self.logger.info("模型训练完成，总轮数: %s", epochs)
         except Exception as e:
             self.is_training = False
-            self.logger.error(f"训练AI模型失败: {str(e)}")
+            self.logger.error("训练AI模型失败: %s", e)
             raise GameError(f"训练失败: {str(e)}", 2009)
     
     def add_training_data(self, user_id: int) -> bool:
@@ -362,30 +421,72 @@ class GameCore:
                 'score': score
             })
         except Exception as e:
-            self.logger.error(f"添加训练数据失败: {str(e)}")
+            self.logger.error("添加训练数据失败: %s", e)
             return False
     
+    def _start_online_workers(self):
+        """启动联机消息发送线程（已在运行时不重复启动）"""
+        if any(thread.is_alive() for thread in self._online_threads):
+            return
+        self._online_stop.clear()
+        self._online_threads = [
+            threading.Thread(target=self._online_send_loop, name='online_send', daemon=True),
+        ]
+        for thread in self._online_threads:
+            thread.start()
+    
+    def stop_online_workers(self, timeout: float = 5.0):
+        """停止联机消息发送线程（先发送完已排队的消息）"""
+        self._online_stop.set()
+        for thread in self._online_threads:
+            thread.join(timeout)
+        self._online_threads = []
+    
     def _send_online_message(self, msg_type: str, data: Dict):
-        """发送联机消息"""
+        """发送联机消息（放入发送队列后立即返回，由发送线程完成网络发送）"""
         if not self.is_online or not self.server:
             return
-        
-        try:
-            # 调用服务器发送消息
-            self.server.send_message(msg_type, {
-                **data,
-                'user_id': self.train_user_id,
-                'room_id': self.current_room_id
-            })
-        except Exception as e:
-            self.logger.error(f"发送联机消息失败: {str(e)}")
+        self._online_outbox.put((msg_type, {
+            **data,
+            'user_id': self.train_user_id,
+            'room_id': self.current_room_id
+        }))
+    
+    def _online_send_loop(self):
+        """发送线程：按顺序发送队列中的联机消息，收到停止信号且队列为空后退出"""
+        while not (self._online_stop.is_set() and self._online_outbox.empty()):
+            try:
+                msg_type, data = self._online_outbox.get(timeout=_ONLINE_POLL_INTERVAL)
+            except queue.Empty:
+                continue
+            try:
+                # 调用服务器发送消息
+                self.server.send_message(msg_type, data)
+            except Exception as e:
+                self.logger.error("发送联机消息失败: %s", e)
     
     def set_online_callback(self, callback: Callable[[Dict], None]):
         """设置联机消息回调（用于UI更新）"""
         self.online_callback = callback
     
     def handle_online_message(self, msg: Dict):
-        """处理联机消息（从服务器接收）"""
+        """接收联机消息（可在网络接收线程中调用；只放入队列，由主线程调用process_online_messages处理）"""
+        self._online_inbox.put(msg)
+    
+    def process_online_messages(self):
+        """按到达顺序处理已收到的联机消息（须在主线程调用：会修改棋盘状态并触发UI回调）"""
+        while True:
+            try:
+                msg = self._online_inbox.get_nowait()
+            except queue.Empty:
+                return
+            try:
+                self._process_online_message(msg)
+            except Exception as e:
+                self.logger.error("处理联机消息失败: %s", e)
+    
+    def _process_online_message(self, msg: Dict):
+        """处理联机消息"""
         if self.online_callback:
             self.online_callback(msg)
         
@@ -447,7 +548,7 @@ class GameModeManager:
             raise GameError(f"不支持的游戏模式: {mode}", 2101)
         
         self.current_mode = mode
-        self.logger.info(f"切换到{self.mode_configs[mode]['desc']}")
+        self.logger.info("切换到%s", self.mode_configs[mode]['desc'])
         
         # 模式初始化
         if mode == GAME_MODES['PVE']:
@@ -502,7 +603,7 @@ class GameModeManager:
         from DB.training_data_dao import TrainingDataDAO
         training_dao = TrainingDataDAO()
         data_count = training_dao.get_training_data_count(user_id)
-        self.logger.info(f"当前用户训练数据总量: {data_count}")
+        self.logger.info("当前用户训练数据总量: %s", data_count)
     
     def create_online_room(self, room_name: str = "默认房间") -> str:
         """创建联机房间"""
@@ -517,10 +618,10 @@ class GameModeManager:
                 room_name=room_name
             )
             self.game_core.current_room_id = room_id
-            self.logger.info(f"创建联机房间成功，ID: {room_id}，名称: {room_name}")
+            self.logger.info("创建联机房间成功，ID: %s，名称: %s", room_id, room_name)
             return room_id
         except Exception as e:
-            self.logger.error(f"创建联机房间失败: {str(e)}")
+            self.logger.error("创建联机房间失败: %s", e)
             raise GameError(f"创建房间失败: {str(e)}", 2105)
     
     def join_online_room(self, room_id: str) -> bool:
@@ -537,11 +638,11 @@ class GameModeManager:
             )
             if success:
                 self.game_core.current_room_id = room_id
-                self.logger.info(f"加入联机房间成功，ID: {room_id}")
+                self.logger.info("加入联机房间成功，ID: %s", room_id)
                 return True
             return False
         except Exception as e:
-            self.logger.error(f"加入联机房间失败: {str(e)}")
+            self.logger.error("加入联机房间失败: %s", e)
             raise GameError(f"加入房间失败: {str(e)}", 2107)
     
     def leave_online_room(self) -> bool:
@@ -557,11 +658,11 @@ class GameModeManager:
             )
             if success:
                 self.game_core.current_room_id = None
-                self.logger.info(f"离开联机房间成功")
+                self.logger.info("离开联机房间成功")
                 return True
             return False
         except Exception as e:
-            self.logger.error(f"离开联机房间失败: {str(e)}")
+            self.logger.error("离开联机房间失败: %s", e)
             raise GameError(f"离开房间失败: {str(e)}", 2109)
     
     def get_online_room_list(self) -> list:
@@ -573,7 +674,7 @@ class GameModeManager:
             # 调用服务器获取房间列表
             return self.game_core.server.get_room_list()
         except Exception as e:
-            self.logger.error(f"获取房间列表失败: {str(e)}")
+            self.logger.error("获取房间列表失败: %s", e)
             raise GameError(f"获取房间列表失败: {str(e)}", 2111)
     
     def _get_user_nickname(self) -> str:
@@ -590,34 +691,58 @@ from typing import List, Tuple, Dict, Optional
 from Common.constants import PIECE_COLORS, EVAL_WEIGHTS
 from Common.logger import Logger
 from Common.data_utils import DataUtils
-from AI.evaluator import BoardEvaluator
+from AI.evaluator import get_evaluator
+from AI.base_ai import Board, zobrist_table
+
+_EVAL_CACHE_SIZE = 1 << 16  # 局面评估缓存的最大条目数（超出后整体清空）
 
 class AdvancedBoardAnalyzer:
     """高级棋盘分析器（扩展评估器功能，支持深度分析）"""
     def __init__(self, board_size: int = 15):
         self.board_size = board_size
-        self.evaluator = BoardEvaluator(board_size)
+        self.evaluator = get_evaluator(board_size)
         self.logger = Logger.get_instance()
-    
-    def analyze_move_quality(self, board: List[List[int]], x: int, y: int, color: int) -> Dict:
-        """分析落子质量"""
+        self._zobrist_keys = zobrist_table(board_size).tolist()
+        self._eval_cache: Dict[Tuple[int, int], int] = {}  # {(Zobrist哈希, 颜色): evaluate_board得分}
+    
+    def _evaluate_board(self, board: Board, color: int, board_hash: Optional[int]) -> int:
+        """评估整个棋盘（给出局面哈希时按(哈希, 颜色)缓存，复盘时相同局面只评估一次）"""
+        if board_hash is None:
+            return self.evaluator.evaluate_board(board, color)
+        key = (board_hash, color)
+        score = self._eval_cache.get(key)
+        if score is None:
+            if len(self._eval_cache) >= _EVAL_CACHE_SIZE:
+                self._eval_cache.clear()
+            score = self._eval_cache[key] = self.evaluator.evaluate_board(board, color)
+        return score
+    
+    def analyze_move_quality(self, board: Board, x: int, y: int, color: int, board_hash: Optional[int] = None) -> Dict:
+        """分析落子质量（在board上原地模拟落子，分析完成后恢复）
+        Args:
+            board_hash: 落子前局面的Zobrist哈希（给出时局面评估结果按哈希缓存）
+        """
+        board = np.asarray(board, dtype=np.uint8)
         # 模拟落子前的局势
-        before_score = self.evaluator.evaluate_board(board, color)
+        before_score = self._evaluate_board(board, color, board_hash)
         
-        # 模拟落子
-        temp_board = [row.copy() for row in board]
-        temp_board[x][y] = color
-        
-        # 模拟落子后的局势
-        after_score = self.evaluator.evaluate_board(temp_board, color)
-        score_change = after_score - before_score
-        
-        # 判断落子类型
-        move_type = self._classify_move_type(temp_board, x, y, color)
-        
-        # 评估落子风险（对手可能的反击）
-        opponent_color = PIECE_COLORS['WHITE'] if color == PIECE_COLORS['BLACK'] else PIECE_COLORS['BLACK']
-        opponent_key_moves = self.evaluator.get_key_moves(temp_board, opponent_color, top_k=3)
+        # 原地模拟落子（只改写一个格子，不复制棋盘）
+        previous = board[x, y]
+        board[x, y] = color
+        try:
+            # 模拟落子后的局势
+            after_hash = None if board_hash is None else board_hash ^ self._zobrist_keys[x][y][color - 1]
+            after_score = self._evaluate_board(board, color, after_hash)
+            score_change = after_score - before_score
+            
+            # 判断落子类型
+            move_type = self._classify_move_type(board, x, y, color)
+            
+            # 评估落子风险（对手可能的反击）
+            opponent_color = PIECE_COLORS['WHITE'] if color == PIECE_COLORS['BLACK'] else PIECE_COLORS['BLACK']
+            opponent_key_moves = self.evaluator.get_key_moves(board, opponent_color, top_k=3)
+        finally:
+            board[x, y] = previous
         max_opponent_score = max([score for _, _, score in opponent_key_moves], default=0.0)
         risk_level = "高" if max_opponent_score >= EVAL_WEIGHTS['FOUR'] else "中" if max_opponent_score >= EVAL_WEIGHTS['THREE'] else "低"
         
@@ -630,7 +755,7 @@ class AdvancedBoardAnalyzer:
             'opponent_threats': [{'x': x, 'y': y, 'score': s} for x, y, s in opponent_key_moves if s >= EVAL_WEIGHTS['THREE']]
         }
     
-    def _classify_move_type(self, board: List[List[int]], x: int, y: int, color: int) -> str:
+    def _classify_move_type(self, board: Board, x: int, y: int, color: int) -> str:
         """分类落子类型"""
         # 检查是否是必胜落子
         if self.evaluator._is_win(board, color)[0]:
@@ -638,13 +763,16 @@ class AdvancedBoardAnalyzer:
         
         # 检查是否是防守落子
         opponent_color = PIECE_COLORS['WHITE'] if color == PIECE_COLORS['BLACK'] else PIECE_COLORS['BLACK']
-        temp_board = [row.copy() for row in board]
-        temp_board[x][y] = PIECE_COLORS['EMPTY']  # 撤销落子
-        if self.evaluator._is_win(temp_board, opponent_color)[0]:
+        board[x, y] = PIECE_COLORS['EMPTY']  # 原地撤销落子，判断后恢复
+        try:
+            opponent_wins = self.evaluator._is_win(board, opponent_color)[0]
+        finally:
+            board[x, y] = color
+        if opponent_wins:
             return "防守落子"
         
         # 检查棋型
-        segments = self.evaluator._get_line_segments(board, x, y)
+        segments = self.evaluator._get_line_segments(np.asarray(board), x, y)
         for segment in segments:
             pattern, _ = self.evaluator._match_pattern(segment, color)
             if pattern == 'live_four':
@@ -671,12 +799,13 @@ class AdvancedBoardAnalyzer:
         
         # 分析关键落子
         key_moves = []
-        board = [[PIECE_COLORS['EMPTY'] for _ in range(self.board_size)] for _ in range(self.board_size)]
+        board = np.full((self.board_size, self.board_size), PIECE_COLORS['EMPTY'], dtype=np.uint8)
+        board_hash = 0  # 复盘棋盘的Zobrist哈希（随落子增量更新）
         
         for i, move in enumerate(move_history):
             x, y, color = move['x'], move['y'], move['color']
             # 分析落子质量
-            quality = self.analyze_move_quality(board, x, y, color)
+            quality = self.analyze_move_quality(board, x, y, color, board_hash)
             # 记录关键落子（进攻、防守、必胜）
             if quality['move_type'] in ["必胜落子", "活四进攻", "冲四进攻", "活三进攻", "防守落子"]:
                 key_moves.append({
@@ -689,11 +818,12 @@ class AdvancedBoardAnalyzer:
                     'risk_level': quality['risk_level']
                 })
             # 执行落子
-            board[x][y] = color
+            board[x, y] = color
+            board_hash ^= self._zobrist_keys[x][y][color - 1]
         
         # 最终局势分析
-        final_score_black = self.evaluator.evaluate_board(board, PIECE_COLORS['BLACK'])
-        final_score_white = self.evaluator.evaluate_board(board, PIECE_COLORS['WHITE'])
+        final_score_black = self._evaluate_board(board, PIECE_COLORS['BLACK'], board_hash)
+        final_score_white = self._evaluate_board(board, PIECE_COLORS['WHITE'], board_hash)
         situation = "黑方优势" if final_score_black - final_score_white > EVAL_WEIGHTS['THREE'] else \
                     "白方优势" if final_score_white - final_score_black > EVAL_WEIGHTS['THREE'] else \
                     "局势均衡"
@@ -709,9 +839,10 @@ class AdvancedBoardAnalyzer:
             'analysis_time': DataUtils.get_current_time_str()
         }
     
-    def predict_best_moves(self, board: List[List[int]], color: int, top_k: int = 3) -> List[Dict]:
+    def predict_best_moves(self, board: Board, color: int, top_k: int = 3) -> List[Dict]:
         """预测最佳落子（基于深度分析）"""
         # 获取初始关键落子
+        board = np.asarray(board, dtype=np.uint8)
         key_moves = self.evaluator.get_key_moves(board, color, top_k=10)
         if not key_moves:
             return []
@@ -719,16 +850,16 @@ class AdvancedBoardAnalyzer:
         # 对每个候选落子进行深度分析
         move_analysis = []
         for x, y, score in key_moves:
-            # 模拟落子
-            temp_board = [row.copy() for row in board]
-            temp_board[x][y] = color
-            
             # 分析落子质量
             quality = self.analyze_move_quality(board, x, y, color)
             
-            # 预测对手的反击
+            # 预测对手的反击（原地模拟落子，预测后恢复）
             opponent_color = PIECE_COLORS['WHITE'] if color == PIECE_COLORS['BLACK'] else PIECE_COLORS['BLACK']
-            opponent_moves = self.evaluator.get_key_moves(temp_board, opponent_color, top_k=2)
+            board[x, y] = color
+            try:
+                opponent_moves = self.evaluator.get_key_moves(board, opponent_color, top_k=2)
+            finally:
+                board[x, y] = PIECE_COLORS['EMPTY']
             
             move_analysis.append({
                 'x': x,
@@ -48,7 +48,7 @@ class ClientHandler:
         # 启动接收消息线程
         self.recv_thread = threading.Thread(target=self._recv_messages, daemon=True)
         self.recv_thread.start()
-        self.logger.info(f"客户端处理器启动，处理 {self.client_addr} 的消息")
+        self.logger.info("客户端处理器启动，处理 %s 的消息", self.client_addr)
     
     def stop(self):
         """停止客户端处理器"""
@@ -65,7 +65,7 @@ class ClientHandler:
             self.client_socket.close()
         except:
             pass
-        self.logger.info(f"客户端处理器已停止，客户端 {self.client_addr} 断开连接")
+        self.logger.info("客户端处理器已停止，客户端 %s 断开连接", self.client_addr)
     
     def _recv_messages(self):
         """接收并处理客户端消息（循环运行）"""
@@ -75,7 +75,7 @@ class ClientHandler:
                 # 接收数据（每次最多4096字节）
                 data = self.client_socket.recv(4096)
                 if not data:
-                    self.logger.warning(f"客户端 {self.client_addr} 主动断开连接")
+                    self.logger.warning("客户端 %s 主动断开连接", self.client_addr)
                     break
                 
                 # 拼接缓冲区
@@ -87,10 +87,10 @@ class ClientHandler:
                         self._handle_message(msg_bytes)
             
             except socket.timeout:
-                self.logger.warning(f"客户端 {self.client_addr} 接收消息超时")
+                self.logger.warning("客户端 %s 接收消息超时", self.client_addr)
                 break
             except Exception as e:
-                self.logger.error(f"接收客户端 {self.client_addr} 消息失败: {str(e)}")
+                self.logger.error("接收客户端 %s 消息失败: %s", self.client_addr, e)
                 break
         
         # 停止处理器
@@ -104,7 +104,7 @@ class ClientHandler:
             self.send_error("无效的消息格式")
             return
         
-        self.logger.info(f"收到客户端 {self.client_addr} 的消息：{msg_type}，数据：{data}")
+        self.logger.info("收到客户端 %s 的消息：%s，数据：%s", self.client_addr, msg_type, data)
         
         # 更新心跳时间
         self.last_heartbeat = time.time()
@@ -130,7 +130,7 @@ class ClientHandler:
             else:
                 self.send_error(f"不支持的消息类型：{msg_type}")
         except Exception as e:
-            self.logger.error(f"处理消息 {msg_type} 失败: {str(e)}")
+            self.logger.error("处理消息 %s 失败: %s", msg_type, e)
             self.send_error(f"处理请求失败：{str(e)}")
     
     def _handle_login(self, data: Dict):
@@ -166,12 +166,12 @@ class ClientHandler:
                 'draw_count': user['draw_count']
             }
         })
-        self.logger.info(f"用户 {self.username}（ID：{self.user_id}）登录成功")
+        self.logger.info("用户 %s（ID：%s）登录成功", self.username, self.user_id)
     
     def _handle_logout(self, data: Dict):
         """处理退出登录请求"""
         self.send_message(MSG_TYPES['LOGOUT'], {'success': True, 'message': '退出成功'})
-        self.logger.info(f"用户 {self.username}（ID：{self.user_id}）退出登录")
+        self.logger.info("用户 %s（ID：%s）退出登录", self.username, self.user_id)
         self.stop()
     
     def _handle_create_room(self, data: Dict):
@@ -197,7 +197,7 @@ class ClientHandler:
                 'room_name': room_name,
                 'message': '房间创建成功'
             })
-            self.logger.info(f"用户 {self.user_id} 创建房间 {room_id}：{room_name}")
+            self.logger.info("用户 %s 创建房间 %s：%s", self.user_id, room_id, room_name)
         else:
             self.send_error("创建房间失败")
     
@@ -241,7 +241,7 @@ class ClientHandler:
                     'board_state': room.board_state,
                     'current_player': room.current_player
                 })
-                self.logger.info(f"用户 {self.user_id} 加入房间 {room_id}")
+                self.logger.info("用户 %s 加入房间 %s", self.user_id, room_id)
         else:
             self.send_error(message or "加入房间失败")
     
@@ -272,7 +272,7 @@ class ClientHandler:
                 'message': '离开房间成功'
             })
             self.current_room_id = None
-            self.logger.info(f"用户 {self.user_id} 离开房间 {self.current_room_id}")
+            self.logger.info("用户 %s 离开房间 %s", self.user_id, self.current_room_id)
         else:
             self.send_error(message or "离开房间失败")
     
@@ -342,7 +342,7 @@ class ClientHandler:
                     'win_line': result.get('win_line', [])
                 }
             )
-            self.logger.info(f"用户 {self.user_id} 在房间 {self.current_room_id} 落子：({x},{y})")
+            self.logger.info("用户 %s 在房间 %s 落子：(%s,%s)", self.user_id, self.current_room_id, x, y)
         else:
             self.send_error(result.get('message', "落子失败"))
     
@@ -374,13 +374,13 @@ class ClientHandler:
                 'timestamp': time.time()
             }
         )
-        self.logger.info(f"用户 {self.user_id} 在房间 {self.current_room_id} 发送消息：{content}")
+        self.logger.info("用户 %s 在房间 %s 发送消息：%s", self.user_id, self.current_room_id, content)
     
     def _handle_heartbeat(self, data: Dict):
         """处理心跳包"""
         # 发送心跳响应
         self.send_message(MSG_TYPES['HEARTBEAT'], {'status': 'alive'})
-        self.logger.debug(f"收到客户端 {self.client_addr} 的心跳包，已响应")
+        self.logger.debug("收到客户端 %s 的心跳包，已响应", self.client_addr)
     
     def send_message(self, msg_type: str, data: Dict):
         """发送消息给客户端"""
@@ -388,7 +388,7 @@ class ClientHandler:
             message = self.server._pack_message(msg_type, data)
             self.client_socket.sendall(message)
         except Exception as e:
-            self.logger.error(f"发送消息给客户端 {self.client_addr} 失败: {str(e)}")
+            self.logger.error("发送消息给客户端 %s 失败: %s", self.client_addr, e)
     
     def send_error(self, message: str):
         """发送错误消息给客户端"""
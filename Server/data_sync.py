@@ -47,7 +47,7 @@ class DataSync:
             is_consistent = len(diff_moves) == 0
             return is_consistent, DataUtils.board_to_str(server_board), diff_moves
         except Exception as e:
-            self.logger.error(f"同步棋盘状态失败: {str(e)}")
+            self.logger.error("同步棋盘状态失败: %s", e)
             # 返回服务器状态作为权威
             return False, server_board_str, []
     
@@ -61,7 +61,7 @@ class DataSync:
         """
         # 检查长度
         if len(client_history) != len(server_history):
-            self.logger.warning(f"落子历史长度不一致：客户端{len(client_history)}步，服务器{len(server_history)}步")
+            self.logger.warning("落子历史长度不一致：客户端%s步，服务器%s步", len(client_history), len(server_history))
             return False, server_history
         
         # 检查每一步
@@ -69,7 +69,7 @@ class DataSync:
             if (client_move.get('x') != server_move.get('x') or
                 client_move.get('y') != server_move.get('y') or
                 client_move.get('user_id') != server_move.get('user_id')):
-                self.logger.warning(f"第{i+1}步落子不一致：客户端{client_move}，服务器{server_move}")
+                self.logger.warning("第%s步落子不一致：客户端%s，服务器%s", i + 1, client_move, server_move)
                 return False, server_history
         
         return True, server_history
@@ -103,5 +103,5 @@ class DataSync:
             expected_signature = self._generate_signature(board_str, move_history)
             return signature == expected_signature
         except Exception as e:
-            self.logger.error(f"验证签名失败: {str(e)}")
+            self.logger.error("验证签名失败: %s", e)
             return False
\ No newline at end of file
@@ -43,7 +43,7 @@ class Server:
             self.running = True
             # 启动TCP服务器
             self.tcp_server.start(self._on_client_connected)
-            self.logger.info(f"主服务器启动成功，监听 {self.host}:{self.port}")
+            self.logger.info("主服务器启动成功，监听 %s:%s", self.host, self.port)
             
             # 启动心跳检测线程
             self.heartbeat_thread = threading.Thread(target=self._heartbeat_check, daemon=True)
@@ -53,7 +53,7 @@ class Server:
             while self.running:
                 time.sleep(1)
         except Exception as e:
-            self.logger.error(f"服务器启动失败: {str(e)}")
+            self.logger.error("服务器启动失败: %s", e)
             raise ServerError(f"服务器启动失败: {str(e)}", 3001)
     
     def stop(self):
@@ -74,7 +74,7 @@ class Server:
         with self.lock:
             # 检查最大连接数
             if len(self.client_handlers) >= self.max_clients:
-                self.logger.warning(f"客户端 {client_addr} 连接被拒绝：已达到最大连接数 {self.max_clients}")
+                self.logger.warning("客户端 %s 连接被拒绝：已达到最大连接数 %s", client_addr, self.max_clients)
                 client_socket.sendall(self._pack_message(MSG_TYPES['ERROR'], {'message': '服务器繁忙，请稍后再试'}))
                 client_socket.close()
                 return
@@ -89,7 +89,7 @@ class Server:
                 self.timeout
             )
             self.client_handlers.append(handler)
-            self.logger.info(f"客户端 {client_addr} 连接成功，当前连接数：{len(self.client_handlers)}")
+            self.logger.info("客户端 %s 连接成功，当前连接数：%s", client_addr, len(self.client_handlers))
             
             # 启动客户端处理线程
             handler.start()
@@ -105,7 +105,7 @@ class Server:
                 for handler in self.client_handlers:
                     # 检查超时（超过timeout秒无心跳）
                     if current_time - handler.last_heartbeat > self.timeout:
-                        self.logger.warning(f"客户端 {handler.client_addr} 心跳超时，断开连接")
+                        self.logger.warning("客户端 %s 心跳超时，断开连接", handler.client_addr)
                         to_remove.append(handler)
                         handler.stop()
                 
@@ -124,20 +124,20 @@ class Server:
             # 踢掉已登录的同名用户
             if user_id in self.client_map:
                 old_handler = self.client_map[user_id]
-                self.logger.warning(f"用户 {user_id} 在新客户端 {handler.client_addr} 登录，踢掉旧客户端 {old_handler.client_addr}")
+                self.logger.warning("用户 %s 在新客户端 %s 登录，踢掉旧客户端 %s", user_id, handler.client_addr, old_handler.client_addr)
                 old_handler.send_error("你的账号在其他设备登录，已被强制下线")
                 old_handler.stop()
                 self.client_handlers.remove(old_handler)
             
             self.client_map[user_id] = handler
-            self.logger.info(f"用户 {user_id} 注册到客户端 {handler.client_addr}")
+            self.logger.info("用户 %s 注册到客户端 %s", user_id, handler.client_addr)
     
     def unregister_client(self, user_id: str, handler: ClientHandler):
         """注销客户端（用户退出或断开连接）"""
         with self.lock:
             if user_id in self.client_map and self.client_map[user_id] == handler:
                 del self.client_map[user_id]
-                self.logger.info(f"用户 {user_id} 从客户端 {handler.client_addr} 注销")
+                self.logger.info("用户 %s 从客户端 %s 注销", user_id, handler.client_addr)
             
             # 从客户端列表移除
             if handler in self.client_handlers:
@@ -170,5 +170,5 @@ class Server:
             message = json.loads(json_str)
             return message.get('type'), message.get('data', {})
         except Exception as e:
-            Logger.get_instance().error(f"消息解包失败: {str(e)}")
+            Logger.get_instance().error("消息解包失败: %s", e)
             return None, None
\ No newline at end of file
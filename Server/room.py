@@ -153,7 +153,7 @@ class Room:
     def reset_game(self) -> bool:
         """重置游戏（重新开始）"""
         if self.room_status != ROOM_STATUSES['ENDED']:
-            self.logger.error(f"房间 {self.room_id} 未结束，无法重置游戏")
+            self.logger.error("房间 %s 未结束，无法重置游戏", self.room_id)
             return False
         
         # 初始化棋盘
@@ -167,5 +167,5 @@ class Room:
         self.room_status = ROOM_STATUSES['PLAYING']
         self.update_time = time.time()
         
-        self.logger.info(f"房间 {self.room_id} 游戏重置成功")
+        self.logger.info("房间 %s 游戏重置成功", self.room_id)
         return True
\ No newline at end of file
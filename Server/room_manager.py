@@ -46,7 +46,7 @@ class RoomManager:
             
             # 添加到房间列表
             self.rooms[room_id] = room
-            self.logger.info(f"创建房间成功：ID={room_id}，名称={room_name}，主机={host_id}")
+            self.logger.info("创建房间成功：ID=%s，名称=%s，主机=%s", room_id, room_name, host_id)
             return room_id
     
     def get_room(self, room_id: str) -> Optional[Room]:
@@ -84,7 +84,7 @@ class RoomManager:
             room.current_player = room.host_id  # 主机先落子（黑方）
             room.update_time = time.time()
             
-            self.logger.info(f"用户 {user_id} 加入房间 {room_id}，房间状态变为游戏中")
+            self.logger.info("用户 %s 加入房间 %s，房间状态变为游戏中", user_id, room_id)
             return True, None
     
     def leave_room(self, room_id: str, user_id: str) -> Tuple[bool, Optional[str]]:
@@ -109,7 +109,7 @@ class RoomManager:
             if user_id == room.host_id:
                 # 主机离开，房间解散
                 del self.rooms[room_id]
-                self.logger.info(f"主机 {user_id} 离开房间 {room_id}，房间已解散")
+                self.logger.info("主机 %s 离开房间 %s，房间已解散", user_id, room_id)
             else:
                 # 访客离开，房间状态改为等待
                 room.guest_id = None
@@ -117,7 +117,7 @@ class RoomManager:
                 room.room_status = ROOM_STATUSES['WAITING']
                 room.current_player = room.host_id
                 room.update_time = time.time()
-                self.logger.info(f"访客 {user_id} 离开房间 {room_id}，房间状态变为等待")
+                self.logger.info("访客 %s 离开房间 %s，房间状态变为等待", user_id, room_id)
             
             return True, None
     
@@ -135,7 +135,7 @@ class RoomManager:
             # 移除空房间
             for room_id in to_remove:
                 del self.rooms[room_id]
-                self.logger.info(f"清理空房间：{room_id}")
+                self.logger.info("清理空房间：%s", room_id)
     
     def get_room_list(self) -> List[Dict]:
         """获取房间列表（供客户端查询）"""
@@ -29,13 +29,13 @@ class TCPServer:
             # 开始监听
             self.server_socket.listen(5)
             self.running = True
-            self.logger.info(f"TCP服务器启动成功，监听 {self.host}:{self.port}")
+            self.logger.info("TCP服务器启动成功，监听 %s:%s", self.host, self.port)
             
             # 启动接受连接的线程
             accept_thread = threading.Thread(target=self._accept_connections, daemon=True)
             accept_thread.start()
         except Exception as e:
-            self.logger.error(f"TCP服务器启动失败: {str(e)}")
+            self.logger.error("TCP服务器启动失败: %s", e)
             raise ServerError(f"TCP服务器启动失败: {str(e)}", 3101)
     
     def stop(self):
@@ -68,6 +68,6 @@ class TCPServer:
                 continue  # 超时，继续循环检查是否停止
             except Exception as e:
                 if self.running:
-                    self.logger.error(f"接受客户端连接失败: {str(e)}")
+                    self.logger.error("接受客户端连接失败: %s", e)
                 else:
                     break  # 服务器已停止，退出循环
\ No newline at end of file
@@ -140,7 +140,7 @@ class MainWindow:
                 self.icons['white_piece'] = pygame.image.load(os.path.join(icon_path, 'white_piece.png')).convert_alpha()
                 self.icons['ai_icon'] = pygame.image.load(os.path.join(icon_path, 'ai_icon.png')).convert_alpha()
             except Exception as e:
-                self.logger.warning(f"加载图标失败: {str(e)}，将使用默认绘制")
+                self.logger.warning("加载图标失败: %s，将使用默认绘制", e)
         
         # 加载背景图
         self.background = None
@@ -150,7 +150,7 @@ class MainWindow:
                 self.background = pygame.image.load(bg_path).convert()
                 self.background = pygame.transform.scale(self.background, (self.width, self.height))
             except Exception as e:
-                self.logger.warning(f"加载背景图失败: {str(e)}")
+                self.logger.warning("加载背景图失败: %s", e)
         
     def on_login(self, username: str, password: str):
         """登录回调"""
@@ -160,12 +160,12 @@ class MainWindow:
                 self.current_user = user
                 self.show_menu = False
                 self.control_panel.update_user_info(user)
-                self.logger.info(f"用户登录成功: {username}")
+                self.logger.info("用户登录成功: %s", username)
                 pygame.display.set_caption(f"{WINDOW_CONFIG['TITLE']} - 登录用户：{user['nickname']}")
             else:
                 self.main_menu.show_error("用户名或密码错误")
         except Exception as e:
-            self.logger.error(f"登录失败: {str(e)}")
+            self.logger.error("登录失败: %s", e)
             self.main_menu.show_error(f"登录失败: {str(e)}")
     
     def on_register(self, username: str, password: str, nickname: str):
@@ -174,11 +174,11 @@ class MainWindow:
             success = self.user_dao.register(username, password, nickname)
             if success:
                 self.main_menu.show_message("注册成功，请登录")
-                self.logger.info(f"用户注册成功: {username}")
+                self.logger.info("用户注册成功: %s", username)
             else:
                 self.main_menu.show_error("注册失败，用户名已存在")
         except Exception as e:
-            self.logger.error(f"注册失败: {str(e)}")
+            self.logger.error("注册失败: %s", e)
             self.main_menu.show_error(f"注册失败: {str(e)}")
     
     def on_guest_login(self):
@@ -204,13 +204,13 @@ class MainWindow:
         self.control_panel.update_mode_info(mode)
         self.board.reset()
         self.ai_visualizer.reset()
-        self.logger.info(f"切换游戏模式: {mode}")
+        self.logger.info("切换游戏模式: %s", mode)
     
     def on_ai_level_change(self, level: str):
         """AI难度切换回调"""
         self.game_core.set_ai_level(level)
         self.control_panel.update_ai_level(level)
-        self.logger.info(f"切换AI难度: {level}")
+        self.logger.info("切换AI难度: %s", level)
     
     def on_start_game(self):
         """开始游戏回调"""
@@ -254,11 +254,11 @@ class MainWindow:
             )
             if success:
                 self.control_panel.show_message("模型保存成功")
-                self.logger.info(f"模型保存成功: {model_name}")
+                self.logger.info("模型保存成功: %s", model_name)
             else:
                 self.control_panel.show_error("模型保存失败")
         except Exception as e:
-            self.logger.error(f"保存模型失败: {str(e)}")
+            self.logger.error("保存模型失败: %s", e)
             self.control_panel.show_error(f"保存失败: {str(e)}")
     
     def on_load_model(self):
@@ -280,11 +280,11 @@ class MainWindow:
             )
             if success:
                 self.control_panel.show_message("模型加载成功")
-                self.logger.info(f"模型加载成功: {model_id}")
+                self.logger.info("模型加载成功: %s", model_id)
             else:
                 self.control_panel.show_error("模型加载失败")
         except Exception as e:
-            self.logger.error(f"加载模型失败: {str(e)}")
+            self.logger.error("加载模型失败: %s", e)
             self.control_panel.show_error(f"加载失败: {str(e)}")
     
     def on_train_model(self):
@@ -314,7 +314,7 @@ class MainWindow:
             )
             train_thread.start()
         except Exception as e:
-            self.logger.error(f"训练模型失败: {str(e)}")
+            self.logger.error("训练模型失败: %s", e)
             self.control_panel.show_error(f"训练失败: {str(e)}")
             self.control_panel.set_train_status("idle")
     
@@ -335,7 +335,7 @@ class MainWindow:
                 self.board.mark_key_position(x, y)
             self.logger.info("棋盘分析完成")
         except Exception as e:
-            self.logger.error(f"棋盘分析失败: {str(e)}")
+            self.logger.error("棋盘分析失败: %s", e)
             self.control_panel.show_error(f"分析失败: {str(e)}")
     
     def on_piece_place(self, x: int, y: int):
@@ -367,7 +367,7 @@ class MainWindow:
             elif result == 'not_your_turn':
                 self.control_panel.show_error("不是你的回合")
         except Exception as e:
-            self.logger.error(f"落子失败: {str(e)}")
+            self.logger.error("落子失败: %s", e)
             self.control_panel.show_error(f"落子失败: {str(e)}")
     
     def _ai_auto_move(self):
@@ -407,7 +407,7 @@ class MainWindow:
                 {'type': 'ai_move', 'x': x, 'y': y}
             ))
         except Exception as e:
-            self.logger.error(f"AI落子失败: {str(e)}")
+            self.logger.error("AI落子失败: %s", e)
             pygame.fastevent.post(pygame.event.Event(
                 pygame.USEREVENT + 2,
                 {'type': 'ai_error', 'message': str(e)}
@@ -469,7 +469,7 @@ class MainWindow:
                 )
                 self.logger.info("对局记录保存成功")
             except Exception as e:
-                self.logger.error(f"保存对局记录失败: {str(e)}")
+                self.logger.error("保存对局记录失败: %s", e)
         
         # 训练模式下自动添加训练数据
         if self.current_mode == GAME_MODES['TRAIN'] and self.current_user and self.current_user['user_id'] != -1:
@@ -477,7 +477,7 @@ class MainWindow:
                 self.game_core.add_training_data(self.current_user['user_id'])
                 self.logger.info("训练数据添加成功")
             except Exception as e:
-                self.logger.error(f"添加训练数据失败: {str(e)}")
+                self.logger.error("添加训练数据失败: %s", e)
     
     def on_new_game(self):
         """新游戏回调（游戏菜单）"""
@@ -637,6 +637,8 @@ class MainWindow:
         while self.running:
             # 处理事件
             self._handle_events()
+            # 处理联机消息（在主线程中修改游戏状态和更新UI）
+            self.game_core.process_online_messages()
             # 绘制UI
             self._draw()
             # 控制帧率
@@ -19,7 +19,7 @@ def init_environment():
     try:
         DBInitializer.init_db()
     except Exception as e:
-        logger.error(f"数据库初始化失败，但程序继续运行（离线模式）: {str(e)}")
+        logger.error("数据库初始化失败，但程序继续运行（离线模式）: %s", e)
     # 4. 初始化Pygame
     pygame.init()
     pygame.font.init()
@@ -33,15 +33,15 @@ def check_cuda():
     try:
         import torch
         if torch.cuda.is_available():
-            logger.info(f"CUDA可用，设备: {torch.cuda.get_device_name(0)}")
-            logger.info(f"CUDA版本: {torch.version.cuda}")
+            logger.info("CUDA可用，设备: %s", torch.cuda.get_device_name(0))
+            logger.info("CUDA版本: %s", torch.version.cuda)
             # 验证CUDA 12.2
             if '12.2' not in torch.version.cuda:
-                logger.warning(f"检测到CUDA版本: {torch.version.cuda}，推荐使用12.2版本")
+                logger.warning("检测到CUDA版本: %s，推荐使用12.2版本", torch.version.cuda)
         else:
             logger.warning("CUDA不可用，将使用CPU运行（AI速度会变慢）")
     except Exception as e:
-        logger.error(f"CUDA检查失败: {str(e)}")
+        logger.error("CUDA检查失败: %s", e)
 
 def start_server():
     """启动服务器（独立线程）"""
@@ -49,10 +49,10 @@ def start_server():
     try:
         config = Config.get_instance()
         server = Server(config.server_host, config.server_port)
-        logger.info(f"服务器启动成功，监听 {config.server_host}:{config.server_port}")
+        logger.info("服务器启动成功，监听 %s:%s", config.server_host, config.server_port)
         server.start()
     except Exception as e:
-        logger.error(f"服务器启动失败: {str(e)}")
+        logger.error("服务器启动失败: %s", e)
 
 def main():
     """程序主函数"""